@@ -0,0 +1,224 @@
+"""
+ai_core/batch.py
+Batch execution of skills over many inputs:
+- run_batch(skill, inputs): one skill, one result per input
+- run_batch_all(inputs): every registered skill, a skills x inputs matrix
+- Template skills (run(x) == max(0, (x + a) * b)) are evaluated as one
+  vectorized NumPy expression; other skills, non-integer inputs and
+  inputs that could overflow int64 fall back to calling run() per input,
+  so results always equal [skill.run(x) for x in inputs]
+- Works without NumPy (pure-Python lists), just without vectorization
+"""
+
+import os
+import ast
+import inspect
+import functools
+
+from ai_core import skills
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+INT64_LIMIT = 2 ** 63
+
+# template_params() results kept for reuse (LRU), bounded for long-running processes
+PARAMS_CACHE_SIZE = 1024
+
+
+# ---------------------------------------------------------
+# TEMPLATE DETECTION
+# ---------------------------------------------------------
+
+def _int_const(node):
+    if isinstance(node, ast.Constant) and type(node.value) is int:
+        return node.value
+    if (isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub)
+            and isinstance(node.operand, ast.Constant) and type(node.operand.value) is int):
+        return -node.operand.value
+    return None
+
+
+def _match_kernel(fn):
+    """(a, b) if fn is exactly `def run(x): return max(0, (x + a) * b)`, else None."""
+    if len(fn.args.args) != 1 or fn.args.vararg or fn.args.kwarg or fn.args.kwonlyargs:
+        return None
+    arg = fn.args.args[0].arg
+
+    body = fn.body
+    if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant):
+        body = body[1:]  # docstring
+    if len(body) != 1 or not isinstance(body[0], ast.Return):
+        return None
+
+    call = body[0].value
+    if not (isinstance(call, ast.Call) and isinstance(call.func, ast.Name) and call.func.id == "max"
+            and len(call.args) == 2 and not call.keywords and _int_const(call.args[0]) == 0):
+        return None
+
+    mul = call.args[1]
+    if not (isinstance(mul, ast.BinOp) and isinstance(mul.op, ast.Mult)):
+        return None
+    add = mul.left
+    if not (isinstance(add, ast.BinOp) and isinstance(add.op, ast.Add)
+            and isinstance(add.left, ast.Name) and add.left.id == arg):
+        return None
+
+    a, b = _int_const(add.right), _int_const(mul.right)
+    if a is None or b is None:
+        return None
+    return a, b
+
+
+def _rebinds(node, names):
+    """True if a top-level statement (other than `def run`) binds one of names."""
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return node.name in names
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        return any((a.asname or a.name.split(".")[0]) in names or a.name == "*" for a in node.names)
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Store) and child.id in names:
+            return True
+    return False
+
+
+@functools.lru_cache(maxsize=PARAMS_CACHE_SIZE)
+def template_params(source):
+    """
+    Kernel parameters (a, b) of a skill module's source when its run() is
+    the generated template, else None. Cached (LRU) by source.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return None
+    params = None
+    for node in tree.body:
+        # the last top-level binding of `run` wins, as it does at import time
+        if isinstance(node, ast.FunctionDef) and node.name == "run":
+            params = _match_kernel(node) if not node.decorator_list else None
+        elif _rebinds(node, ("run", "max")):
+            return None
+    return params
+
+
+def module_params(module):
+    """template_params() for an imported skill module (None if its source is unavailable)."""
+    try:
+        return template_params(inspect.getsource(module))
+    except (OSError, TypeError):
+        return None
+
+
+# ---------------------------------------------------------
+# INPUTS
+# ---------------------------------------------------------
+
+def _to_list(inputs):
+    """Python scalars for the reference loop (lists, array.array, memoryview, ndarray...)."""
+    if np is not None and isinstance(inputs, np.ndarray):
+        return inputs.ravel().tolist()
+    if isinstance(inputs, memoryview):
+        return inputs.tolist()
+    return list(inputs)
+
+
+def _int_vector(inputs, params):
+    """int64 array of inputs if every kernel in params is exact on it, else None."""
+    if np is None:
+        return None
+    arr = np.asarray(inputs).ravel()
+    if arr.dtype.kind not in "iu":
+        return None
+    if arr.size == 0:
+        return arr.astype(np.int64)
+    bound = max(abs(int(arr.min())), abs(int(arr.max())))
+    for a, b in params:
+        if (bound + abs(a)) * abs(b) >= INT64_LIMIT or bound + abs(a) >= INT64_LIMIT:
+            return None
+    return arr.astype(np.int64)
+
+
+def _kernel(xs, a, b):
+    return np.maximum(0, (xs + a) * b)
+
+
+def _finish(rows, width=0):
+    """Rows of Python results -> ndarray (int64 when it fits exactly) or plain lists."""
+    if np is None:
+        return rows
+    if not rows:
+        return np.empty((0, width), dtype=np.int64)
+    flat = [v for row in rows for v in row]
+    if all(type(v) is int and -INT64_LIMIT <= v < INT64_LIMIT for v in flat):
+        return np.array(rows, dtype=np.int64).reshape(len(rows), -1)
+    out = np.empty((len(rows), len(rows[0])), dtype=object)
+    for i, row in enumerate(rows):
+        out[i, :] = row
+    return out
+
+
+# ---------------------------------------------------------
+# PUBLIC API
+# ---------------------------------------------------------
+
+def _resolve(skill):
+    if isinstance(skill, str):
+        return skills.registry.get(skill)
+    return skill
+
+
+def run_batch(skill, inputs):
+    """Results of skill.run over inputs (skill: module, object with run(), or registry name)."""
+    module = _resolve(skill)
+    params = getattr(module, "kernel_params", None)
+    if params is None and inspect.ismodule(module):
+        params = module_params(module)
+    if params is not None:
+        xs = _int_vector(inputs, [params])
+        if xs is not None:
+            return _kernel(xs, *params)
+    return _finish([[module.run(x) for x in _to_list(inputs)]])[0]
+
+
+def run_batch_all(inputs, names=None):
+    """
+    Evaluate every registered skill (or just `names`) over inputs.
+    Returns (names, matrix) with one matrix row per skill, in name order.
+    Template skills are detected from their source text and never imported.
+    """
+    registry = skills.registry
+    names = registry.names() if names is None else list(names)
+
+    params = {}
+    for name in names:
+        info = registry.info(name)
+        if info is None:
+            continue
+        if info.get("table"):
+            params[name] = registry.table.params(name)
+            continue
+        path = os.path.join(registry.directory, info["path"])
+        with open(path, "r", encoding="utf-8") as f:
+            p = template_params(f.read())
+        if p is not None:
+            params[name] = p
+
+    values = _to_list(inputs)
+    xs = _int_vector(inputs, list(params.values())) if params else None
+
+    if xs is not None and len(params) == len(names):
+        a = np.array([params[n][0] for n in names], dtype=np.int64)
+        b = np.array([params[n][1] for n in names], dtype=np.int64)
+        return names, _kernel(xs[None, :], a[:, None], b[:, None])
+
+    rows = []
+    for name in names:
+        if xs is not None and name in params:
+            rows.append(_kernel(xs, *params[name]).tolist())
+        else:
+            module = registry.get(name)
+            rows.append([module.run(x) for x in values])
+    return names, _finish(rows, len(values))
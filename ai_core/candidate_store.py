@@ -0,0 +1,200 @@
+"""
+ai_core/candidate_store.py
+Content-addressed store for candidate artifacts:
+- Skill and test bodies are zlib blobs under objects/<sha[:2]>/<sha[2:]>,
+  keyed by the sha256 of the body with the candidate name and Generated:
+  stamp factored out (fitness_cache.normalize_source), so candidates that
+  differ only in those are stored once
+- index.json maps candidate name -> {skill, test, generated, normalized,
+  level, score, created, promoted}; sources() puts name and stamp back
+- gc() drops non-promoted candidates outside the retention policy and
+  then sweeps blobs no candidate references
+"""
+
+import os
+import json
+import zlib
+import hashlib
+from datetime import datetime, timedelta
+
+from ai_core.fitness_cache import GENERATED_RE, normalize_source
+
+INDEX_NAME = "index.json"
+INDEX_VERSION = 1
+
+GENERATED_PREFIX = "Generated: "
+
+
+def split_source(text, name):
+    """(normalized body, Generated: stamp or None) of one candidate source."""
+    m = GENERATED_RE.search(text)
+    generated = m.group(0)[len(GENERATED_PREFIX):] if m else None
+    return normalize_source(text, name), generated
+
+
+def restore_source(body, name, generated):
+    """Inverse of split_source."""
+    if generated is not None:
+        body = body.replace(GENERATED_PREFIX + "<time>", GENERATED_PREFIX + generated)
+    return body.replace("<name>", name)
+
+
+class CandidateStore:
+    def __init__(self, root):
+        self.root = root
+        self.index_path = os.path.join(root, INDEX_NAME)
+        self.candidates = {}
+        self.dirty = False
+        self.load()
+
+    # -----------------------------------------------------
+    # OBJECTS
+    # -----------------------------------------------------
+
+    def _object_path(self, sha):
+        return os.path.join(self.root, sha[:2], sha[2:])
+
+    def put(self, text):
+        """Store a text body (once) and return its sha256."""
+        data = text.encode("utf-8")
+        sha = hashlib.sha256(data).hexdigest()
+        path = self._object_path(sha)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(zlib.compress(data, 9))
+            os.replace(tmp, path)
+        return sha
+
+    def get(self, sha):
+        with open(self._object_path(sha), "rb") as f:
+            return zlib.decompress(f.read()).decode("utf-8")
+
+    def has(self, sha):
+        return os.path.exists(self._object_path(sha))
+
+    def iter_objects(self):
+        """sha of every blob on disk."""
+        if not os.path.isdir(self.root):
+            return
+        for prefix in os.listdir(self.root):
+            sub = os.path.join(self.root, prefix)
+            if len(prefix) != 2 or not os.path.isdir(sub):
+                continue
+            for rest in os.listdir(sub):
+                if not rest.endswith(".tmp"):
+                    yield prefix + rest
+
+    # -----------------------------------------------------
+    # INDEX
+    # -----------------------------------------------------
+
+    def load(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        if data.get("version") == INDEX_VERSION:
+            self.candidates = data.get("candidates", {})
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "candidates": self.candidates}, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.index_path)
+        self.dirty = False
+
+    def add(self, name, skill_source, test_source, level=None, score=None, promoted=False, created=None):
+        """Record one candidate; returns its index entry."""
+        skill_body, generated = split_source(skill_source, name)
+        test_body, _ = split_source(test_source, name)
+        normalized = (restore_source(skill_body, name, generated) == skill_source
+                      and restore_source(test_body, name, generated) == test_source)
+        if not normalized:
+            # the text already held a placeholder: keep it verbatim
+            skill_body, test_body, generated = skill_source, test_source, None
+        entry = {
+            "skill": self.put(skill_body),
+            "test": self.put(test_body),
+            "generated": generated,
+            "normalized": normalized,
+            "level": level,
+            "score": score,
+            "created": created or datetime.utcnow().isoformat() + "Z",
+            "promoted": promoted,
+        }
+        self.candidates[name] = entry
+        self.dirty = True
+        return entry
+
+    def mark_promoted(self, name):
+        if name in self.candidates and not self.candidates[name]["promoted"]:
+            self.candidates[name]["promoted"] = True
+            self.dirty = True
+
+    def sources(self, name):
+        """(skill source, test source) of a stored candidate."""
+        entry = self.candidates[name]
+        skill, test = self.get(entry["skill"]), self.get(entry["test"])
+        if entry.get("normalized"):
+            skill = restore_source(skill, name, entry["generated"])
+            test = restore_source(test, name, entry["generated"])
+        return skill, test
+
+    # -----------------------------------------------------
+    # GARBAGE COLLECTION
+    # -----------------------------------------------------
+
+    def expired(self, keep_last=50, max_age_days=None, now=None):
+        """
+        Names of non-promoted candidates outside the retention policy: all
+        but the newest keep_last (None = no count limit), and any older
+        than max_age_days (None = no age limit).
+        """
+        now = now or datetime.utcnow()
+        pending = sorted(
+            (name for name, e in self.candidates.items() if not e.get("promoted")),
+            key=lambda name: self.candidates[name]["created"],
+            reverse=True
+        )
+        out = set(pending[keep_last:]) if keep_last is not None else set()
+        if max_age_days is not None:
+            cutoff = (now - timedelta(days=max_age_days)).isoformat() + "Z"
+            out.update(name for name in pending if self.candidates[name]["created"] < cutoff)
+        return sorted(out)
+
+    def gc(self, keep_last=50, max_age_days=None, now=None, dry_run=False):
+        """
+        Apply the retention policy and sweep unreferenced blobs; returns counts
+        (with dry_run, what would be removed under "would_remove").
+        """
+        drop = self.expired(keep_last, max_age_days, now)
+        live = {
+            sha
+            for name, e in self.candidates.items() if name not in drop
+            for sha in (e["skill"], e["test"])
+        }
+        dead = [sha for sha in self.iter_objects() if sha not in live]
+        freed = sum(os.path.getsize(self._object_path(sha)) for sha in dead)
+
+        if dry_run:
+            return {"would_remove": {"candidates": len(drop), "objects": len(dead)}, "bytes_would_free": freed}
+
+        for name in drop:
+            del self.candidates[name]
+        if drop:
+            self.dirty = True
+        self.save()
+        for sha in dead:
+            os.remove(self._object_path(sha))
+            try:
+                os.rmdir(os.path.dirname(self._object_path(sha)))
+            except OSError:
+                pass  # prefix dir still holds other blobs
+
+        return {"candidates_removed": len(drop), "objects_removed": len(dead), "bytes_freed": freed}
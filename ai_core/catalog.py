@@ -0,0 +1,215 @@
+"""
+ai_core/catalog.py
+Optional SQLite skill catalog (stdlib sqlite3, WAL mode):
+- Indexed by name, level and promotion time
+- Uniqueness checks, next-level computation and random sampling
+  without loading memory["skills"]
+- One-shot importer from the existing ai_memory.json (+ journal)
+- Opened with its MemoryJournal, the catalog checks a watermark of the
+  memory files (stored in the db when it is closed) and resyncs from
+  memory when something else wrote them in between
+"""
+
+import os
+import json
+import random
+import sqlite3
+
+from ai_core.journal import MemoryJournal
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS skills (
+    id          INTEGER PRIMARY KEY,
+    name        TEXT NOT NULL UNIQUE,
+    level       INTEGER NOT NULL,
+    created     TEXT,
+    promoted_at TEXT,
+    mutated_at  TEXT,
+    data        TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_skills_level ON skills(level);
+CREATE INDEX IF NOT EXISTS idx_skills_promoted_at ON skills(promoted_at);
+
+-- row count kept by triggers: COUNT(*) is a full scan in SQLite
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta (key, value) SELECT 'count', COUNT(*) FROM skills;
+CREATE TRIGGER IF NOT EXISTS skills_count_insert AFTER INSERT ON skills
+BEGIN UPDATE meta SET value = value + 1 WHERE key = 'count'; END;
+CREATE TRIGGER IF NOT EXISTS skills_count_delete AFTER DELETE ON skills
+BEGIN UPDATE meta SET value = value - 1 WHERE key = 'count'; END;
+
+CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+UPSERT = (
+    "INSERT INTO skills (name, level, created, promoted_at, mutated_at, data) "
+    "VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(name) DO UPDATE SET level=excluded.level, created=excluded.created, "
+    "promoted_at=excluded.promoted_at, mutated_at=excluded.mutated_at, data=excluded.data"
+)
+
+
+def journal_watermark(journal):
+    """Size and mtime of the memory snapshot and journal: changes with every memory write."""
+    marks = []
+    for path in (journal.snapshot_path, journal.journal_path):
+        try:
+            st = os.stat(path)
+            marks.append([st.st_size, st.st_mtime_ns])
+        except FileNotFoundError:
+            marks.append(None)
+    return json.dumps(marks)
+
+
+class SkillCatalog:
+    """
+    Skill records keyed by name; each row keeps the full memory record as
+    JSON. With a journal, the catalog is brought in line with memory on
+    open (see sync_journal) and marks itself synced on close.
+    """
+
+    def __init__(self, path, journal=None):
+        self.path = path
+        self.journal = journal
+        # one thread at a time, but not always the opening one (evolver_daemon.py)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        if journal is not None:
+            self.sync_journal()
+
+    def close(self):
+        if self.conn is None:
+            return
+        if self.journal is not None:
+            self.mark_synced()
+        self.conn.close()
+        self.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -----------------------------------------------------
+    # WRITE
+    # -----------------------------------------------------
+
+    def _row(self, record):
+        return (
+            record["name"],
+            record.get("level", 0),
+            record.get("created"),
+            record.get("promoted_at"),
+            record.get("mutated_at"),
+            json.dumps(record),
+        )
+
+    def add(self, record):
+        """Insert a skill record, replacing any previous record with the same name."""
+        self.add_many([record])
+
+    def add_many(self, records):
+        with self.conn:
+            self.conn.executemany(UPSERT, (self._row(r) for r in records))
+
+    def sync(self, records):
+        """Make the catalog hold exactly these records; returns how many rows changed."""
+        current = dict(self.conn.execute("SELECT name, data FROM skills"))
+        changed = [r for r in records if current.pop(r["name"], None) != json.dumps(r)]
+        with self.conn:
+            self.conn.executemany(UPSERT, (self._row(r) for r in changed))
+            self.conn.executemany("DELETE FROM skills WHERE name = ?", ((name,) for name in current))
+        return len(changed) + len(current)
+
+    def update(self, name, fields):
+        """Merge fields into a skill's record (same semantics as dict.update)."""
+        record = self.get(name)
+        if record is None:
+            raise KeyError(name)
+        record.update(fields)
+        self.add(record)
+        return record
+
+    # -----------------------------------------------------
+    # READ
+    # -----------------------------------------------------
+
+    def exists(self, name):
+        return self.conn.execute("SELECT 1 FROM skills WHERE name = ?", (name,)).fetchone() is not None
+
+    def get(self, name):
+        row = self.conn.execute("SELECT data FROM skills WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def count(self):
+        return self.conn.execute("SELECT value FROM meta WHERE key = 'count'").fetchone()[0]
+
+    def next_level(self):
+        """Same rule as 1 + len(memory["skills"])."""
+        return 1 + self.count()
+
+    def by_level(self, level):
+        rows = self.conn.execute("SELECT data FROM skills WHERE level = ? ORDER BY id", (level,))
+        return [json.loads(r[0]) for r in rows]
+
+    def recently_promoted(self, limit=10):
+        rows = self.conn.execute(
+            "SELECT data FROM skills WHERE promoted_at IS NOT NULL "
+            "ORDER BY promoted_at DESC LIMIT ?",
+            (limit,),
+        )
+        return [json.loads(r[0]) for r in rows]
+
+    def sample(self, rng=random):
+        """Uniformly random skill record (offset into the id index, never loads every row); None if empty."""
+        n = self.count()
+        if not n:
+            return None
+        row = self.conn.execute(
+            "SELECT data FROM skills ORDER BY id LIMIT 1 OFFSET ?",
+            (rng.randint(0, n - 1),),
+        ).fetchone()
+        return json.loads(row[0])
+
+    # -----------------------------------------------------
+    # JOURNAL WATERMARK
+    # -----------------------------------------------------
+
+    def _state(self, key):
+        row = self.conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key, value):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, value))
+
+    def sync_journal(self):
+        """
+        Resync from the journal's memory unless its files are exactly as they
+        were when the catalog was last marked synced; returns rows changed.
+        """
+        watermark = journal_watermark(self.journal)
+        if self._state("watermark") == watermark:
+            return 0
+        changed = self.sync(self.journal.load().get("skills", []))
+        self._set_state("watermark", watermark)
+        return changed
+
+    def mark_synced(self):
+        """Record the current memory files as reflected in the catalog."""
+        self._set_state("watermark", journal_watermark(self.journal))
+
+
+def import_memory(catalog, memory):
+    """Load every memory["skills"] record into the catalog; returns the count."""
+    skills = memory.get("skills", [])
+    catalog.add_many(skills)
+    return len(skills)
+
+
+def import_json(catalog, memory_path):
+    """One-shot import from an ai_memory.json file (its journal is replayed too)."""
+    return import_memory(catalog, MemoryJournal(memory_path).load())
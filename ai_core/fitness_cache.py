@@ -0,0 +1,111 @@
+"""
+ai_core/fitness_cache.py
+Persistent fitness memoization for evolver candidates:
+- Keyed by a normalized hash of skill + test source (candidate name and
+  "Generated:" timestamp stripped, and for level-parametric templates the
+  level too) and a caller-supplied test-suite context; the cached value is
+  the (passed, total, rc) outcome, scores are recomputed from it
+- Size-bounded LRU eviction, persisted as JSON in LRU order
+- hit/miss counters via stats()
+"""
+
+import os
+import re
+import json
+import hashlib
+from collections import OrderedDict
+
+CACHE_VERSION = 2
+
+GENERATED_RE = re.compile(r"^Generated: .*$", re.MULTILINE)
+
+
+def normalize_source(source, name):
+    """Source text with everything that differs between otherwise identical candidates removed."""
+    return GENERATED_RE.sub("Generated: <time>", source).replace(name, "<name>")
+
+
+def level_free(source, level):
+    """
+    normalize_source() output with the level's integer literals stripped too.
+    Only for templates whose test outcome is the same at every level.
+    """
+    return re.sub(rf"(?<![\w.]){int(level)}(?![\w.])", "<level>", source)
+
+
+def candidate_key(name, skill_source, test_source, context="", level=None):
+    """
+    Key of a candidate's test outcome. With level, sources that differ only in
+    the level (template candidates proposed at consecutive levels) share a key.
+    """
+    skill_source = normalize_source(skill_source, name)
+    test_source = normalize_source(test_source, name)
+    if level is not None:
+        skill_source, test_source = level_free(skill_source, level), level_free(test_source, level)
+    h = hashlib.sha256()
+    for part in (skill_source, test_source, context):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class FitnessCache:
+    def __init__(self, path, max_entries=10000):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        if data.get("version") == CACHE_VERSION:
+            self.entries = OrderedDict((k, v) for k, v in data.get("entries", []))
+            self._evict()
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "entries": list(self.entries.items())}, f)
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+    def _evict(self):
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.dirty = True
+
+    def get(self, key):
+        """Cached result dict (a copy), or None; counts a hit or a miss."""
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        self.dirty = True  # recency changed
+        return dict(value)
+
+    def put(self, key, value):
+        self.entries[key] = dict(value)
+        self.entries.move_to_end(key)
+        self.dirty = True
+        self._evict()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "size": len(self.entries),
+            "max_entries": self.max_entries,
+        }
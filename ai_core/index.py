@@ -0,0 +1,395 @@
+"""
+ai_core/index.py
+Local full-text index over fetched search / scrape content:
+- Documents (id, text, meta) are buffered in an in-memory segment and
+  flushed to immutable segment files: a JSON header (documents, term
+  dictionary) followed by delta-encoded uint32 postings and then the
+  document texts, read through mmap. The header holds only a digest and
+  the offset of each text; texts are read for returned hits only
+- Buffered documents are flushed at interpreter exit if the index was
+  never closed
+- Re-adding an id supersedes the older copy; superseded copies are
+  skipped at query time and dropped when their segment is merged
+- Log-structured merging: merge_factor segments of the same level at the
+  tail are merged into one segment of the next level
+- search(query) ranks live documents with BM25
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import mmap
+import atexit
+import struct
+import hashlib
+import weakref
+import threading
+from array import array
+from operator import sub
+from itertools import accumulate
+from collections import defaultdict
+
+MANIFEST_NAME = "manifest.json"
+INDEX_VERSION = 2
+MAGIC = b"AIX2"
+HEADER = struct.Struct("<4sI")
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it its of on or that the to was were what when "
+    "where which who why will with".split()
+)
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def text_digest(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+# indexes with a write buffer that may still hold documents at exit
+_OPEN = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_open_indexes():
+    for index in list(_OPEN):
+        index.flush()
+
+
+# ---------------------------------------------------------
+# SEGMENTS
+# ---------------------------------------------------------
+class MemorySegment:
+    """The write buffer: same read interface as a flushed Segment."""
+
+    name = None
+    level = 0
+
+    def __init__(self):
+        self.docs = []  # [doc_id, length, meta, text digest]
+        self.texts = []
+        self.index = defaultdict(list)  # term -> [(docnum, tf)]
+
+    def add(self, doc_id, text, meta):
+        docnum = len(self.docs)
+        tokens = tokenize(text)
+        counts = defaultdict(int)
+        for token in tokens:
+            counts[token] += 1
+        for term, tf in counts.items():
+            self.index[term].append((docnum, tf))
+        self.docs.append([doc_id, len(tokens), meta, text_digest(text)])
+        self.texts.append(text)
+        return docnum
+
+    def text(self, docnum):
+        return self.texts[docnum]
+
+    def terms(self):
+        return self.index.keys()
+
+    def postings(self, term):
+        pairs = self.index.get(term, ())
+        return [d for d, _ in pairs], [tf for _, tf in pairs]
+
+    def close(self):
+        pass
+
+
+class Segment:
+    """A flushed, immutable segment file."""
+
+    def __init__(self, path, name, level):
+        self.path = path
+        self.name = name
+        self.level = level
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, size = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not an index segment")
+        header = json.loads(self.mm[HEADER.size:HEADER.size + size].decode("utf-8"))
+        self.docs = header["docs"]  # [doc_id, length, meta, text digest, text offset, text size]
+        self.dictionary = header["terms"]  # term -> [offset, count] in uint32 units
+        self.base = HEADER.size + size
+        self.text_base = self.base + header["postings"] * 4
+
+    def terms(self):
+        return self.dictionary.keys()
+
+    def postings(self, term):
+        entry = self.dictionary.get(term)
+        if entry is None:
+            return [], []
+        offset, count = entry
+        start = self.base + offset * 4
+        arr = array("I")
+        arr.frombytes(self.mm[start:start + count * 8])
+        if sys.byteorder == "big":
+            arr.byteswap()
+        return list(accumulate(arr[:count])), arr[count:]
+
+    def text(self, docnum):
+        offset, size = self.docs[docnum][4:6]
+        start = self.text_base + offset
+        return self.mm[start:start + size].decode("utf-8")
+
+    def close(self):
+        self.mm.close()
+
+
+def write_segment(path, docs, postings, texts):
+    """docs: [doc_id, length, meta, digest]; postings: term -> (sorted docnums, tfs); texts: per doc."""
+    terms = {}
+    data = array("I")
+    for term in sorted(postings):
+        docnums, tfs = postings[term]
+        terms[term] = [len(data), len(docnums)]
+        data.append(docnums[0])
+        data.extend(map(sub, docnums[1:], docnums))  # deltas
+        data.extend(tfs)
+    if sys.byteorder == "big":
+        data.byteswap()  # segment files are little-endian
+
+    blobs = [text.encode("utf-8") for text in texts]
+    rows = []
+    offset = 0
+    for doc, blob in zip(docs, blobs):
+        rows.append(doc[:4] + [offset, len(blob)])
+        offset += len(blob)
+
+    header = json.dumps({"docs": rows, "terms": terms, "postings": len(data)},
+                        separators=(",", ":")).encode("utf-8")
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(header)))
+        f.write(header)
+        data.tofile(f)
+        f.write(b"".join(blobs))
+    os.replace(tmp, path)
+
+
+# ---------------------------------------------------------
+# INDEX
+# ---------------------------------------------------------
+class InvertedIndex:
+    def __init__(self, root, flush_docs=64, merge_factor=4, k1=1.2, b=0.75):
+        self.root = root
+        self.manifest_path = os.path.join(root, MANIFEST_NAME)
+        self.flush_docs = flush_docs
+        self.merge_factor = merge_factor
+        self.k1 = k1
+        self.b = b
+        self.next_segment = 0
+        self.segments = []
+        self.buffer = MemorySegment()
+        self.live = {}  # doc_id -> (segment, docnum) of its newest copy
+        self.total_length = 0
+        self._lock = threading.RLock()
+        self._load()
+        _OPEN.add(self)
+
+    # -----------------------------------------------------
+    # MANIFEST
+    # -----------------------------------------------------
+
+    def _load(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        if manifest.get("version") != INDEX_VERSION:
+            # an older format: its segments are rebuilt from new fetches
+            for name, _ in manifest.get("segments", []):
+                try:
+                    os.remove(os.path.join(self.root, name))
+                except OSError:
+                    pass
+            return
+        self.next_segment = manifest["next_segment"]
+        for name, level in manifest["segments"]:
+            segment = Segment(os.path.join(self.root, name), name, level)
+            self.segments.append(segment)
+            self._track(segment)
+
+    def _save_manifest(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": INDEX_VERSION,
+                "next_segment": self.next_segment,
+                "segments": [[s.name, s.level] for s in self.segments],
+            }, f, indent=1)
+        os.replace(tmp, self.manifest_path)
+
+    def _track(self, segment, start=0):
+        for docnum in range(start, len(segment.docs)):
+            doc_id, length = segment.docs[docnum][:2]
+            old = self.live.get(doc_id)
+            if old is not None:
+                self.total_length -= old[0].docs[old[1]][1]
+            self.live[doc_id] = (segment, docnum)
+            self.total_length += length
+
+    def _is_live(self, segment, docnum):
+        return self.live.get(segment.docs[docnum][0]) == (segment, docnum)
+
+    # -----------------------------------------------------
+    # WRITES
+    # -----------------------------------------------------
+
+    def add(self, doc_id, text, **meta):
+        """
+        Index (or re-index) one document; flushes once the buffer is full.
+        Returns False (and does nothing) if doc_id is live with the same text.
+        """
+        with self._lock:
+            live = self.live.get(doc_id)
+            if live is not None and live[0].docs[live[1]][3] == text_digest(text):
+                return False
+            docnum = self.buffer.add(doc_id, text, meta)
+            self._track(self.buffer, docnum)
+            if len(self.buffer.docs) >= self.flush_docs:
+                self.flush()
+            return True
+
+    def flush(self):
+        """Write the buffer as a new segment, then merge full tail levels."""
+        with self._lock:
+            if not self.buffer.docs:
+                return
+            buffer = self.buffer
+            self.buffer = MemorySegment()
+            segment = self._write([buffer], 0)
+            self._replace([buffer], segment)
+            while True:
+                tail = self.segments[-self.merge_factor:]
+                if len(tail) < self.merge_factor or any(s.level != tail[0].level for s in tail):
+                    break
+                self._replace(tail, self._write(tail, tail[0].level + 1))
+
+    def _write(self, sources, level):
+        """One segment holding the live documents of sources (oldest first)."""
+        docs = []
+        texts = []
+        remap = []
+        for segment in sources:
+            mapping = {}
+            for docnum, doc in enumerate(segment.docs):
+                if self._is_live(segment, docnum):
+                    mapping[docnum] = len(docs)
+                    docs.append(doc)
+                    texts.append(segment.text(docnum))
+            remap.append(mapping)
+
+        postings = {}
+        for segment, mapping in zip(sources, remap):
+            dense = len(mapping) == len(segment.docs)
+            base = mapping.get(0, 0)
+            for term in segment.terms():
+                docnums, tfs = segment.postings(term)
+                if dense:
+                    # nothing superseded: docnums just shift by base
+                    entry = postings.get(term)
+                    if entry is None:
+                        entry = postings[term] = ([], [])
+                    entry[0].extend([d + base for d in docnums] if base else docnums)
+                    entry[1].extend(tfs)
+                    continue
+                for docnum, tf in zip(docnums, tfs):
+                    new = mapping.get(docnum)
+                    if new is not None:
+                        entry = postings.get(term)
+                        if entry is None:
+                            entry = postings[term] = ([], [])
+                        entry[0].append(new)
+                        entry[1].append(tf)
+
+        name = f"seg-{self.next_segment:06d}.idx"
+        self.next_segment += 1
+        os.makedirs(self.root, exist_ok=True)
+        write_segment(os.path.join(self.root, name), docs, postings, texts)
+        return Segment(os.path.join(self.root, name), name, level)
+
+    def _replace(self, sources, segment):
+        """Swap sources (the tail of the segment list, or the buffer) for segment."""
+        for old in sources:
+            for docnum, (doc_id, length, *_) in enumerate(old.docs):
+                if self.live.get(doc_id) == (old, docnum):
+                    del self.live[doc_id]
+                    self.total_length -= length
+        replaced = {id(s) for s in sources}
+        self.segments = [s for s in self.segments if id(s) not in replaced] + [segment]
+        self._track(segment)
+        self._save_manifest()
+        for old in sources:
+            old.close()
+            if old.name is not None:
+                os.remove(old.path)
+
+    # -----------------------------------------------------
+    # QUERIES
+    # -----------------------------------------------------
+
+    def search(self, query, k=10):
+        """Top-k live documents for query by BM25: [{"id", "score", "text", **meta}]."""
+        terms = set(tokenize(query))
+        with self._lock:
+            n = len(self.live)
+            if not terms or not n:
+                return []
+            avgdl = self.total_length / n or 1.0
+            scores = defaultdict(float)
+            for term in terms:
+                matches = []
+                for segment in self.segments + [self.buffer]:
+                    docnums, tfs = segment.postings(term)
+                    for docnum, tf in zip(docnums, tfs):
+                        if self._is_live(segment, docnum):
+                            matches.append((segment, docnum, tf))
+                if not matches:
+                    continue
+                idf = math.log(1 + (n - len(matches) + 0.5) / (len(matches) + 0.5))
+                for segment, docnum, tf in matches:
+                    dl = segment.docs[docnum][1]
+                    norm = tf + self.k1 * (1 - self.b + self.b * dl / avgdl)
+                    scores[(segment, docnum)] += idf * tf * (self.k1 + 1) / norm
+
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+            return [
+                dict(segment.docs[docnum][2], id=segment.docs[docnum][0], score=round(score, 4),
+                     text=segment.text(docnum))
+                for (segment, docnum), score in ranked
+            ]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "documents": len(self.live),
+                "segments": len(self.segments),
+                "levels": [s.level for s in self.segments],
+                "buffered": len(self.buffer.docs),
+            }
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            for segment in self.segments:
+                segment.close()
+            self.segments = []
+            self.live = {}
+            _OPEN.discard(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
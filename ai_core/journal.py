@@ -0,0 +1,130 @@
+"""
+ai_core/journal.py
+Append-only journal backend for ai_core/ai_memory.json:
+- New run/skill events are appended as single JSONL records
+- compact() folds the journal into the JSON snapshot (atomic replace)
+- load() is snapshot + journal replay and returns the usual
+  {"runs": [...], "skills": [...]} dict
+- Optional retention policies (ai_core/retention.py) are applied to their
+  lists at each compaction, so old events are rolled up and archived
+"""
+
+import os
+import json
+
+
+def _apply(memory, record):
+    op = record.get("op")
+    items = memory.setdefault(record["key"], [])
+    if op == "append":
+        items.append(record["value"])
+    elif op == "update":
+        match = record["match"]
+        for item in items:
+            if all(item.get(k) == v for k, v in match.items()):
+                item.update(record["set"])
+
+
+class MemoryJournal:
+    """
+    Snapshot file plus a JSONL journal of events recorded since the last
+    compaction. Appends cost O(1) I/O; the journal is folded into the
+    snapshot once it holds `compact_every` records (or on compact()).
+    """
+
+    def __init__(self, snapshot_path, journal_path=None, compact_every=500, indent=2, retention=None):
+        self.snapshot_path = snapshot_path
+        self.retention = retention or {}  # key -> retention.Retention
+        self.journal_path = journal_path or os.path.splitext(snapshot_path)[0] + ".journal.jsonl"
+        self.compact_every = compact_every
+        self.indent = indent
+        self._pending = None
+
+    # -----------------------------------------------------
+    # READ
+    # -----------------------------------------------------
+
+    def _records(self):
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return []
+
+        records = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # a torn final line from an interrupted append
+                continue
+        return records
+
+    def load(self):
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                memory = json.load(f)
+        except FileNotFoundError:
+            memory = {"runs": [], "skills": []}
+
+        records = self._records()
+        for record in records:
+            _apply(memory, record)
+        self._pending = len(records)
+        return memory
+
+    def pending(self):
+        """Number of journal records not yet folded into the snapshot."""
+        if self._pending is None:
+            self._pending = len(self._records())
+        return self._pending
+
+    # -----------------------------------------------------
+    # WRITE
+    # -----------------------------------------------------
+
+    def _write(self, record):
+        pending = self.pending()  # counted before the append, so the new record is not counted twice
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+        with open(self.journal_path, "a+b") as f:
+            # a crash mid-append leaves a torn last line: end it so this record
+            # starts on its own line instead of being glued onto the fragment
+            if f.seek(0, os.SEEK_END):
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = b"\n" + line
+            f.write(line)
+        self._pending = pending + 1
+        if self.compact_every and self._pending >= self.compact_every:
+            self.compact()
+
+    def append(self, key, value):
+        """Record memory[key].append(value)."""
+        self._write({"op": "append", "key": key, "value": value})
+
+    def update(self, key, match, fields):
+        """Record item.update(fields) for every item in memory[key] matching all of `match`."""
+        self._write({"op": "update", "key": key, "match": match, "set": fields})
+
+    def compact(self, memory=None):
+        """Write `memory` (default: snapshot + journal) as the new snapshot and empty the journal."""
+        if memory is None:
+            memory = self.load()
+        for key, policy in self.retention.items():
+            policy.apply(memory, key)
+
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(memory, f, indent=self.indent)
+        os.replace(tmp, self.snapshot_path)
+
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._pending = 0
+        return memory
+
+    # full-rewrite compatibility with the old save_memory()
+    save = compact
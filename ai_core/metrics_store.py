@@ -0,0 +1,255 @@
+"""
+ai_core/metrics_store.py
+Append-only columnar store of candidate evaluations:
+- One raw little-endian file per column (<name>.col, fixed-width typed
+  values) plus schema.json holding the committed row count and the string
+  dictionaries (personality names are stored as small integer codes)
+- Appends are buffered in typed arrays and written on flush(); the row
+  count in schema.json is replaced last, so a torn append is ignored (and
+  truncated away by the next writer)
+- Columns are read through mmap without copying: NumPy arrays when NumPy
+  is installed, memoryviews otherwise
+- Aggregations: mean score per generation, pass rate by personality,
+  percentiles of any column (vectorized with NumPy, pure Python otherwise)
+"""
+
+import os
+import sys
+import json
+import mmap
+import time
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+SCHEMA_NAME = "schema.json"
+STORE_VERSION = 1
+
+COLUMNS = (
+    ("time", "d"),         # unix seconds
+    ("run", "q"),          # one id per evolver invocation
+    ("generation", "i"),   # 0 = initial / single-generation evaluation
+    ("level", "i"),
+    ("passed", "i"),
+    ("total", "i"),
+    ("rc", "i"),
+    ("score", "d"),
+    ("personality", "i"),  # code into dictionaries["personality"]
+    ("cached", "b"),       # fitness-cache hit
+)
+DICTIONARY_COLUMNS = ("personality",)
+
+NUMPY_TYPES = {"d": "<f8", "q": "<i8", "i": "<i4", "b": "i1"}
+
+
+class MetricsStore:
+    def __init__(self, root):
+        self.root = root
+        self.schema_path = os.path.join(root, SCHEMA_NAME)
+        self.types = dict(COLUMNS)
+        self.rows = 0
+        self.dictionaries = {name: [] for name in DICTIONARY_COLUMNS}
+        self.buffer = {name: array(code) for name, code in COLUMNS}
+        self._load()
+        self._codes = {name: {v: i for i, v in enumerate(values)} for name, values in self.dictionaries.items()}
+        self._views = {}
+        self.run = int(self._last("run", -1)) + 1
+        self._run_used = False
+
+    # -----------------------------------------------------
+    # SCHEMA
+    # -----------------------------------------------------
+
+    def _col_path(self, name):
+        return os.path.join(self.root, f"{name}.col")
+
+    def _load(self):
+        try:
+            with open(self.schema_path, "r", encoding="utf-8") as f:
+                schema = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        if schema.get("version") != STORE_VERSION:
+            return
+        self.rows = schema["rows"]
+        self.dictionaries.update(schema.get("dictionaries", {}))
+
+    def _save_schema(self):
+        tmp = self.schema_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": STORE_VERSION,
+                "columns": [list(c) for c in COLUMNS],
+                "rows": self.rows,
+                "dictionaries": self.dictionaries,
+            }, f, indent=1)
+        os.replace(tmp, self.schema_path)
+
+    # -----------------------------------------------------
+    # WRITES
+    # -----------------------------------------------------
+
+    def code(self, column, value):
+        """Integer code of a dictionary-encoded string value (added on first use)."""
+        codes = self._codes[column]
+        if value not in codes:
+            codes[value] = len(self.dictionaries[column])
+            self.dictionaries[column].append(value)
+        return codes[value]
+
+    def append(self, generation=0, level=0, passed=0, total=0, rc=0, score=0.0,
+               personality="", cached=False, run=None, t=None):
+        buf = self.buffer
+        buf["time"].append(t if t is not None else time.time())
+        buf["run"].append(self.run if run is None else run)
+        self._run_used = self._run_used or run is None
+        buf["generation"].append(generation)
+        buf["level"].append(level)
+        buf["passed"].append(passed)
+        buf["total"].append(total)
+        buf["rc"].append(rc)
+        buf["score"].append(score)
+        buf["personality"].append(self.code("personality", personality))
+        buf["cached"].append(1 if cached else 0)
+
+    def new_run(self):
+        """Move on to the next run id, unless nothing was recorded under the current one."""
+        if self._run_used:
+            self.flush()
+            self.run = max(self.run, int(self._last("run", -1))) + 1
+            self._run_used = False
+        return self.run
+
+    def record(self, candidate, personality, generation=0, cached=False):
+        """append() for an evaluated candidate / individual dict."""
+        self.append(generation, candidate.get("level", 0), candidate["passed"], candidate["total"],
+                    candidate["rc"], candidate["score"], personality.get("type", ""), cached)
+
+    def flush(self):
+        added = len(self.buffer["time"])
+        if not added:
+            return 0
+        os.makedirs(self.root, exist_ok=True)
+        for name, code in COLUMNS:
+            data = self.buffer[name]
+            if sys.byteorder == "big":
+                data.byteswap()  # column files are little-endian
+            with open(self._col_path(name), "ab") as f:
+                f.truncate(self.rows * data.itemsize)  # drop a torn earlier append
+                data.tofile(f)
+            self.buffer[name] = array(code)
+        self.rows += added
+        self._save_schema()
+        self._views = {}
+        return added
+
+    # -----------------------------------------------------
+    # READS
+    # -----------------------------------------------------
+
+    def column(self, name):
+        """The committed values of a column, memory-mapped (NumPy array or memoryview)."""
+        view = self._views.get(name)
+        if view is not None:
+            return view
+        code = self.types[name]
+        size = self.rows * array(code).itemsize
+        if not size:
+            view = np.empty(0, NUMPY_TYPES[code]) if np is not None else array(code)
+        else:
+            with open(self._col_path(name), "rb") as f:
+                mm = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+            if np is not None:
+                view = np.frombuffer(mm, dtype=NUMPY_TYPES[code], count=self.rows)
+            elif sys.byteorder == "big":
+                view = array(code, mm[:size])
+                view.byteswap()
+            else:
+                view = memoryview(mm).cast(code)
+        self._views[name] = view
+        return view
+
+    def _last(self, name, default):
+        return self.column(name)[self.rows - 1] if self.rows else default
+
+    def __len__(self):
+        return self.rows
+
+    # -----------------------------------------------------
+    # AGGREGATIONS
+    # -----------------------------------------------------
+
+    def _selected(self, run=None):
+        """Row mask (NumPy) / index list (pure Python) for one run, or None for all rows."""
+        if run is None:
+            return None
+        runs = self.column("run")
+        if np is not None:
+            return runs == run
+        return [i for i in range(self.rows) if runs[i] == run]
+
+    def _values(self, name, selected):
+        col = self.column(name)
+        if selected is None:
+            return col
+        if np is not None:
+            return col[selected]
+        return [col[i] for i in selected]
+
+    def _grouped(self, key, values, selected):
+        """{key: (sum of values, row count)} over the selected rows."""
+        keys = self._values(key, selected)
+        vals = self._values(values, selected)
+        if np is not None:
+            groups, inverse = np.unique(keys, return_inverse=True)
+            sums = np.bincount(inverse, weights=vals, minlength=len(groups))
+            counts = np.bincount(inverse, minlength=len(groups))
+            return {int(g): (float(s), int(n)) for g, s, n in zip(groups, sums, counts)}
+        out = {}
+        for k, v in zip(keys, vals):
+            s, n = out.get(k, (0, 0))
+            out[k] = (s + v, n + 1)
+        return out
+
+    def mean_score_by_generation(self, run=None):
+        """{generation: mean candidate score}, over all runs or one run."""
+        return {g: s / n for g, (s, n) in sorted(self._grouped("generation", "score", self._selected(run)).items())}
+
+    def pass_rate_by_personality(self, run=None):
+        """{personality: passed tests / total tests}."""
+        selected = self._selected(run)
+        passed = self._grouped("personality", "passed", selected)
+        totals = self._grouped("personality", "total", selected)
+        names = self.dictionaries["personality"]
+        return {
+            names[code]: (passed[code][0] / totals[code][0] if totals[code][0] else 0.0)
+            for code in sorted(passed)
+        }
+
+    def percentiles(self, name="score", qs=(50, 90, 99), run=None):
+        """{q: value} with linear interpolation (NumPy's default method)."""
+        values = self._values(name, self._selected(run))
+        if not len(values):
+            return {q: None for q in qs}
+        if np is not None:
+            return {q: float(v) for q, v in zip(qs, np.percentile(values, qs))}
+        ordered = sorted(values)
+        out = {}
+        for q in qs:
+            pos = (len(ordered) - 1) * q / 100
+            lo = int(pos)
+            hi = min(lo + 1, len(ordered) - 1)
+            out[q] = ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+        return out
+
+    def summary(self, run=None):
+        return {
+            "rows": self.rows,
+            "runs": self.run,
+            "mean_score_by_generation": self.mean_score_by_generation(run),
+            "pass_rate_by_personality": self.pass_rate_by_personality(run),
+            "score_percentiles": self.percentiles("score", run=run),
+        }
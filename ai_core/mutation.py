@@ -1,2 +1,392 @@
+"""
+ai_core/mutation.py
+AST-based mutation of skill modules:
+- A skill's source is parsed once (LRU-cached); mutants are edit lists
+  against that shared tree, so n variants cost n compiles and no re-parsing
+- Operators: constant perturbation, operator swap, expression insertion,
+  applied inside the skill's run() by default
+- Mutant.code is a compiled module code object (the runner executes it
+  directly); Mutant.source() splices the edits into the original text by
+  node position, keeping comments and layout
+- relabel() retargets a template skill's name/level through the same
+  positional edits instead of text replacement
+"""
+
+import re
+import ast
+import json
+import random
+import hashlib
+import functools
+
+# parsed trees kept for reuse (LRU); a long-running daemon sees an unbounded stream of sources
+TREE_CACHE_SIZE = 256
+
+
+@functools.lru_cache(maxsize=TREE_CACHE_SIZE)
+def parse(source):
+    """Parsed module for source, cached (LRU). Treat the tree as read-only."""
+    return ast.parse(source)
+
+
+def mutate_level(level, rng=random):
+    # small random step, biased upwards, never below level 1
+    return max(1, level + rng.choice((-1, 1, 1, 2)))
+
+
+# ---------------------------------------------------------
+# EDITS
+# ---------------------------------------------------------
+
+class Edit:
+    """Replace one child (parent.field[index]) with a new node."""
+
+    __slots__ = ("parent", "field", "index", "old", "new", "label")
+
+    def __init__(self, parent, field, index, old, new, label):
+        self.parent = parent
+        self.field = field
+        self.index = index
+        self.old = old
+        self.new = ast.fix_missing_locations(ast.copy_location(new, old))
+        self.label = label
+
+    def _set(self, node):
+        if self.index is None:
+            setattr(self.parent, self.field, node)
+        else:
+            getattr(self.parent, self.field)[self.index] = node
+
+    def apply(self):
+        self._set(self.new)
+
+    def revert(self):
+        self._set(self.old)
+
+    def span(self):
+        n = self.old
+        return (n.lineno, n.col_offset), (n.end_lineno, n.end_col_offset)
+
+    def __repr__(self):
+        return f"<edit {self.label} @{self.old.lineno}:{self.old.col_offset}>"
+
+
+def _links(tree):
+    """node -> (parent, field, index) for every expression node."""
+    links = {}
+    for parent in ast.walk(tree):
+        for field, value in ast.iter_fields(parent):
+            if isinstance(value, ast.expr):
+                links[value] = (parent, field, None)
+            elif isinstance(value, list):
+                for i, item in enumerate(value):
+                    if isinstance(item, ast.expr):
+                        links[item] = (parent, field, i)
+    return links
+
+
+def _overlaps(a, b):
+    (a0, a1), (b0, b1) = a.span(), b.span()
+    return a0 < b1 and b0 < a1
+
+
+def splice(source, edits):
+    """Source text with each edit's old node replaced by its new node's text."""
+    lines = source.encode("utf-8").splitlines(keepends=True)
+    starts = [0]
+    for line in lines:
+        starts.append(starts[-1] + len(line))
+    data = b"".join(lines)
+
+    out = data
+    # col offsets are utf-8 byte offsets; apply back to front
+    for edit in sorted(edits, key=lambda e: e.span(), reverse=True):
+        (l0, c0), (l1, c1) = edit.span()
+        a, b = starts[l0 - 1] + c0, starts[l1 - 1] + c1
+        text = _render(edit.new).encode("utf-8")
+        out = out[:a] + text + out[b:]
+    return out.decode("utf-8")
+
+
+def _render(node):
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        if "\n" in node.value:
+            return '"""' + node.value.replace("\\", "\\\\").replace('"""', '\\"\\"\\"') + '"""'
+        return json.dumps(node.value, ensure_ascii=False)  # double quotes, like the templates
+    text = ast.unparse(node)
+    return f"({text})" if isinstance(node, (ast.BinOp, ast.BoolOp, ast.Compare, ast.IfExp)) else text
+
+
+# ---------------------------------------------------------
+# OPERATORS
+# ---------------------------------------------------------
+
+def _is_number(node):
+    return isinstance(node, ast.Constant) and type(node.value) in (int, float)
+
+
+class ConstantPerturbation:
+    name = "constant"
+
+    def __init__(self, steps=(-2, -1, 1, 2), scale=0.1):
+        self.steps = steps
+        self.scale = scale
+
+    def sites(self, nodes):
+        return [n for n in nodes if _is_number(n)]
+
+    def mutate(self, node, rng):
+        if type(node.value) is int:
+            value = node.value + rng.choice(self.steps)
+        else:
+            value = node.value * (1 + rng.choice((-self.scale, self.scale)))
+        return ast.Constant(value), f"constant {node.value!r}->{value!r}"
+
+
+class OperatorSwap:
+    name = "operator"
+
+    SWAPS = {
+        ast.Add: (ast.Sub, ast.Mult),
+        ast.Sub: (ast.Add,),
+        ast.Mult: (ast.Add, ast.FloorDiv),
+        ast.FloorDiv: (ast.Mult,),
+    }
+
+    def sites(self, nodes):
+        return [n for n in nodes if isinstance(n, ast.BinOp) and type(n.op) in self.SWAPS]
+
+    def mutate(self, node, rng):
+        op = rng.choice(self.SWAPS[type(node.op)])()
+        new = ast.BinOp(left=node.left, op=op, right=node.right)
+        return new, f"operator {type(node.op).__name__}->{type(op).__name__}"
+
+
+class ExpressionInsertion:
+    name = "insert"
+
+    def __init__(self, ops=(ast.Add, ast.Mult), constants=(1, 2, 3)):
+        self.ops = ops
+        self.constants = constants
+
+    def sites(self, nodes):
+        return [n for n in nodes if isinstance(n, (ast.Name, ast.BinOp)) and isinstance(getattr(n, "ctx", ast.Load()), ast.Load)]
+
+    def mutate(self, node, rng):
+        op, c = rng.choice(self.ops)(), rng.choice(self.constants)
+        new = ast.BinOp(left=node, op=op, right=ast.Constant(c))
+        return new, f"insert {type(op).__name__} {c}"
+
+
+OPERATORS = {
+    "constant": ConstantPerturbation,
+    "operator": OperatorSwap,
+    "insert": ExpressionInsertion,
+}
+DEFAULT_OPERATORS = ("constant", "operator", "insert")
+
+
+# ---------------------------------------------------------
+# ENGINE
+# ---------------------------------------------------------
+
+class Mutant:
+    def __init__(self, engine, edits, code, level=None, lineage=None):
+        self.engine = engine
+        self.edits = edits
+        self.code = code
+        self.level = level
+        self.lineage = edits if lineage is None else lineage  # random edits (derive)
+
+    @property
+    def labels(self):
+        return [e.label for e in self.edits]
+
+    @property
+    def key(self):
+        """
+        Identity of this variant without unparsing: the engine identity, the
+        target level and the random edits (retarget edits follow from those).
+        """
+        h = hashlib.sha256(f"{self.engine.identity}\0{self.level}\0".encode())
+        for e in self.lineage:
+            h.update(f"{e.span()}:{ast.dump(e.new)}\n".encode())
+        return h.hexdigest()
+
+    def source(self):
+        return splice(self.engine.source, self.edits)
+
+
+class MutationEngine:
+    """
+    Mutants of one skill source. The source is parsed once; every variant
+    is a list of Edits applied to the shared tree just long enough to
+    compile it.
+    """
+
+    def __init__(self, source, operators=DEFAULT_OPERATORS, rng=random, functions=("run",),
+                 filename="<mutant>", identity=None):
+        self.source = source
+        self.digest = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        self.identity = identity or self.digest  # e.g. a hash of the name-normalized source
+        self.tree = parse(source)
+        self.rng = rng
+        self.filename = filename
+        self.operators = [OPERATORS[op]() if isinstance(op, str) else op for op in operators]
+        self.links = _links(self.tree)
+
+        scope = [
+            node for node in self.tree.body
+            if isinstance(node, ast.FunctionDef) and (functions is None or node.name in functions)
+        ]
+        self.nodes = [
+            n for fn in scope for stmt in _body(fn) for n in ast.walk(stmt)
+            if n in self.links and not _is_callee(n, self.links)
+        ]
+        self.sites = {op.name: op.sites(self.nodes) for op in self.operators}
+
+    def compile(self, edits=()):
+        """Code object of the tree with edits applied (the shared tree is restored afterwards)."""
+        applied = []
+        try:
+            for edit in edits:
+                edit.apply()
+                applied.append(edit)
+            return compile(self.tree, self.filename, "exec")
+        finally:
+            for edit in reversed(applied):
+                edit.revert()
+
+    def edit(self, node, new, label):
+        parent, field, index = self.links[node]
+        return Edit(parent, field, index, node, new, label)
+
+    def random_edits(self, count=1, exclude=()):
+        """Up to count random, non-overlapping edits from the configured operators."""
+        ops = [op for op in self.operators if self.sites[op.name]]
+        edits = list(exclude)
+        for _ in range(count * 4):  # a few retries for overlapping picks
+            if len(edits) - len(exclude) >= count or not ops:
+                break
+            op = self.rng.choice(ops)
+            node = self.rng.choice(self.sites[op.name])
+            new, label = op.mutate(node, self.rng)
+            candidate = self.edit(node, new, f"{op.name}: {label}")
+            if not any(_overlaps(candidate, e) for e in edits):
+                edits.append(candidate)
+        return edits[len(exclude):]
+
+    def mutant(self, edits):
+        return Mutant(self, list(edits), self.compile(edits))
+
+    def derive(self, lineage, level, new_level, count=0):
+        """
+        Mutant for a descendant: the inherited random edits (lineage) plus
+        count new ones, retargeted from the source's own level to new_level.
+        """
+        lineage = list(lineage) + (self.random_edits(count, lineage) if count else [])
+        edits = self.lineage_edits(lineage, level, new_level)
+        return Mutant(self, edits, self.compile(edits), new_level, lineage)
+
+    def lineage_edits(self, lineage, level, new_level, name=None, new_name=None):
+        """Retarget edits (those not shadowed by a lineage edit) plus the lineage."""
+        retarget = [
+            e for e in self.retarget(level, new_level, name, new_name)
+            if not any(_overlaps(e, r) for r in lineage)
+        ]
+        return retarget + list(lineage)
+
+    def variants(self, n, edits_per_variant=1, base_edits=()):
+        """n compiled mutants, each base_edits plus random operator edits."""
+        out = []
+        for _ in range(n):
+            edits = list(base_edits) + self.random_edits(edits_per_variant, base_edits)
+            out.append(self.mutant(edits))
+        return out
+
+    def retarget(self, level, new_level, name=None, new_name=None):
+        """
+        Edits moving a template skill from level to new_level (and optionally
+        renaming it): the docstring's Level/skill lines, info()'s name,
+        level and desc, and every run() constant equal to the old level.
+        """
+        edits = []
+        doc = _docstring_node(self.tree)
+        if doc is not None:
+            value = _relabel_text(doc.value, level, new_level, name, new_name, docstring=True)
+            if value != doc.value:
+                edits.append(self.edit(doc, ast.Constant(value), "relabel docstring"))
+
+        info = _find_function(self.tree, "info")
+        ret = next((n for n in ast.walk(info) if isinstance(n, ast.Return)), None) if info else None
+        if ret is not None and isinstance(ret.value, ast.Dict):
+            for key, value in zip(ret.value.keys, ret.value.values):
+                if not (isinstance(key, ast.Constant) and isinstance(value, ast.Constant)):
+                    continue
+                if key.value == "level" and value.value == level:
+                    edits.append(self.edit(value, ast.Constant(new_level), "relabel info level"))
+                elif key.value == "name" and new_name is not None:
+                    edits.append(self.edit(value, ast.Constant(new_name), "relabel info name"))
+                elif key.value == "desc" and isinstance(value.value, str):
+                    desc = _relabel_text(value.value, level, new_level, name, new_name)
+                    if desc != value.value:
+                        edits.append(self.edit(value, ast.Constant(desc), "relabel info desc"))
+
+        if new_level != level:
+            for node in self.nodes:
+                if isinstance(node, ast.Constant) and type(node.value) is int and node.value == level:
+                    edits.append(self.edit(node, ast.Constant(new_level), f"level {level}->{new_level}"))
+        return edits
+
+
+def _is_callee(node, links):
+    parent, field, _ = links[node]
+    return isinstance(parent, ast.Call) and field == "func"
+
+
+def _body(fn):
+    body = fn.body
+    if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+            and isinstance(body[0].value.value, str):
+        return body[1:]  # docstring
+    return body
+
+
+def _find_function(tree, name):
+    return next((n for n in tree.body if isinstance(n, ast.FunctionDef) and n.name == name), None)
+
+
+def _docstring_node(tree):
+    if tree.body and isinstance(tree.body[0], ast.Expr) and isinstance(tree.body[0].value, ast.Constant) \
+            and isinstance(tree.body[0].value.value, str):
+        return tree.body[0].value
+    return None
+
+
+def _relabel_text(text, level, new_level, name, new_name, docstring=False):
+    """Template metadata inside one string literal (docstring or desc) moved to new_level/new_name."""
+    if docstring:
+        text = re.sub(rf"^Level: {level}$", f"Level: {new_level}", text, flags=re.MULTILINE)
+        if name is not None and new_name is not None:
+            text = re.sub(rf"^Auto-generated skill: {re.escape(name)}$",
+                          f"Auto-generated skill: {new_name}", text, flags=re.MULTILINE)
+    # "Auto-generated skill <name> (Level: <level>)" descriptions
+    text = text.replace(f"(Level: {level})", f"(Level: {new_level})")
+    if name is not None and new_name is not None:
+        text = text.replace(f"skill {name} ", f"skill {new_name} ")
+    return text
+
+
+# ---------------------------------------------------------
+# CONVENIENCE
+# ---------------------------------------------------------
+
+def relabel(source, level, new_level, name=None, new_name=None):
+    """Source of a template skill moved to new_level (and new_name), layout preserved."""
+    engine = MutationEngine(source, operators=())
+    edits = engine.retarget(level, new_level, name, new_name)
+    return splice(source, edits) if edits else source
+
+
 def minor_mutation(code, level):
-    return code.replace(f'Level: {level}', f'Level: {max(1, level+1)}')
+    return relabel(code, level, max(1, level + 1))
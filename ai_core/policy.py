@@ -0,0 +1,132 @@
+"""
+ai_core/policy.py
+Domain policy for ai_core.search.safe_scrape:
+- Matches the URL's host (never its path or query) against allow / deny
+  rules; a rule for "example.com" also covers every subdomain
+- One hashed lookup per host label, so the cost does not depend on how
+  many domains the lists hold; the most specific rule wins and allow
+  beats deny at the same domain
+- Lists load from plain text files (one domain per line, "#" comments,
+  hosts-file lines accepted) and are cached as JSON next to the list,
+  reused while the list's size and mtime are unchanged
+"""
+
+import os
+import json
+from urllib.parse import urlsplit
+
+CACHE_VERSION = 2
+CACHE_SUFFIX = ".policy.json"
+
+ALLOW = True
+DENY = False
+
+
+def normalize_domain(domain):
+    """Lowercase, IDNA-encoded domain without wildcard prefix or trailing dot."""
+    domain = domain.strip().lower().rstrip(".")
+    if domain.startswith("*."):
+        domain = domain[2:]
+    domain = domain.lstrip(".")
+    try:
+        return domain.encode("idna").decode("ascii")
+    except UnicodeError:
+        return domain
+
+
+def host_of(url):
+    """Normalized host of a URL (or of a bare host), None if it has none."""
+    if "//" not in url:
+        url = "//" + url
+    try:
+        host = urlsplit(url.strip()).hostname  # lowercased, port stripped
+    except ValueError:
+        return None
+    return normalize_domain(host) if host else None
+
+
+def read_domains(path):
+    """Domains listed in a text file: one per line, "#" comments, hosts-file format accepted."""
+    domains = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].split()
+            if line:
+                domains.append(normalize_domain(line[-1]))
+    return [d for d in domains if d]
+
+
+def _signature(path):
+    st = os.stat(path)
+    return [CACHE_VERSION, st.st_size, st.st_mtime_ns]
+
+
+def load_domains(path):
+    """read_domains() through the precompiled cache next to the file."""
+    cache_path = path + CACHE_SUFFIX
+    signature = _signature(path)
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("signature") == signature:
+            return frozenset(cached["domains"])
+    except (OSError, AttributeError, KeyError, TypeError, ValueError):
+        pass
+
+    domains = frozenset(read_domains(path))
+    try:
+        tmp = cache_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"signature": signature, "domains": sorted(domains)}, f, separators=(",", ":"))
+        os.replace(tmp, cache_path)
+    except OSError:
+        pass  # read-only location: just parse again next time
+    return domains
+
+
+class DomainPolicy:
+    def __init__(self, deny=(), allow=(), default=ALLOW):
+        self.default = default
+        self.rules = {}
+        self.add(deny, DENY)
+        self.add(allow, ALLOW)
+
+    @classmethod
+    def from_files(cls, deny_path=None, allow_path=None, default=ALLOW, deny=(), allow=()):
+        """Policy from list files (cached), plus any inline deny / allow domains."""
+        policy = cls(deny, allow, default)
+        if deny_path:
+            policy._extend(load_domains(deny_path), DENY)
+        if allow_path:
+            policy._extend(load_domains(allow_path), ALLOW)
+        return policy
+
+    def add(self, domains, verdict):
+        self._extend({normalize_domain(d) for d in domains} - {""}, verdict)
+
+    def _extend(self, domains, verdict):
+        # domains are already normalized; an ALLOW rule is never downgraded
+        if verdict is DENY:
+            domains = [d for d in domains if d not in self.rules]
+        self.rules.update(dict.fromkeys(domains, verdict))
+
+    def verdict(self, host):
+        """ALLOW / DENY for a normalized host: its most specific matching rule, or the default."""
+        rules = self.rules
+        i = 0
+        while True:
+            verdict = rules.get(host[i:])
+            if verdict is not None:
+                return verdict
+            i = host.find(".", i) + 1
+            if not i:
+                return self.default
+
+    def allowed(self, url):
+        host = host_of(url)
+        if host is None:
+            return self.default
+        return self.verdict(host)
+
+    def __len__(self):
+        return len(self.rules)
@@ -0,0 +1,205 @@
+"""
+ai_core/registry.py
+Lazy skill registry backed by a persisted manifest:
+- The manifest (name, level, path, mtime, size, sha256 per skill) lives
+  next to the directory (skills.manifest.json), so writing it never bumps
+  the directory mtime, and is rebuilt only when the directory changes
+- Listing, level lookups and info never import a skill module
+- Modules are imported on first get(name)
+- Template skills packed into the skill table (ai_core/skill_table.py)
+  are served from there; a module of the same name takes precedence
+"""
+
+import os
+import re
+import json
+import hashlib
+import importlib
+
+MANIFEST_SUFFIX = ".manifest.json"
+MANIFEST_VERSION = 1
+
+LEVEL_RE = re.compile(rb"^Level:\s*(\d+)", re.MULTILINE)
+
+
+def read_skill_info(path):
+    """Manifest entry for one skill file, parsed from its text (no import)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    st = os.stat(path)
+    m = LEVEL_RE.search(data)
+    return {
+        "name": os.path.basename(path)[:-3],
+        "level": int(m.group(1)) if m else None,
+        "path": os.path.basename(path),
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "sha256": hashlib.sha256(data).hexdigest(),
+    }
+
+
+class SkillRegistry:
+    """Skill modules of one package directory, listed from the manifest and imported lazily."""
+
+    def __init__(self, package, directory, table_path=None, manifest_path=None):
+        self.package = package
+        self.directory = directory
+        self.manifest_path = manifest_path or os.path.normpath(directory) + MANIFEST_SUFFIX
+        self.table_path = table_path
+        self._infos = None
+        self._levels = None
+        self._dir_mtime = None
+        self._table = None
+        self._table_mtime = None
+        self._table_infos = {}
+        self._table_skills = {}
+
+    # -----------------------------------------------------
+    # MANIFEST
+    # -----------------------------------------------------
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if data.get("version") != MANIFEST_VERSION:
+            return None
+        return data
+
+    def _save_manifest(self):
+        data = {"version": MANIFEST_VERSION, "dir_mtime_ns": self._dir_mtime, "skills": self._infos}
+        tmp = self.manifest_path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.manifest_path)
+        except OSError:
+            pass  # read-only checkout: keep the in-memory view
+
+    def _scan(self, previous):
+        infos = {}
+        for entry in os.scandir(self.directory):
+            fn = entry.name
+            if not fn.endswith(".py") or fn.startswith("_") or not entry.is_file():
+                continue
+            name = fn[:-3]
+            st = entry.stat()
+            old = previous.get(name)
+            if old and old["mtime_ns"] == st.st_mtime_ns and old["size"] == st.st_size:
+                infos[name] = old
+            else:
+                infos[name] = read_skill_info(entry.path)
+        return infos
+
+    def _refresh_table(self):
+        try:
+            mtime = os.stat(self.table_path).st_mtime_ns if self.table_path else None
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._table_mtime:
+            return
+        self._table_mtime = mtime
+        self._table = None
+        self._table_infos = {}
+        self._table_skills = {}
+        self._levels = None
+        if mtime is None:
+            return
+        from ai_core.skill_table import SkillTable
+        self._table = SkillTable(self.table_path)
+        for name, level in zip(self._table.names, self._table.levels):
+            self._table_infos[name] = {"name": name, "level": level, "path": None, "table": True}
+
+    @property
+    def table(self):
+        """SkillTable of packed template skills, or None when there is none."""
+        self._ensure()
+        return self._table
+
+    def refresh(self, force=False):
+        """Re-read the manifest, rescanning the directory only if its mtime changed (or force)."""
+        self._refresh_table()
+        dir_mtime = os.stat(self.directory).st_mtime_ns
+        if self._infos is not None and self._dir_mtime == dir_mtime and not force:
+            return
+
+        manifest = self._load_manifest()
+        previous = manifest["skills"] if manifest else {}
+        if manifest and manifest.get("dir_mtime_ns") == dir_mtime and not force:
+            self._infos = previous
+            self._dir_mtime = dir_mtime
+        else:
+            self._infos = self._scan(previous)
+            self._dir_mtime = dir_mtime
+            self._save_manifest()
+        self._levels = None
+
+    def update(self, name):
+        """Re-read one skill after an in-place rewrite (which leaves the directory mtime alone)."""
+        self._ensure()
+        self._refresh_table()  # a rewritten table row
+        path = os.path.join(self.directory, f"{name}.py")
+        if os.path.exists(path):
+            self._infos[name] = read_skill_info(path)
+        else:
+            self._infos.pop(name, None)
+        self._levels = None
+        self._save_manifest()
+
+    def _ensure(self):
+        if self._infos is None:
+            self.refresh()
+
+    # -----------------------------------------------------
+    # LOOKUPS
+    # -----------------------------------------------------
+
+    def _all_infos(self):
+        self._ensure()
+        if not self._table_infos:
+            return self._infos
+        return {**self._table_infos, **self._infos}
+
+    def names(self):
+        return sorted(self._all_infos())
+
+    def info(self, name):
+        return self._all_infos().get(name)
+
+    def iter_infos(self):
+        """Manifest (and table) entries in name order; imports nothing."""
+        infos = self._all_infos()
+        for name in sorted(infos):
+            yield infos[name]
+
+    def by_level(self, level):
+        infos = self._all_infos()
+        if self._levels is None:
+            self._levels = {}
+            for name in sorted(infos):
+                self._levels.setdefault(infos[name]["level"], []).append(infos[name])
+        return list(self._levels.get(level, []))
+
+    def get(self, name):
+        """
+        Import (once) and return a skill module, or the TableSkill of a packed
+        row; KeyError if there is no such skill.
+        """
+        self._ensure()
+        if name not in self._infos and name not in self._table_infos:
+            self.refresh()
+        if name in self._infos:
+            return importlib.import_module(f"{self.package}.{name}")
+        if name in self._table_infos:
+            if name not in self._table_skills:
+                self._table_skills[name] = self._table.skill(name)
+            return self._table_skills[name]
+        raise KeyError(name)
+
+    def __contains__(self, name):
+        return name in self._all_infos()
+
+    def __len__(self):
+        return len(self._all_infos())
@@ -0,0 +1,191 @@
+"""
+ai_core/response_cache.py
+Two-tier response cache for ai_core.search:
+- In-memory LRU in front of an on-disk SQLite store
+- Per-provider TTLs; expired entries are kept (up to keep_stale seconds)
+  with their ETag / Last-Modified so they can be revalidated with a
+  conditional request instead of a full download
+- Hit/miss/revalidation counters via stats()
+"""
+
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+DEFAULT_TTLS = {
+    "ddg": 3600,          # instant answers: an hour
+    "wiki": 7 * 86400,    # summaries rarely change
+    "scrape": 900,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    provider      TEXT NOT NULL,
+    key           TEXT NOT NULL,
+    stored_at     REAL NOT NULL,
+    expires       REAL NOT NULL,
+    etag          TEXT,
+    last_modified TEXT,
+    value         TEXT NOT NULL,
+    PRIMARY KEY (provider, key)
+);
+CREATE INDEX IF NOT EXISTS idx_responses_expires ON responses(expires);
+"""
+
+
+class Entry:
+    __slots__ = ("value", "stored_at", "expires", "etag", "last_modified")
+
+    def __init__(self, value, stored_at, expires, etag=None, last_modified=None):
+        self.value = value
+        self.stored_at = stored_at
+        self.expires = expires
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def fresh(self, now=None):
+        return (now or time.time()) < self.expires
+
+    def validators(self):
+        """Conditional request headers for revalidating this entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    def __init__(self, path=None, max_entries=1024, ttls=None, default_ttl=600,
+                 keep_stale=30 * 86400, prune_every=256):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.default_ttl = default_ttl
+        self.keep_stale = keep_stale
+        self.prune_every = prune_every
+        self.memory = OrderedDict()
+        self.counters = dict.fromkeys(
+            ("memory_hits", "disk_hits", "misses", "stale", "revalidated", "stores", "evictions"), 0)
+        self._puts = 0
+        self._lock = threading.RLock()
+        self.db = None
+        if path:
+            self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.executescript(SCHEMA)
+            self.prune()
+
+    def ttl(self, provider):
+        return self.ttls.get(provider, self.default_ttl)
+
+    # -----------------------------------------------------
+    # MEMORY TIER
+    # -----------------------------------------------------
+
+    def _remember(self, mkey, entry):
+        self.memory[mkey] = entry
+        self.memory.move_to_end(mkey)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    # -----------------------------------------------------
+    # LOOKUP / STORE
+    # -----------------------------------------------------
+
+    def lookup(self, provider, key):
+        """Entry for (provider, key), fresh or stale, or None. Counts a hit or miss."""
+        mkey = (provider, key)
+        with self._lock:
+            entry = self.memory.get(mkey)
+            if entry is not None:
+                self.memory.move_to_end(mkey)
+                self.counters["memory_hits" if entry.fresh() else "stale"] += 1
+                return entry
+
+            if self.db is not None:
+                row = self.db.execute(
+                    "SELECT value, stored_at, expires, etag, last_modified FROM responses "
+                    "WHERE provider = ? AND key = ?", (provider, key)
+                ).fetchone()
+                if row is not None:
+                    entry = Entry(json.loads(row[0]), *row[1:])
+                    self._remember(mkey, entry)
+                    self.counters["disk_hits" if entry.fresh() else "stale"] += 1
+                    return entry
+
+            self.counters["misses"] += 1
+            return None
+
+    def get(self, provider, key):
+        """Fresh cached value or None."""
+        entry = self.lookup(provider, key)
+        return entry.value if entry is not None and entry.fresh() else None
+
+    def put(self, provider, key, value, etag=None, last_modified=None):
+        now = time.time()
+        entry = Entry(value, now, now + self.ttl(provider), etag, last_modified)
+        with self._lock:
+            self._remember((provider, key), entry)
+            self.counters["stores"] += 1
+            if self.db is not None:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (provider, key, entry.stored_at, entry.expires, etag, last_modified, json.dumps(value))
+                )
+                self._puts += 1
+                if self._puts % self.prune_every == 0:
+                    self.prune()
+        return entry
+
+    def revalidated(self, provider, key, entry, etag=None, last_modified=None):
+        """A 304 confirmed entry: extend its lifetime (and update validators)."""
+        now = time.time()
+        entry.stored_at = now
+        entry.expires = now + self.ttl(provider)
+        entry.etag = etag or entry.etag
+        entry.last_modified = last_modified or entry.last_modified
+        with self._lock:
+            self._remember((provider, key), entry)
+            self.counters["revalidated"] += 1
+            if self.db is not None:
+                self.db.execute(
+                    "UPDATE responses SET stored_at = ?, expires = ?, etag = ?, last_modified = ? "
+                    "WHERE provider = ? AND key = ?",
+                    (entry.stored_at, entry.expires, entry.etag, entry.last_modified, provider, key)
+                )
+        return entry
+
+    def prune(self):
+        """Drop disk entries stale for longer than keep_stale."""
+        if self.db is None:
+            return 0
+        with self._lock:
+            cur = self.db.execute("DELETE FROM responses WHERE expires < ?", (time.time() - self.keep_stale,))
+            return cur.rowcount
+
+    def clear(self):
+        with self._lock:
+            self.memory.clear()
+            if self.db is not None:
+                self.db.execute("DELETE FROM responses")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            lookups = stats["memory_hits"] + stats["disk_hits"] + stats["stale"] + stats["misses"]
+            stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+            stats["memory_entries"] = len(self.memory)
+            if self.db is not None:
+                stats["disk_entries"] = self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return stats
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
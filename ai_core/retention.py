@@ -0,0 +1,234 @@
+"""
+ai_core/retention.py
+Tiered retention for append-only event lists (ai_memory.json "history",
+ai_core/ai_memory.json "runs"):
+- Recent events stay raw: the last keep_days days, and never fewer than
+  the newest keep_last events
+- Older events are folded into one summary bucket per day (event count,
+  actions per day, min/max/sum/n of every numeric field, plus knowledge /
+  reward parsed from reflections) kept under memory["rollups"][key]
+- The raw older events are written to gzip JSONL segments under
+  ai_core/archive before they leave memory
+- trend() / action_counts() / buckets() answer from rollups + recent
+  events only; iter_archive() reads the raw segments back when needed
+"""
+
+import os
+import re
+import gzip
+import json
+from datetime import datetime, timedelta
+
+ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "archive")
+ROLLUP_KEY = "rollups"
+
+REFLECTION_RE = re.compile(r"(Knowledge Level|Reward Score):\s*(-?\d+(?:\.\d+)?)")
+REFLECTION_METRICS = {"Knowledge Level": "knowledge", "Reward Score": "reward"}
+
+
+def event_day(event):
+    """YYYY-MM-DD of an event's "time" (ISO with or without T/Z)."""
+    return str(event.get("time", ""))[:10]
+
+
+def event_action(event):
+    if "action" in event:
+        return str(event["action"])
+    if "event" in event:
+        return str(event["event"])
+    if "reflection" in event:
+        return "reflection"
+    return "other"
+
+
+def event_metrics(event):
+    """Numeric fields of an event, plus knowledge / reward stated in a reflection."""
+    metrics = {
+        k: v for k, v in event.items()
+        if isinstance(v, (int, float)) and not isinstance(v, bool)
+    }
+    reflection = event.get("reflection")
+    if isinstance(reflection, str):
+        for label, value in REFLECTION_RE.findall(reflection):
+            metrics[REFLECTION_METRICS[label]] = float(value) if "." in value else int(value)
+    return metrics
+
+
+# ---------------------------------------------------------
+# BUCKETS
+# ---------------------------------------------------------
+
+def _new_bucket(day):
+    return {"day": day, "count": 0, "actions": {}, "metrics": {}}
+
+
+def _add_event(bucket, event):
+    bucket["count"] += 1
+    action = event_action(event)
+    bucket["actions"][action] = bucket["actions"].get(action, 0) + 1
+    for name, value in event_metrics(event).items():
+        m = bucket["metrics"].get(name)
+        if m is None:
+            bucket["metrics"][name] = [value, value, value, 1]  # min, max, sum, n
+        else:
+            m[0] = min(m[0], value)
+            m[1] = max(m[1], value)
+            m[2] += value
+            m[3] += 1
+
+
+def _merge_bucket(into, bucket):
+    into["count"] += bucket["count"]
+    for action, n in bucket["actions"].items():
+        into["actions"][action] = into["actions"].get(action, 0) + n
+    for name, (lo, hi, total, n) in bucket["metrics"].items():
+        m = into["metrics"].get(name)
+        if m is None:
+            into["metrics"][name] = [lo, hi, total, n]
+        else:
+            into["metrics"][name] = [min(m[0], lo), max(m[1], hi), m[2] + total, m[3] + n]
+
+
+def summarize(events):
+    """One bucket per day, sorted by day."""
+    buckets = {}
+    for event in events:
+        day = event_day(event)
+        bucket = buckets.get(day)
+        if bucket is None:
+            bucket = buckets[day] = _new_bucket(day)
+        _add_event(bucket, event)
+    return [buckets[day] for day in sorted(buckets)]
+
+
+def merge_rollups(rollups, new):
+    """Fold new day buckets into the sorted rollups list (in place)."""
+    by_day = {b["day"]: b for b in rollups}
+    for bucket in new:
+        if bucket["day"] in by_day:
+            _merge_bucket(by_day[bucket["day"]], bucket)
+        else:
+            rollups.append(bucket)
+            by_day[bucket["day"]] = bucket
+    rollups.sort(key=lambda b: b["day"])
+    return rollups
+
+
+# ---------------------------------------------------------
+# RETENTION POLICY
+# ---------------------------------------------------------
+
+class Retention:
+    def __init__(self, stream, archive_dir=ARCHIVE_DIR, keep_days=30, keep_last=100):
+        self.stream = stream
+        self.archive_dir = archive_dir
+        self.keep_days = keep_days
+        self.keep_last = keep_last
+
+    def expired(self, events, now=None):
+        """Number of leading events outside the policy (events are in append order)."""
+        cutoff = ((now or datetime.utcnow()) - timedelta(days=self.keep_days)).strftime("%Y-%m-%d")
+        limit = max(0, len(events) - self.keep_last)
+        n = 0
+        while n < limit and event_day(events[n]) < cutoff:
+            n += 1
+        return n
+
+    def apply(self, memory, key, now=None):
+        """
+        Archive and roll up the expired events of memory[key]; returns how
+        many left the list. The archive segment is written first, so a crash
+        before the memory file is saved can duplicate events but never lose them.
+        """
+        events = memory.get(key) or []
+        n = self.expired(events, now)
+        if not n:
+            return 0
+        old = events[:n]
+        self.archive(old)
+        merge_rollups(memory.setdefault(ROLLUP_KEY, {}).setdefault(key, []), summarize(old))
+        del events[:n]
+        return n
+
+    # -----------------------------------------------------
+    # ARCHIVE SEGMENTS
+    # -----------------------------------------------------
+
+    def segments(self):
+        """Archive segment paths of this stream, oldest first."""
+        if not os.path.isdir(self.archive_dir):
+            return []
+        prefix = self.stream + "-"
+        names = sorted(
+            name for name in os.listdir(self.archive_dir)
+            if name.startswith(prefix) and name.endswith(".jsonl.gz")
+        )
+        return [os.path.join(self.archive_dir, name) for name in names]
+
+    def _segment_info(self, path):
+        # <stream>-<seq>-<first day>_<last day>.jsonl.gz
+        base = os.path.basename(path)[len(self.stream) + 1:-len(".jsonl.gz")]
+        seq, days = base.split("-", 1)
+        first, last = days.split("_")
+        return int(seq), first, last
+
+    def archive(self, events):
+        os.makedirs(self.archive_dir, exist_ok=True)
+        segments = self.segments()
+        seq = self._segment_info(segments[-1])[0] + 1 if segments else 0
+        first, last = event_day(events[0]), event_day(events[-1])
+        path = os.path.join(self.archive_dir, f"{self.stream}-{seq:05d}-{first}_{last}.jsonl.gz")
+        tmp = path + ".tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event, separators=(",", ":")) + "\n")
+        os.replace(tmp, path)
+        return path
+
+    def iter_archive(self, start=None, end=None):
+        """Raw archived events with start <= day <= end (segments outside the range are not opened)."""
+        for path in self.segments():
+            _, first, last = self._segment_info(path)
+            if (start and last < start) or (end and first > end):
+                continue
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    event = json.loads(line)
+                    day = event_day(event)
+                    if (not start or day >= start) and (not end or day <= end):
+                        yield event
+
+
+# ---------------------------------------------------------
+# TREND QUERIES (rollups + recent raw events; no archive reads)
+# ---------------------------------------------------------
+
+def buckets(memory, key, start=None, end=None):
+    """Day buckets for memory[key] over its whole lifetime, start <= day <= end."""
+    merged = [
+        dict(b, actions=dict(b["actions"]), metrics={k: list(v) for k, v in b["metrics"].items()})
+        for b in memory.get(ROLLUP_KEY, {}).get(key, [])
+    ]
+    merge_rollups(merged, summarize(memory.get(key) or []))
+    return [b for b in merged if (not start or b["day"] >= start) and (not end or b["day"] <= end)]
+
+
+def trend(memory, key, metric, start=None, end=None):
+    """[{"day", "min", "max", "mean"}] of a metric, for each day it was recorded."""
+    out = []
+    for b in buckets(memory, key, start, end):
+        m = b["metrics"].get(metric)
+        if m is not None:
+            out.append({"day": b["day"], "min": m[0], "max": m[1], "mean": m[2] / m[3]})
+    return out
+
+
+def action_counts(memory, key, start=None, end=None, by_day=False):
+    """Action -> count over the range, or {day: {action: count}} with by_day."""
+    if by_day:
+        return {b["day"]: b["actions"] for b in buckets(memory, key, start, end)}
+    totals = {}
+    for b in buckets(memory, key, start, end):
+        for action, n in b["actions"].items():
+            totals[action] = totals.get(action, 0) + n
+    return totals
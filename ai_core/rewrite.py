@@ -0,0 +1,145 @@
+"""
+ai_core/rewrite.py
+Tagged-block rewrite engine:
+- Finds every START/END tagged block of every target file in one pass per
+  file (tags must stand alone on their line, so a string constant holding
+  the tag text is never mistaken for a marker)
+- Each replacement block (module-level ones on their own), and then the
+  whole new file, is compiled in memory before anything is written
+- Unchanged files are skipped; changed files are staged as temp files
+  and swapped in with os.replace as one batch only after every file has
+  been generated and validated
+"""
+
+import os
+
+START_TAG = "# === AI_REWRITE_START ==="
+END_TAG = "# === AI_REWRITE_END ==="
+
+
+class RewriteError(Exception):
+    pass
+
+
+class Block:
+    __slots__ = ("path", "index", "start", "end", "indent", "text")
+
+    def __init__(self, path, index, start, end, indent, text):
+        self.path = path
+        self.index = index
+        self.start = start  # line index of the start tag
+        self.end = end  # line index of the end tag
+        self.indent = indent
+        self.text = text  # body between the tags (dedented)
+
+    def __repr__(self):
+        return f"<block {self.path}#{self.index} lines {self.start + 1}-{self.end + 1}>"
+
+
+def find_blocks(path, lines, start_tag=START_TAG, end_tag=END_TAG):
+    """All tagged blocks of a file's lines (keepends) in order; RewriteError if unbalanced."""
+    blocks = []
+    open_at = None
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if stripped == start_tag:
+            if open_at is not None:
+                raise RewriteError(f"{path}:{i + 1}: nested {start_tag!r}")
+            open_at = i
+        elif stripped == end_tag:
+            if open_at is None:
+                raise RewriteError(f"{path}:{i + 1}: {end_tag!r} without a start tag")
+            indent = lines[open_at][:len(lines[open_at]) - len(lines[open_at].lstrip())]
+            body = "".join(_dedent(line, indent) for line in lines[open_at + 1:i])
+            blocks.append(Block(path, len(blocks), open_at, i, indent, body))
+            open_at = None
+    if open_at is not None:
+        raise RewriteError(f"{path}:{open_at + 1}: unterminated {start_tag!r}")
+    return blocks
+
+
+def _dedent(line, indent):
+    return line[len(indent):] if indent and line.startswith(indent) else line
+
+
+def _indent(text, indent):
+    if not indent:
+        return text
+    return "".join(indent + line if line.strip() else line for line in text.splitlines(keepends=True))
+
+
+def _validate(source, filename):
+    try:
+        compile(source, filename, "exec")
+    except SyntaxError as e:
+        raise RewriteError(f"{filename}: generated code does not compile: {e}") from None
+
+
+def plan(paths, generate, start_tag=START_TAG, end_tag=END_TAG):
+    """
+    Read each target once and build its new text. generate(block) returns
+    the replacement body for a block (or None to keep it). Returns
+    [(path, new_text, changed_blocks)] for the files that actually change.
+    """
+    changes = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            original = f.read()
+        lines = original.splitlines(keepends=True)
+        blocks = find_blocks(path, lines, start_tag, end_tag)
+
+        out = []
+        pos = 0
+        changed = []
+        for block in blocks:
+            body = generate(block)
+            if body is None or body == block.text:
+                continue
+            if not body.endswith("\n"):
+                body += "\n"
+            if not block.indent:
+                # module-level block: must compile on its own (nested blocks
+                # are checked with the whole file below)
+                _validate(body, f"{path}#{block.index}")
+            out.extend(lines[pos:block.start + 1])
+            out.append(_indent(body, block.indent))
+            pos = block.end
+            changed.append(block)
+        out.extend(lines[pos:])
+
+        updated = "".join(out)
+        if not changed or updated == original:
+            continue
+        if path.endswith(".py"):
+            _validate(updated, path)
+        if start_tag not in updated or end_tag not in updated:
+            raise RewriteError(f"{path}: tags missing after update")
+        changes.append((path, updated, changed))
+    return changes
+
+
+def commit(changes):
+    """
+    Write every planned file: all temp files first, then the os.replace
+    swaps, so a failure while staging leaves every target untouched.
+    """
+    staged = []
+    try:
+        for path, text, _ in changes:
+            tmp = path + ".rewrite.tmp"
+            staged.append((tmp, path))
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+    except BaseException:
+        for tmp, _ in staged:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        raise
+    for tmp, path in staged:
+        os.replace(tmp, path)
+    return [path for path, _, _ in changes]
+
+
+def rewrite(paths, generate, start_tag=START_TAG, end_tag=END_TAG):
+    """plan() + commit(); returns the list of files written (empty when nothing changed)."""
+    return commit(plan(paths, generate, start_tag, end_tag))
@@ -0,0 +1,239 @@
+"""
+ai_core/runner.py
+Warm in-process test runner for generated skills:
+- Loads skill and test sources as fresh module objects (no files, no pytest)
+- Runs every test_* function and reports pass/fail/timing per test
+- EvalWorker keeps a runner alive in a child process between candidates
+"""
+
+import os
+import sys
+import time
+import signal
+import types
+import traceback
+import multiprocessing
+
+SKILLS_PACKAGE = "ai_core.skills"
+TESTS_PACKAGE = "ai_core.tests"
+
+
+# ---------------------------------------------------------
+# MODULE LOADING
+# ---------------------------------------------------------
+
+def load_module(name, source, filename=None):
+    """
+    Compile source (or run an already compiled module code object, e.g. a
+    mutant from ai_core/mutation.py) into a brand new module object (never
+    cached in sys.modules).
+    """
+    module = types.ModuleType(name)
+    module.__file__ = filename or f"<{name}>"
+    code = source if isinstance(source, types.CodeType) else compile(source, module.__file__, "exec")
+    exec(code, module.__dict__)
+    return module
+
+
+def _install(package, mod_name, module, saved):
+    """Expose module as package.mod_name, remembering what it shadowed."""
+    full = f"{package.__name__}.{mod_name}"
+    saved.append((package, mod_name, full, package.__dict__.get(mod_name), sys.modules.get(full)))
+    setattr(package, mod_name, module)
+    sys.modules[full] = module
+
+
+def _restore(saved):
+    for package, mod_name, full, old_attr, old_module in reversed(saved):
+        if old_attr is None:
+            package.__dict__.pop(mod_name, None)
+        else:
+            setattr(package, mod_name, old_attr)
+        if old_module is None:
+            sys.modules.pop(full, None)
+        else:
+            sys.modules[full] = old_module
+
+
+# ---------------------------------------------------------
+# TEST EXECUTION
+# ---------------------------------------------------------
+
+def _result(test, outcome, started, message=""):
+    return {
+        "test": test,
+        "outcome": outcome,
+        "duration": time.perf_counter() - started,
+        "message": message,
+    }
+
+
+def run_tests(skills, tests):
+    """
+    skills: {skill_name: source or code object}, tests: {test_module_name: source}.
+    Returns one result dict per test function (or per test module that
+    failed to load) with outcome "passed", "failed" or "error".
+    """
+    import ai_core.skills as skills_pkg
+
+    saved = []
+    results = []
+    try:
+        for name, source in skills.items():
+            started = time.perf_counter()
+            try:
+                module = load_module(f"{SKILLS_PACKAGE}.{name}", source, f"<skill {name}>")
+            except Exception:
+                results.append(_result(name, "error", started, traceback.format_exc(limit=1)))
+                continue
+            _install(skills_pkg, name, module, saved)
+
+        for test_name, source in tests.items():
+            started = time.perf_counter()
+            try:
+                module = load_module(f"{TESTS_PACKAGE}.{test_name}", source, f"<test {test_name}>")
+            except Exception:
+                results.append(_result(test_name, "error", started, traceback.format_exc(limit=1)))
+                continue
+
+            for attr, fn in list(module.__dict__.items()):
+                if not (attr.startswith("test") and isinstance(fn, types.FunctionType)):
+                    continue
+                test_id = f"{test_name}::{attr}"
+                started = time.perf_counter()
+                try:
+                    fn()
+                except AssertionError:
+                    results.append(_result(test_id, "failed", started, traceback.format_exc(limit=2)))
+                except Exception:
+                    results.append(_result(test_id, "error", started, traceback.format_exc(limit=2)))
+                else:
+                    results.append(_result(test_id, "passed", started))
+    finally:
+        _restore(saved)
+
+    return results
+
+
+def summarize(results):
+    """
+    Collapse per-test results into the (passed, total, rc, output) shape of a
+    pytest run. A module that failed to load is a collection error: pytest
+    then runs nothing, so the whole run scores (0, 0, 2).
+    """
+    passed = sum(1 for r in results if r["outcome"] == "passed")
+    total = len(results)
+
+    rc = 0
+    if any(r["outcome"] == "error" and "::" not in r["test"] for r in results):
+        rc = 2
+        passed = total = 0
+    elif passed != total:
+        rc = 1
+
+    lines = [
+        f"{r['outcome'].upper()} {r['test']} ({r['duration'] * 1000:.2f}ms)"
+        + (f"\n{r['message']}" if r["message"] else "")
+        for r in results
+    ]
+    lines.append("interrupted: module failed to load" if rc == 2
+                 else f"{passed} passed, {total - passed} not passed")
+    return passed, total, rc, "\n".join(lines)
+
+
+# ---------------------------------------------------------
+# PERSISTENT WORKER PROCESS
+# ---------------------------------------------------------
+
+def _serve(conn):
+    # a forked worker inherits its parent's handlers (evolver_daemon.py turns
+    # SIGTERM into a server shutdown); it must still die on terminate()
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        skills, tests = job
+        try:
+            conn.send(run_tests(skills, tests))
+        except Exception:
+            conn.send([{
+                "test": "<worker>",
+                "outcome": "error",
+                "duration": 0.0,
+                "message": traceback.format_exc(limit=2),
+            }])
+
+
+class EvalWorker:
+    """
+    Long-lived child process that runs (skill source, test source) batches.
+    A batch that hangs past `timeout` kills the worker; the next call restarts it.
+    A forked copy of an EvalWorker (e.g. in a process pool child) does not
+    own the parent's worker process and spawns its own on first use.
+    """
+
+    def __init__(self, timeout=30.0):
+        self.timeout = timeout
+        self._proc = None
+        self._conn = None
+        self._owner = None
+
+    def _forget_inherited(self):
+        # only the process that started the worker may poll or join it
+        if self._proc is not None and self._owner != os.getpid():
+            self._conn.close()
+            self._proc = None
+            self._conn = None
+
+    def start(self):
+        self._forget_inherited()
+        if self._proc is not None and self._proc.is_alive():
+            return
+        ctx = multiprocessing.get_context()
+        self._conn, child = ctx.Pipe()
+        self._proc = ctx.Process(target=_serve, args=(child,), daemon=True)
+        self._proc.start()
+        self._owner = os.getpid()
+        child.close()
+
+    def run(self, skills, tests, timeout=None):
+        self.start()
+        started = time.perf_counter()
+        self._conn.send((skills, tests))
+        if self._conn.poll(self.timeout if timeout is None else timeout):
+            try:
+                return self._conn.recv()
+            except EOFError:
+                message = "worker exited unexpectedly"
+        else:
+            message = "worker timed out"
+        self.close(kill=True)
+        return [_result("<worker>", "error", started, message)]
+
+    def close(self, kill=False):
+        self._forget_inherited()
+        if self._proc is None:
+            return
+        if not kill:
+            try:
+                self._conn.send(None)
+            except (OSError, BrokenPipeError):
+                pass
+            self._proc.join(timeout=5)
+        if self._proc.is_alive():
+            self._proc.kill()
+            self._proc.join()
+        self._conn.close()
+        self._proc = None
+        self._conn = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -2,82 +2,555 @@
 """
 Free Search Module (DuckDuckGo + Wikipedia + Safe Scraper)
 No API keys required.
+
+- SearchClient keeps one pooled keep-alive requests.Session for every call
+- search_all(query) runs the providers concurrently and returns whatever
+  finished within the deadline (partial results, never an exception)
+- Base URLs are constructor arguments, so a local stand-in server can
+  replace the real providers in tests
+- Optional two-tier response cache (ai_core/response_cache.py) with
+  conditional revalidation and stale-while-revalidate
+- safe_scrape checks the URL's host against a DomainPolicy
+  (ai_core/policy.py) and streams the page through an incremental tag stripper and
+  stops at the character budget or the byte cap, whichever comes first
+- search_many(queries) streams (index, result) pairs as queries complete, with
+  identical in-flight upstream calls collapsed into one (singleflight),
+  a token-bucket rate limit per provider and a cap on concurrent calls
+- With an InvertedIndex (ai_core/index.py) every result is indexed, and
+  local_search(query) answers from it, going to the network only on a miss
+- The module-level functions delegate to a shared default client
 """
 
-import requests
 import re
+import time
+import codecs
+import threading
+from collections import deque
+from html.parser import HTMLParser
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from urllib.parse import quote, urlencode
 
-# ---------------------------------------------------------
-# DuckDuckGo Instant Answer SEARCH (free)
-# ---------------------------------------------------------
-def ddg_search(query):
-    url = "https://api.duckduckgo.com/"
-    params = {
-        "q": query,
-        "format": "json",
-        "no_html": 1,
-        "skip_disambig": 1,
-    }
+import requests
+from requests.adapters import HTTPAdapter
 
-    try:
-        r = requests.get(url, params=params, timeout=5)
-        data = r.json()
-    except Exception as e:
-        return {"error": f"DDG request failed: {e}"}
+from ai_core.policy import DomainPolicy
 
-    abstract = data.get("Abstract")
-    heading = data.get("Heading")
-    answer = data.get("Answer")
+DDG_URL = "https://api.duckduckgo.com/"
+WIKI_URL = "https://en.wikipedia.org/api/rest_v1/page/summary/"
 
-    result = {
-        "query": query,
-        "heading": heading or "",
-        "abstract": abstract or "",
-        "answer": answer or "",
-    }
+BLOCKED_DOMAINS = ["facebook.com", "x.com", "twitter.com", "tiktok.com"]
 
-    return result
+# provider -> (requests per second, burst); None disables the limit
+RATE_LIMITS = {
+    "ddg": (5, 10),
+    "wiki": (20, 40),
+    "scrape": (10, 20),
+}
 
+PROVIDERS = ("ddg", "wiki")
 
-# ---------------------------------------------------------
-# Wikipedia Summary Search
-# ---------------------------------------------------------
-def wiki_search(query):
-    search_url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{query.replace(' ', '%20')}"
 
+def _cache_key(url, params=None):
+    return f"{url}?{urlencode(sorted(params.items()))}" if params else url
+
+
+def _json(response):
+    return response.json()
+
+
+SCRAPE_CHARS = 1500
+SCRAPE_MAX_BYTES = 2 * 1024 * 1024
+SCRAPE_CHUNK = 16 * 1024
+
+SKIP_TAGS = ("script", "style", "noscript", "template")
+WS_RE = re.compile(r"\s+")
+
+
+class TextExtractor(HTMLParser):
+    """
+    Incremental HTML -> text: feed() chunks as they arrive; tags become
+    whitespace, <script>/<style> bodies are dropped, whitespace collapses,
+    and collection stops once `limit` characters are gathered (done).
+    """
+
+    def __init__(self, limit=SCRAPE_CHARS):
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.parts = []
+        self.size = 0
+        self.skip = 0
+        self.space = True  # collapse leading whitespace
+
+    @property
+    def done(self):
+        return self.size >= self.limit
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self.skip += 1
+        self._add(" ")
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS and self.skip:
+            self.skip -= 1
+        self._add(" ")
+
+    def handle_data(self, data):
+        if not self.skip:
+            self._add(WS_RE.sub(" ", data))
+
+    def _add(self, text):
+        if self.done or not text:
+            return
+        if self.space and text[0] == " ":
+            text = text[1:]
+        if not text:
+            return
+        text = text[:self.limit - self.size]
+        self.parts.append(text)
+        self.size += len(text)
+        self.space = text[-1] == " "
+
+    def text(self):
+        return "".join(self.parts).rstrip()
+
+
+def extract_text(chunks, encoding="utf-8", limit=SCRAPE_CHARS, max_bytes=SCRAPE_MAX_BYTES):
+    """
+    Text of an HTML byte stream, reading no more than max_bytes and
+    stopping as soon as `limit` characters have been extracted. An unknown
+    charset (from a bogus Content-Type) is read as UTF-8.
+    """
     try:
-        r = requests.get(search_url, timeout=5)
-        data = r.json()
-    except Exception as e:
-        return {"error": f"Wikipedia request failed: {e}"}
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    extractor = TextExtractor(limit)
+    read = 0
+    for chunk in chunks:
+        chunk = chunk[:max_bytes - read]
+        read += len(chunk)
+        extractor.feed(decoder.decode(chunk))
+        if extractor.done or read >= max_bytes:
+            break
+    else:
+        extractor.feed(decoder.decode(b"", final=True))
+        extractor.close()
+    return extractor.text()
+
+
+class TokenBucket:
+    """Blocking token bucket: `rate` tokens per second, at most `burst` saved up."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1, rate)
+        self.tokens = self.capacity
+        self.stamp = time.monotonic()
+        self.waited = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+                self.stamp = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+                self.waited += delay
+            time.sleep(delay)
+
+
+class SingleFlight:
+    """Concurrent do(key, ...) calls share one execution of the first caller."""
+
+    def __init__(self):
+        self.calls = {}
+        self.shared = 0
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args):
+        with self._lock:
+            future = self.calls.get(key)
+            leader = future is None
+            if leader:
+                future = self.calls[key] = Future()
+            else:
+                self.shared += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self.calls[key]
+
+
+class SearchClient:
+    def __init__(self, ddg_url=DDG_URL, wiki_url=WIKI_URL, timeout=5, pool_size=10,
+                 max_workers=8, session=None, cache=None, stale_while_revalidate=False,
+                 scrape_chars=SCRAPE_CHARS, scrape_max_bytes=SCRAPE_MAX_BYTES, policy=None,
+                 rate_limits=None, index=None):
+        self.ddg_url = ddg_url
+        self.wiki_url = wiki_url
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.cache = cache
+        self.stale_while_revalidate = stale_while_revalidate
+        self.scrape_chars = scrape_chars
+        self.scrape_max_bytes = scrape_max_bytes
+        self.policy = policy or DomainPolicy(deny=BLOCKED_DOMAINS)
+        self.index = index
+        self._refreshing = set()
+        self.flights = SingleFlight()
+        self.limiters = {
+            provider: TokenBucket(*limit)
+            for provider, limit in dict(RATE_LIMITS, **(rate_limits or {})).items() if limit
+        }
+        self.session = session or requests.Session()
+        if session is None:
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    # -----------------------------------------------------
+    # DuckDuckGo Instant Answer SEARCH (free)
+    # -----------------------------------------------------
+    def ddg_search(self, query):
+        params = {
+            "q": query,
+            "format": "json",
+            "no_html": 1,
+            "skip_disambig": 1,
+        }
+
+        try:
+            data = self._fetch("ddg", self.ddg_url, params)
+        except Exception as e:
+            return {"error": f"DDG request failed: {e}"}
+
+        abstract = data.get("Abstract")
+        heading = data.get("Heading")
+        answer = data.get("Answer")
+
+        result = {
+            "query": query,
+            "heading": heading or "",
+            "abstract": abstract or "",
+            "answer": answer or "",
+        }
+
+        self._remember(f"ddg:{query}",
+                       " ".join(filter(None, (result["heading"], result["abstract"], result["answer"]))),
+                       source="ddg", title=result["heading"], query=query)
+        return result
+
+    # -----------------------------------------------------
+    # Wikipedia Summary Search
+    # -----------------------------------------------------
+    def wiki_search(self, query):
+        search_url = self.wiki_url + quote(query, safe="")
+
+        try:
+            data = self._fetch("wiki", search_url)
+        except Exception as e:
+            return {"error": f"Wikipedia request failed: {e}"}
 
-    if "extract" not in data:
-        return {"error": "No summary available"}
+        if "extract" not in data:
+            return {"error": "No summary available"}
 
+        result = {
+            "title": data.get("title", ""),
+            "description": data.get("description", ""),
+            "extract": data.get("extract", "")
+        }
+
+        self._remember(f"wiki:{result['title'] or query}",
+                       " ".join(filter(None, (result["title"], result["description"], result["extract"]))),
+                       source="wiki", title=result["title"], query=query)
+        return result
+
+    # -----------------------------------------------------
+    # SAFE SCRAPER (free)
+    # -----------------------------------------------------
+    def safe_scrape(self, url):
+        if not self.policy.allowed(url):
+            return {"error": "Blocked domain for safety"}
+
+        try:
+            content = self._fetch("scrape", url, parse=self._scrape_text, stream=True)
+        except Exception as e:
+            return {"error": f"Scrape failed: {e}"}
+
+        self._remember(f"scrape:{url}", content, source="scrape", url=url)
+        return {"url": url, "content": content}
+
+    def _scrape_text(self, response):
+        # streamed: the body is read only until the budget is met
+        with response:
+            return extract_text(
+                response.iter_content(SCRAPE_CHUNK),
+                response.encoding or "utf-8",
+                self.scrape_chars,
+                self.scrape_max_bytes
+            )
+
+    # -----------------------------------------------------
+    # LOCAL INDEX
+    # -----------------------------------------------------
+    def _remember(self, doc_id, text, **meta):
+        if self.index is not None and text.strip():
+            self.index.add(doc_id, text, **meta)
+
+    def local_search(self, query, k=5, min_score=0.0, fallback=True):
+        """
+        BM25 hits for query from the local index. On a miss (no hit scoring
+        above min_score) and with fallback, run search_all instead, which
+        also indexes what it fetches. "source" says which one answered.
+        """
+        hits = self.index.search(query, k) if self.index is not None else []
+        hits = [hit for hit in hits if hit["score"] > min_score]
+        if hits or not fallback:
+            return {
+                "query": query,
+                "source": "local",
+                "answer": hits[0]["text"] if hits else "",
+                "hits": hits,
+            }
+
+        result = self.search_all(query)
+        result["source"] = "network"
+        return result
+
+    # -----------------------------------------------------
+    # CACHED FETCH
+    # -----------------------------------------------------
+    def _fetch(self, provider, url, params=None, parse=_json, stream=False):
+        """parse(response) of a GET, served from / stored in the response cache if there is one."""
+        key = _cache_key(url, params)
+        entry = None
+        if self.cache is not None:
+            entry = self.cache.lookup(provider, key)
+            if entry is not None and entry.fresh():
+                return entry.value
+            if entry is not None and self.stale_while_revalidate:
+                self._refresh_later(provider, key, url, params, parse, entry, stream)
+                return entry.value
+        # identical requests already in flight wait for that one instead
+        return self.flights.do((provider, key), self._refresh, provider, key, url, params, parse, entry, stream)
+
+    def _refresh(self, provider, key, url, params, parse, entry, stream=False):
+        """One upstream GET (rate limited); conditional when there is a stale entry."""
+        limiter = self.limiters.get(provider)
+        if limiter is not None:
+            limiter.acquire()
+        headers = entry.validators() if entry is not None else None
+        r = self.session.get(url, params=params, headers=headers, timeout=self.timeout, stream=stream)
+        if r.status_code == 304 and entry is not None:
+            r.close()
+            entry = self.cache.revalidated(provider, key, entry, r.headers.get("ETag"),
+                                           r.headers.get("Last-Modified"))
+            return entry.value
+        value = parse(r)
+        if r.ok and self.cache is not None:
+            self.cache.put(provider, key, value, r.headers.get("ETag"), r.headers.get("Last-Modified"))
+        return value
+
+    def _refresh_later(self, provider, key, url, params, parse, entry, stream=False):
+        """Revalidate a stale entry in the background (once per key at a time)."""
+        with self._lock:
+            if (provider, key) in self._refreshing:
+                return
+            self._refreshing.add((provider, key))
+
+        def refresh():
+            try:
+                self._refresh(provider, key, url, params, parse, entry, stream)
+            except Exception:
+                pass  # keep serving the stale entry; the next lookup retries
+            finally:
+                with self._lock:
+                    self._refreshing.discard((provider, key))
+
+        self.executor().submit(refresh)
+
+    # -----------------------------------------------------
+    # CONCURRENT FAN-OUT
+    # -----------------------------------------------------
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix="search")
+            return self._executor
+
+    def search_all(self, query, urls=(), timeout=None):
+        """
+        DuckDuckGo + Wikipedia for query (plus a scrape of each url), run
+        concurrently. Providers still running after `timeout` seconds
+        (default: the request timeout) are reported in "errors" and the
+        result is marked partial.
+        """
+        pool = self.executor()
+        futures = {
+            "ddg": pool.submit(self.ddg_search, query),
+            "wiki": pool.submit(self.wiki_search, query),
+        }
+        for i, url in enumerate(urls):
+            futures[f"scrape:{i}"] = pool.submit(self.safe_scrape, url)
+
+        done, _ = wait(futures.values(), timeout=self.timeout if timeout is None else timeout)
+
+        results = {}
+        errors = {}
+        for name, future in futures.items():
+            if future not in done:
+                errors[name] = "timed out"
+                continue
+            result = future.result()
+            if "error" in result:
+                errors[name] = result["error"]
+            else:
+                results[name] = result
+
+        return _combined(query, results, errors, any(f not in done for f in futures.values()))
+
+    def search_many(self, queries, providers=PROVIDERS, concurrency=None):
+        """
+        Run every provider for every query and yield (index, result) pairs,
+        one per input query, in completion order: a query's search_all-style
+        result comes out as soon as its own providers are done, whatever is
+        still running for the others. A repeated query shares the upstream
+        calls of its first occurrence. At most `concurrency` (default
+        max_workers) upstream calls run at once; rate limits and
+        singleflight apply to each of them.
+        """
+        calls = {"ddg": self.ddg_search, "wiki": self.wiki_search}
+        indexes = {}
+        for i, query in enumerate(queries):
+            indexes.setdefault(query, []).append(i)
+        pending = deque((query, provider) for query in indexes for provider in providers)
+        remaining = dict.fromkeys(indexes, len(providers))
+        results = {query: {} for query in indexes}
+        errors = {query: {} for query in indexes}
+        limit = concurrency or self.max_workers
+        pool = self.executor()
+        running = {}
+
+        for query in [q for q, n in remaining.items() if not n]:  # no providers
+            for i in indexes[query]:
+                yield i, _combined(query, {}, {}, False)
+
+        while pending or running:
+            while pending and len(running) < limit:
+                query, provider = pending.popleft()
+                running[pool.submit(calls[provider], query)] = (query, provider)
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                query, provider = running.pop(future)
+                result = future.result()
+                if "error" in result:
+                    errors[query][provider] = result["error"]
+                else:
+                    results[query][provider] = result
+                remaining[query] -= 1
+                if remaining[query]:
+                    continue
+                for i in indexes[query]:
+                    # every occurrence gets its own copies
+                    yield i, _combined(query, {p: dict(r) for p, r in results[query].items()},
+                                       dict(errors[query]), False)
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def _combined(query, results, errors, partial):
     return {
-        "title": data.get("title", ""),
-        "description": data.get("description", ""),
-        "extract": data.get("extract", "")
+        "query": query,
+        "answer": _best_answer(results),
+        "results": results,
+        "errors": errors,
+        "partial": partial,
     }
 
 
+def _best_answer(results):
+    ddg = results.get("ddg", {})
+    wiki = results.get("wiki", {})
+    return ddg.get("answer") or ddg.get("abstract") or wiki.get("extract") or ""
+
+
 # ---------------------------------------------------------
-# SAFE SCRAPER (free)
+# MODULE-LEVEL API (shared pooled client)
 # ---------------------------------------------------------
-BLOCKED_DOMAINS = ["facebook.com", "x.com", "twitter.com", "tiktok.com"]
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def default_client():
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = SearchClient()
+        return _default_client
+
+
+def configure(**kwargs):
+    """
+    Replace the shared client, e.g. configure(cache=ResponseCache("search_cache.db"))
+    or configure(policy=DomainPolicy.from_files("blocklist.txt", deny=BLOCKED_DOMAINS)).
+    """
+    global _default_client
+    with _default_lock:
+        old, _default_client = _default_client, SearchClient(**kwargs)
+    if old is not None:
+        old.close()
+    return _default_client
+
+
+def ddg_search(query):
+    return default_client().ddg_search(query)
+
+
+def wiki_search(query):
+    return default_client().wiki_search(query)
+
 
 def safe_scrape(url):
-    for bad in BLOCKED_DOMAINS:
-        if bad in url.lower():
-            return {"error": "Blocked domain for safety"}
+    return default_client().safe_scrape(url)
 
-    try:
-        r = requests.get(url, timeout=5)
-        text = r.text
-    except Exception as e:
-        return {"error": f"Scrape failed: {e}"}
 
-    clean = re.sub("<.*?>", " ", text)
-    clean = re.sub(r"\s+", " ", clean)
+def search_all(query, urls=(), timeout=None):
+    return default_client().search_all(query, urls, timeout)
+
+
+def search_many(queries, providers=PROVIDERS, concurrency=None):
+    return default_client().search_many(queries, providers, concurrency)
+
 
-    return {"url": url, "content": clean[:1500]}
+def local_search(query, k=5, min_score=0.0, fallback=True):
+    return default_client().local_search(query, k, min_score, fallback)
@@ -0,0 +1,208 @@
+"""
+ai_core/skill_table.py
+Compact "skill table" for template-generated skills:
+- One row per skill (name, level, params, desc) in typed arrays, persisted
+  as a single columnar JSON file instead of one .py module per skill
+- One shared kernel, max(0, (x + a) * b), evaluates any row or all rows
+- Rows are exposed through ai_core.skills like ordinary modules
+  (TableSkill has info() and run()); hand-written skills stay modules
+"""
+
+import os
+import ast
+import json
+from array import array
+
+from ai_core.batch import template_params
+
+TABLE_VERSION = 1
+KERNEL = "affine_relu"
+
+
+def kernel(x, a, b):
+    """The shared template body: identical to a generated skill's run()."""
+    return max(0, (x + a) * b)
+
+
+class TableSkill:
+    """Module-like view of one table row."""
+
+    def __init__(self, table, name):
+        self.__name__ = name
+        self._table = table
+        self._row = table.index[name]
+
+    @property
+    def kernel_params(self):
+        return self._table.a[self._row], self._table.b[self._row]
+
+    def info(self):
+        t, i = self._table, self._row
+        return {"name": t.names[i], "level": t.levels[i], "desc": t.descs[i]}
+
+    def run(self, x):
+        t, i = self._table, self._row
+        return kernel(x, t.a[i], t.b[i])
+
+    def __repr__(self):
+        return f"<table skill {self.__name__!r}>"
+
+
+class SkillTable:
+    def __init__(self, path):
+        self.path = path
+        self.names = []
+        self.index = {}
+        self.levels = array("q")
+        self.a = array("q")
+        self.b = array("q")
+        self.descs = []
+        self.load()
+
+    # -----------------------------------------------------
+    # PERSISTENCE
+    # -----------------------------------------------------
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        if data.get("version") != TABLE_VERSION or data.get("kernel") != KERNEL:
+            raise ValueError(f"Unsupported skill table: {self.path}")
+        self.names = data["names"]
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.levels = array("q", data["levels"])
+        self.a = array("q", data["a"])
+        self.b = array("q", data["b"])
+        self.descs = data["descs"]
+
+    def save(self):
+        data = {
+            "version": TABLE_VERSION,
+            "kernel": KERNEL,
+            "names": self.names,
+            "levels": self.levels.tolist(),
+            "a": self.a.tolist(),
+            "b": self.b.tolist(),
+            "descs": self.descs,
+        }
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    # -----------------------------------------------------
+    # ROWS
+    # -----------------------------------------------------
+
+    def add(self, name, level, params=None, desc=""):
+        """Add (or replace) a row; params defaults to the template's (level, level)."""
+        a, b = params if params is not None else (level, level)
+        if name in self.index:
+            i = self.index[name]
+            self.levels[i], self.a[i], self.b[i], self.descs[i] = level, a, b, desc
+            return i
+        self.index[name] = len(self.names)
+        self.names.append(name)
+        self.levels.append(level)
+        self.a.append(a)
+        self.b.append(b)
+        self.descs.append(desc)
+        return self.index[name]
+
+    def add_source(self, name, source):
+        """Add a row for a template skill module's source; False if it is not a template."""
+        params = template_params(source)
+        if params is None:
+            return False
+        info = _info_literal(source)
+        self.add(name, info.get("level", params[1]), params, info.get("desc", ""))
+        return True
+
+    def relabel(self, name, new_level):
+        """
+        Move a row to new_level the way mutation.relabel moves a template
+        module: kernel params equal to the old level follow it, and so does
+        the "(Level: n)" in its description.
+        """
+        i = self.index[name]
+        level = self.levels[i]
+        if self.a[i] == level:
+            self.a[i] = new_level
+        if self.b[i] == level:
+            self.b[i] = new_level
+        self.descs[i] = self.descs[i].replace(f"(Level: {level})", f"(Level: {new_level})")
+        self.levels[i] = new_level
+        return i
+
+    def skill(self, name):
+        return TableSkill(self, name)
+
+    def params(self, name):
+        i = self.index[name]
+        return self.a[i], self.b[i]
+
+    def run(self, name, x):
+        return self.run_row(self.index[name], x)
+
+    def run_row(self, i, x):
+        return kernel(x, self.a[i], self.b[i])
+
+    def run_all(self, x):
+        """One result per row, in row order."""
+        return [kernel(x, a, b) for a, b in zip(self.a, self.b)]
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __len__(self):
+        return len(self.names)
+
+
+# ---------------------------------------------------------
+# MODULE -> ROW CONVERSION
+# ---------------------------------------------------------
+
+def _info_literal(source):
+    """The literal dict returned by a generated module's info(), or {}."""
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return {}
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name == "info":
+            for sub in ast.walk(node):
+                if isinstance(sub, ast.Return):
+                    try:
+                        value = ast.literal_eval(sub.value)
+                    except ValueError:
+                        return {}
+                    return value if isinstance(value, dict) else {}
+    return {}
+
+
+def pack_modules(table, skills_dir, names=None, remove=False):
+    """
+    Convert template skill modules into table rows (non-template modules
+    are left alone). With remove=True the packed .py files are deleted.
+    Returns the packed names.
+    """
+    packed = []
+    for fn in sorted(os.listdir(skills_dir)):
+        if not fn.endswith(".py") or fn.startswith("_"):
+            continue
+        name = fn[:-3]
+        if names is not None and name not in names:
+            continue
+        with open(os.path.join(skills_dir, fn), "r", encoding="utf-8") as f:
+            source = f.read()
+        if table.add_source(name, source):
+            packed.append(name)
+
+    table.save()
+    if remove:
+        for name in packed:
+            os.remove(os.path.join(skills_dir, f"{name}.py"))
+    return packed
@@ -1,12 +1,26 @@
 # ai_core/skills/__init__.py
-# This file intentionally left simple. It will expose skill modules present.
-# Dynamic import helper (safe).
-import importlib
-import pkgutil
+# Skill modules are listed from a cached manifest and imported lazily on
+# first attribute access (see ai_core/registry.py), so importing this
+# package neither scans the directory nor loads any skill. Template skills
+# packed into table.json (ai_core/skill_table.py) resolve the same way.
+import os
 
-__all__ = []
+from ai_core.registry import SkillRegistry
 
-# auto-populate __all__ based on present .py files (excluding __init__)
-for finder, name, ispkg in pkgutil.iter_modules(__path__):
-    if name != "__init__":
-        __all__.append(name)
+_here = os.path.dirname(os.path.abspath(__file__))
+registry = SkillRegistry(__name__, _here, table_path=os.path.join(_here, "table.json"))
+
+
+def __getattr__(name):
+    if name == "__all__":
+        return registry.names()
+    if name.startswith("__"):
+        raise AttributeError(name)
+    try:
+        return registry.get(name)
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+
+def __dir__():
+    return sorted(set(globals()) | set(registry.names()))
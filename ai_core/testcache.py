@@ -0,0 +1,157 @@
+"""
+ai_core/testcache.py
+Content-hash keyed cache of per-test-file results:
+- A test file's key covers its own source, every skill it imports and
+  the shared "salt" files (mutation.py, package __init__s)
+- A cached result is reused only while that key is unchanged
+- Lets the evolver run only new/changed tests instead of the whole suite
+- save() prunes file records whose path is gone (candidate staging dirs)
+  and results no remaining file record backs
+- Paths are stored (and salted) relative to the cache file, so a moved
+  checkout keeps its cache
+"""
+
+import os
+import re
+import json
+import hashlib
+
+CACHE_VERSION = 1
+
+SKILL_IMPORT_RE = re.compile(
+    r"^\s*(?:from\s+ai_core\.skills\s+import\s+(\w+)|import\s+ai_core\.skills\.(\w+))",
+    re.MULTILINE,
+)
+
+
+def file_digest(path):
+    """sha256 of a file's bytes, or None if it does not exist."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def imported_skills(test_source):
+    """Names of the ai_core.skills modules a test file imports."""
+    return sorted({a or b for a, b in SKILL_IMPORT_RE.findall(test_source)})
+
+
+def combine(results):
+    """
+    Fold per-file (passed, total, rc) triples into one suite result. Like a
+    full pytest run, a collection error in any file fails the whole suite
+    with (0, 0, 2).
+    """
+    rcs = [r[2] for r in results]
+    if 2 in rcs:
+        return 0, 0, 2
+    passed = sum(r[0] for r in results)
+    total = sum(r[1] for r in results)
+    return passed, total, (1 if any(rcs) else 0)
+
+
+class ResultCache:
+    """
+    Persistent {test file name: (key, passed, total, rc)} map, plus a
+    stat-memoized table of file digests and test imports.
+    """
+
+    def __init__(self, path, salt_paths=()):
+        self.path = path
+        self.salt_paths = list(salt_paths)
+        self.refresh_salt()
+        self.entries = {}
+        self.files = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        if data.get("version") == CACHE_VERSION:
+            self.entries = data.get("entries", {})
+            self.files = data.get("files", {})
+
+    def refresh_salt(self):
+        """Re-hash the salt files; a long-lived cache calls this before each run."""
+        self.salt = hashlib.sha256(
+            "\n".join(f"{self._rel(p)}:{file_digest(p)}" for p in self.salt_paths).encode()
+        ).hexdigest()
+        return self.salt
+
+    def _rel(self, path):
+        return os.path.relpath(path, os.path.dirname(self.path))
+
+    def prune(self):
+        """Drop file records of deleted files and results no remaining test file backs; returns the count."""
+        root = os.path.dirname(self.path)
+        gone = [rel for rel in self.files if not os.path.exists(os.path.join(root, rel))]
+        for rel in gone:
+            del self.files[rel]
+        names = {os.path.basename(rel) for rel in self.files}
+        orphans = [name for name in self.entries if name not in names]
+        for name in orphans:
+            del self.entries[name]
+        if gone or orphans:
+            self.dirty = True
+        return len(gone) + len(orphans)
+
+    def save(self):
+        self.prune()
+        if not self.dirty:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": CACHE_VERSION, "entries": self.entries, "files": self.files},
+                f, indent=2, sort_keys=True
+            )
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+    def digest(self, path):
+        """file_digest, memoized on (mtime, size) so unchanged files are only stat()ed."""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        rel = self._rel(path)
+        sig = [st.st_mtime_ns, st.st_size]
+        known = self.files.get(rel)
+        if known and known[:2] == sig:
+            return known[2]
+        digest = file_digest(path)
+        self.files[rel] = sig + [digest]
+        self.dirty = True
+        return digest
+
+    def key_for(self, test_path, skill_path):
+        """Key of a test file given how skill names resolve to files (skill_path(name))."""
+        test_digest = self.digest(test_path)
+        entry = self.files[self._rel(test_path)]
+        if len(entry) < 4:
+            # imports are re-parsed only when the test file itself changed
+            with open(test_path, "r", encoding="utf-8") as f:
+                entry.append(imported_skills(f.read()))
+
+        h = hashlib.sha256(self.salt.encode())
+        h.update(test_digest.encode())
+        for name in entry[3]:
+            h.update(f"\n{name}:{self.digest(skill_path(name))}".encode())
+        return h.hexdigest()
+
+    def lookup(self, test_name, key):
+        entry = self.entries.get(test_name)
+        if entry and entry["key"] == key:
+            return entry["passed"], entry["total"], entry["rc"]
+        return None
+
+    def store(self, test_name, key, result):
+        passed, total, rc = result
+        self.entries[test_name] = {"key": key, "passed": passed, "total": total, "rc": rc}
+        self.dirty = True
@@ -0,0 +1,244 @@
+"""
+ai_core/tracing.py
+Per-phase timing for evolver runs:
+- span(name, **attrs) is a context manager timing one phase; spans nest
+- Disabled by default: span() then returns a shared no-op object, so
+  instrumented code pays one global lookup per phase
+- enable() (or configure_from_env()) turns it on; flush() appends the
+  spans to a JSONL trace and writes per-phase totals as Prometheus
+  counters in text format (node exporter textfile collector)
+- Worker processes record into a private tracer (run_captured) and the
+  parent merges their spans
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+
+TRACE_ENV = "EVOLVER_TRACE"
+METRICS_ENV = "EVOLVER_METRICS"
+
+_tracer = None
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    __slots__ = ("tracer", "name", "attrs", "parent", "start", "t0")
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        """Attach attributes known only once the phase has run."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        stack = self.tracer._stack()
+        self.parent = stack[-1].name if stack else None
+        stack.append(self)
+        self.start = time.time()
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.t0
+        self.tracer._stack().pop()
+        record = {
+            "run": self.tracer.run_id,
+            "service": self.tracer.service,
+            "name": self.name,
+            "parent": self.parent,
+            "start": self.start,
+            "duration": duration,
+            "pid": os.getpid(),
+        }
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        if self.attrs:
+            record["attrs"] = self.attrs
+        self.tracer.add(record)
+        return False
+
+
+class Tracer:
+    def __init__(self, service, trace_path=None, metrics_path=None):
+        self.service = service
+        self.trace_path = trace_path
+        self.metrics_path = metrics_path
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started = time.time()
+        self.records = []
+        self.totals = {}  # phase -> [calls, seconds, errors]
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current(self):
+        stack = self._stack()
+        return stack[-1].name if stack else None
+
+    def add(self, record):
+        with self._lock:
+            self.records.append(record)
+            total = self.totals.setdefault(record["name"], [0, 0.0, 0])
+            total[0] += 1
+            total[1] += record["duration"]
+            if "error" in record:
+                total[2] += 1
+
+    # -----------------------------------------------------
+    # EXPORT
+    # -----------------------------------------------------
+
+    def flush(self):
+        """Append new spans to the trace and rewrite the metrics file."""
+        with self._lock:
+            # exported spans are dropped, so a long-lived process does not grow
+            pending, self.records = self.records, []
+            totals = {k: list(v) for k, v in self.totals.items()}
+
+        if self.trace_path and pending:
+            with open(self.trace_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in pending))
+
+        if self.metrics_path:
+            path = self.metrics_path
+            if os.path.isdir(path):
+                path = os.path.join(path, f"{self.service}.prom")
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(self.prometheus(totals))
+            os.replace(tmp, path)  # the collector never sees a partial file
+
+    def prometheus(self, totals=None):
+        """
+        Per-phase totals as Prometheus counters. They accumulate over the
+        tracer's lifetime (a whole daemon process, not one generation).
+        """
+        totals = self.totals if totals is None else totals
+        service = _label(self.service)
+        lines = []
+        for name, i, help_text, fmt in (
+            ("evolver_phase_seconds_total", 1, "Wall time spent in each phase.", "{:.6f}"),
+            ("evolver_phase_calls_total", 0, "Number of times each phase ran.", "{}"),
+            ("evolver_phase_errors_total", 2, "Number of times each phase raised.", "{}"),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for phase in sorted(totals):
+                lines.append(f'{name}{{service="{service}",phase="{_label(phase)}"}} '
+                             + fmt.format(totals[phase][i]))
+        lines += [
+            "# HELP evolver_start_time_seconds Start time of the traced process.",
+            "# TYPE evolver_start_time_seconds gauge",
+            f'evolver_start_time_seconds{{service="{service}"}} {self.started:.3f}',
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# ---------------------------------------------------------
+# MODULE API
+# ---------------------------------------------------------
+
+def enable(service, trace_path=None, metrics_path=None):
+    """Start recording spans for this process; returns the tracer."""
+    global _tracer
+    _tracer = Tracer(service, trace_path, metrics_path)
+    return _tracer
+
+
+def disable():
+    global _tracer
+    _tracer = None
+
+
+def enabled():
+    return _tracer is not None
+
+
+def configure_from_env(service, trace_path=None, metrics_path=None):
+    """
+    Enable tracing if a trace/metrics path is given or set in
+    EVOLVER_TRACE / EVOLVER_METRICS (a metrics directory gets <service>.prom).
+    """
+    trace_path = trace_path or os.environ.get(TRACE_ENV)
+    metrics_path = metrics_path or os.environ.get(METRICS_ENV)
+    if trace_path or metrics_path:
+        return enable(service, trace_path, metrics_path)
+    return None
+
+
+def span(name, **attrs):
+    tracer = _tracer
+    if tracer is None:
+        return _NOOP
+    return Span(tracer, name, attrs)
+
+
+def flush():
+    if _tracer is not None:
+        _tracer.flush()
+
+
+def prometheus():
+    """Per-phase totals in Prometheus text format ("" when tracing is off)."""
+    tracer = _tracer
+    if tracer is None:
+        return ""
+    with tracer._lock:
+        totals = {k: list(v) for k, v in tracer.totals.items()}
+    return tracer.prometheus(totals)
+
+
+def run_captured(fn, arg):
+    """
+    Call fn(arg) under a private tracer (for pool workers) and return
+    (result, span records) so the parent can merge() them.
+    """
+    global _tracer
+    outer = _tracer
+    _tracer = Tracer(outer.service if outer else "worker")
+    try:
+        return fn(arg), _tracer.records
+    finally:
+        _tracer = outer
+
+
+def merge(records):
+    """Add spans recorded by a worker to this process's trace, under the current span."""
+    tracer = _tracer
+    if tracer is None:
+        return
+    parent = tracer.current()
+    for record in records:
+        record = dict(record, run=tracer.run_id, service=tracer.service)
+        if record["parent"] is None:
+            record["parent"] = parent
+        tracer.add(record)
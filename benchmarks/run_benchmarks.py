@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+benchmarks/run_benchmarks.py
+Scaling benchmarks for the evolvers:
+- Builds a synthetic repository (benchmarks/synthetic.py) of the requested
+  size in a temp dir; nothing in the real tree is touched
+- Every sample runs in a fresh interpreter inside that repository, so
+  imports and caches are as cold as a real evolver run
+- Times propose_and_test_candidates, promote_best_candidate, memory
+  load/save (both memory files), `import ai_core.skills` and rewrite_self
+- Writes a JSON report; --compare flags regressions against a stored one
+
+Examples:
+    python benchmarks/run_benchmarks.py --preset medium -o bench.json
+    python benchmarks/run_benchmarks.py --preset medium --compare bench.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+from datetime import datetime
+
+from synthetic import PRESETS, create_repo
+
+REPORT_VERSION = 1
+RESULT_PREFIX = "BENCH_RESULT "
+
+
+# ---------------------------------------------------------
+# BENCHMARKS (run inside the synthetic repo, one sample per process)
+# ---------------------------------------------------------
+
+def bench_skills_import_cold(opts):
+    manifest = os.path.join("ai_core", "skills.manifest.json")
+    if os.path.exists(manifest):
+        os.remove(manifest)
+    t0 = time.perf_counter()
+    import ai_core.skills
+    ai_core.skills.registry.names()
+    return time.perf_counter() - t0
+
+
+def bench_skills_import_warm(opts):
+    from ai_core.registry import SkillRegistry
+    SkillRegistry("ai_core.skills", os.path.join("ai_core", "skills")).refresh()  # manifest on disk
+    t0 = time.perf_counter()
+    import ai_core.skills
+    ai_core.skills.registry.names()
+    return time.perf_counter() - t0
+
+
+def bench_evolver_load_memory(opts):
+    import self_evolver_v2
+    t0 = time.perf_counter()
+    self_evolver_v2.load_memory()
+    return time.perf_counter() - t0
+
+
+def bench_evolver_save_memory(opts):
+    import self_evolver_v2
+    memory = self_evolver_v2.load_memory()
+    t0 = time.perf_counter()
+    self_evolver_v2.save_memory(memory)
+    return time.perf_counter() - t0
+
+
+def bench_rewriting_load_memory(opts):
+    import self_rewriting_ai
+    t0 = time.perf_counter()
+    self_rewriting_ai.load_memory()
+    return time.perf_counter() - t0
+
+
+def bench_rewriting_save_memory(opts):
+    import self_rewriting_ai
+    t0 = time.perf_counter()
+    self_rewriting_ai.save_memory(self_rewriting_ai.memory)
+    return time.perf_counter() - t0
+
+
+def bench_rewrite_self(opts):
+    import self_rewriting_ai
+    with open(self_rewriting_ai.AI_FILE, "r", encoding="utf-8") as f:
+        original = f.read()
+    try:
+        t0 = time.perf_counter()
+        self_rewriting_ai.rewrite_self()
+        return time.perf_counter() - t0
+    finally:
+        with open(self_rewriting_ai.AI_FILE, "w", encoding="utf-8") as f:
+            f.write(original)
+
+
+def bench_propose(opts):
+    import self_evolver_v2
+    self_evolver_v2.ensure_dirs()
+    t0 = time.perf_counter()
+    self_evolver_v2.propose_and_test_candidates(
+        num_candidates=opts["candidates"], jobs=opts["jobs"],
+        runner=opts["runner"], incremental=opts["incremental"]
+    )
+    return time.perf_counter() - t0
+
+
+def bench_promote(opts):
+    import self_evolver_v2
+    self_evolver_v2.ensure_dirs()
+    personality = self_evolver_v2.load_personality()
+    level = self_evolver_v2.compute_next_level()
+    name = f"skill_bench_{os.getpid()}"
+    skill_path = os.path.join(self_evolver_v2.CANDIDATES_DIR, name, f"{name}.py")
+    test_path = os.path.join(self_evolver_v2.CANDIDATES_DIR, name, f"test_{name}.py")
+    os.makedirs(os.path.dirname(skill_path), exist_ok=True)
+    self_evolver_v2.write_safe(skill_path, self_evolver_v2.generate_skill_template(name, level, personality))
+    self_evolver_v2.write_safe(test_path, self_evolver_v2.generate_test(name, level))
+    candidate = {"name": name, "level": level, "skill_path": skill_path, "test_path": test_path, "score": 1.0}
+
+    t0 = time.perf_counter()
+    self_evolver_v2.promote_best_candidate([candidate])
+    return time.perf_counter() - t0
+
+
+BENCHMARKS = {
+    "skills_import_cold": bench_skills_import_cold,
+    "skills_import_warm": bench_skills_import_warm,
+    "evolver_load_memory": bench_evolver_load_memory,
+    "evolver_save_memory": bench_evolver_save_memory,
+    "rewriting_load_memory": bench_rewriting_load_memory,
+    "rewriting_save_memory": bench_rewriting_save_memory,
+    "rewrite_self": bench_rewrite_self,
+    "promote_best_candidate": bench_promote,
+    "propose_and_test_candidates": bench_propose,
+}
+
+
+def run_worker(name, opts):
+    """Entry point of a sample process (cwd = synthetic repo root)."""
+    sys.path.insert(0, os.getcwd())
+    with open(os.devnull, "w") as devnull:
+        stdout, sys.stdout = sys.stdout, devnull  # evolver progress output
+        try:
+            elapsed = BENCHMARKS[name](opts)
+        finally:
+            sys.stdout = stdout
+    print(RESULT_PREFIX + json.dumps({"name": name, "seconds": elapsed}))
+
+
+# ---------------------------------------------------------
+# DRIVER
+# ---------------------------------------------------------
+
+def run_sample(root, name, opts):
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", name, "--worker-opts", json.dumps(opts)],
+        cwd=root, capture_output=True, text=True
+    )
+    for line in proc.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])["seconds"]
+    raise RuntimeError(f"benchmark {name} failed (rc={proc.returncode}):\n{proc.stderr[-2000:]}")
+
+
+def summarize(samples):
+    return {
+        "samples": samples,
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "max": max(samples),
+    }
+
+
+def run_suite(config, names, repeat, opts, keep=False):
+    t0 = time.perf_counter()
+    root = create_repo(config["skills"], config["tests"], config["history"])
+    print(f"[bench] synthetic repo {root} ({config}) built in {time.perf_counter() - t0:.2f}s")
+
+    results = {}
+    try:
+        for name in names:
+            samples = [run_sample(root, name, opts) for _ in range(repeat)]
+            results[name] = summarize(samples)
+            print(f"[bench] {name:<30} median={results[name]['median'] * 1000:10.2f}ms "
+                  f"min={results[name]['min'] * 1000:10.2f}ms")
+    finally:
+        if not keep:
+            shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+def compare(report, baseline, threshold, min_delta):
+    """
+    Benchmarks whose median is more than `threshold` (fraction) and more
+    than `min_delta` seconds slower than the baseline's.
+    """
+    regressions = []
+    for name, current in report["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if old is None:
+            print(f"[compare] {name:<30} (no baseline)")
+            continue
+        ratio = current["median"] / old["median"] if old["median"] else float("inf")
+        slower = current["median"] - old["median"]
+        regressed = ratio > 1 + threshold and slower > min_delta
+        flag = "REGRESSION" if regressed else "ok"
+        print(f"[compare] {name:<30} {old['median'] * 1000:10.2f}ms -> "
+              f"{current['median'] * 1000:10.2f}ms  x{ratio:5.2f}  {flag}")
+        if regressed:
+            regressions.append({"name": name, "baseline": old["median"], "current": current["median"],
+                                "ratio": ratio})
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Evolver scaling benchmarks")
+    parser.add_argument("--preset", choices=["small", "medium", "large"], default="small")
+    parser.add_argument("--skills", type=int, help="number of skill modules (overrides preset)")
+    parser.add_argument("--tests", type=int, help="number of test files (overrides preset)")
+    parser.add_argument("--history", type=int, help="history entries per memory file (overrides preset)")
+    parser.add_argument("--repeat", type=int, default=3, help="samples per benchmark")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument("--skip", nargs="+", choices=sorted(BENCHMARKS), default=[],
+                        help="skip these benchmarks (e.g. propose_and_test_candidates at 10k tests)")
+    parser.add_argument("--candidates", type=int, default=3)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--runner", choices=["pytest", "worker"], default="pytest")
+    parser.add_argument("--incremental", action="store_true")
+    parser.add_argument("-o", "--output", help="write the JSON report here")
+    parser.add_argument("--compare", metavar="BASELINE", help="flag regressions against this report")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown as a fraction of the baseline median")
+    parser.add_argument("--min-delta", type=float, default=0.005,
+                        help="ignore slowdowns smaller than this many seconds")
+    parser.add_argument("--keep", action="store_true", help="keep the synthetic repo")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--worker-opts", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.worker:
+        run_worker(args.worker, json.loads(args.worker_opts))
+        return 0
+
+    config = dict(PRESETS[args.preset])
+    for key in ("skills", "tests", "history"):
+        if getattr(args, key) is not None:
+            config[key] = getattr(args, key)
+    opts = {"candidates": args.candidates, "jobs": args.jobs, "runner": args.runner,
+            "incremental": args.incremental}
+    names = [n for n in (args.only or BENCHMARKS) if n not in args.skip]
+
+    report = {
+        "version": REPORT_VERSION,
+        "created": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "options": opts,
+        "repeat": args.repeat,
+        "results": run_suite(config, names, args.repeat, opts, keep=args.keep),
+    }
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != config:
+            print(f"[compare] warning: baseline config {baseline.get('config')} differs from {config}")
+        regressions = compare(report, baseline, args.threshold, args.min_delta)
+        report["regressions"] = regressions
+
+    if args.output:
+        tmp = args.output + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp, args.output)
+        print(f"[bench] report written to {args.output}")
+
+    if regressions:
+        print(f"[compare] {len(regressions)} regression(s)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+benchmarks/synthetic.py
+Synthetic repositories for the benchmark suite:
+- A throwaway copy of the evolver code (root scripts + ai_core package,
+  without the real skills, tests or memory)
+- N generated skill modules, T generated tests and H history entries in
+  both memory files (ai_core/ai_memory.json and ai_memory.json)
+"""
+
+import os
+import json
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ROOT_SCRIPTS = ["self_evolver.py", "self_evolver_v2.py", "self_rewriting_ai.py"]
+AI_CORE_FILES = ["personality.json", os.path.join("skills", "__init__.py"), os.path.join("tests", "__init__.py")]
+
+# sizes: skills, tests, history entries
+PRESETS = {
+    "small": {"skills": 50, "tests": 50, "history": 1000},
+    "medium": {"skills": 1000, "tests": 1000, "history": 100000},
+    "large": {"skills": 10000, "tests": 10000, "history": 1000000},
+}
+
+EPOCH = datetime(2025, 1, 1)
+
+
+def skill_source(name, level):
+    """Same shape as self_evolver_v2.generate_skill_template (optimizer personality)."""
+    desc = f"Auto-generated skill {name} (Level: {level}) - optimizer heuristic"
+    return f'''"""
+Auto-generated skill: {name}
+Level: {level}
+Generated: {EPOCH.isoformat()}Z
+Description: {desc}
+"""
+
+def info():
+    return {{"name": "{name}", "level": {level}, "desc": "{desc}"}}
+
+def run(x: int) -> int:
+    # deterministic scoring function
+    return max(0, (x + {level}) * {level})
+'''
+
+
+def test_source(test_name, skill_name, level):
+    return f'''"""
+Auto-test for {skill_name}
+"""
+
+from ai_core.skills import {skill_name} as skill
+
+def test_{test_name}_basic():
+    assert skill.run(0) == ((0 + {level}) * {level})
+    assert isinstance(skill.run(1), int)
+'''
+
+
+def _stamp(i):
+    return (EPOCH + timedelta(seconds=i)).isoformat() + "Z"
+
+
+def _write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _copy_code(root):
+    for fn in ROOT_SCRIPTS:
+        shutil.copyfile(os.path.join(REPO_ROOT, fn), os.path.join(root, fn))
+
+    src_core = os.path.join(REPO_ROOT, "ai_core")
+    dst_core = os.path.join(root, "ai_core")
+    for sub in ("skills", "tests", "candidates"):
+        os.makedirs(os.path.join(dst_core, sub), exist_ok=True)
+    for fn in os.listdir(src_core):
+        if fn.endswith(".py"):
+            shutil.copyfile(os.path.join(src_core, fn), os.path.join(dst_core, fn))
+    for rel in AI_CORE_FILES:
+        shutil.copyfile(os.path.join(src_core, rel), os.path.join(dst_core, rel))
+
+
+def skill_level(i):
+    return i % 50 + 1
+
+
+def create_repo(skills=50, tests=50, history=1000, root=None):
+    """
+    Build a synthetic repository and return its root directory (a new temp
+    dir unless root is given). Test i exercises skill i % skills.
+    """
+    if root is None:
+        root = tempfile.mkdtemp(prefix="evolver_bench_")
+    _copy_code(root)
+
+    skills_dir = os.path.join(root, "ai_core", "skills")
+    tests_dir = os.path.join(root, "ai_core", "tests")
+    names = [f"skill_synth_{i}" for i in range(skills)]
+    for i, name in enumerate(names):
+        _write(os.path.join(skills_dir, f"{name}.py"), skill_source(name, skill_level(i)))
+
+    for i in range(tests if names else 0):
+        skill = i % len(names)
+        test_name = f"synth_{i}"
+        _write(os.path.join(tests_dir, f"test_{test_name}.py"),
+               test_source(test_name, names[skill], skill_level(skill)))
+
+    # evolver memory: one record per skill, `history` run entries
+    evolver_memory = {
+        "runs": [
+            {"time": _stamp(i), "action": "promote_best", "candidate": names[i % len(names)] if names else None,
+             "score": 1.0 + (i % 7) / 10}
+            for i in range(history)
+        ],
+        "skills": [
+            {"name": name, "level": skill_level(i), "promoted_at": _stamp(i)}
+            for i, name in enumerate(names)
+        ]
+    }
+    with open(os.path.join(root, "ai_core", "ai_memory.json"), "w", encoding="utf-8") as f:
+        json.dump(evolver_memory, f, indent=2)
+
+    # self_rewriting_ai memory: alternating reflections and events
+    rewriting_memory = {
+        "knowledge": 1 + history // 2,
+        "reward": history // 2,
+        "history": [
+            {"time": _stamp(i), "event": "AI improved knowledge by 1"} if i % 2 else
+            {"time": _stamp(i), "reflection": "The AI currently has:\n- Knowledge Level: 1\n- Reward Score: 0"}
+            for i in range(history)
+        ]
+    }
+    with open(os.path.join(root, "ai_memory.json"), "w", encoding="utf-8") as f:
+        json.dump(rewriting_memory, f, indent=4)
+
+    return root
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+evolver_daemon.py
+Long-running evolver:
+- Imports self_evolver_v2 once and keeps the skill registry, the skill
+  catalog (built from memory on first start, resynced if memory changes
+  behind it), the fitness/test caches, the metrics store and the warm test
+  worker process alive between generations, so a generation costs only
+  its evaluation work
+- Each generation records its evaluations under a new metrics run id and
+  re-hashes the test-cache salt files, so edits made while the daemon
+  runs still invalidate cached results
+- A scheduler thread runs one generation every --interval seconds (while
+  started) and whenever one is triggered; generations never overlap
+- Control API over HTTP, bound to localhost:
+    GET  /status    daemon state and the last generation's outcome (JSON)
+    GET  /metrics   per-phase timings and daemon counters (Prometheus text)
+    GET  /stats     aggregates of the recorded candidate evaluations (JSON)
+    POST /start     start the schedule      POST /stop      pause it
+    POST /trigger   queue one generation    POST /shutdown  exit
+"""
+
+import os
+import json
+import time
+import shlex
+import signal
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import self_evolver_v2 as evolver
+from ai_core import skills, tracing
+from ai_core.metrics_store import MetricsStore
+
+DEFAULT_EVOLVER_ARGS = "--runner worker --incremental --fitness-cache"
+
+
+class EvolverDaemon:
+    def __init__(self, run_args, interval=3600.0, started=True):
+        self.run_args = run_args
+        self.interval = interval
+        self.scheduled = started and interval > 0
+        self.next_run = time.time() + interval if self.scheduled else None
+        self.pending = 0
+        self.busy = False
+        self.generations = 0
+        self.failures = 0
+        self.last = None
+        self.booted = time.time()
+        self._stopping = False
+        self._cond = threading.Condition()
+        self._thread = None
+        self.state = None  # evolver.open_run_state(), opened by warm_up()
+
+    # -----------------------------------------------------
+    # LIFECYCLE
+    # -----------------------------------------------------
+
+    def warm_up(self):
+        """Pay the one-time costs up front: dirs, registry scan, catalog and caches, worker process."""
+        with tracing.span("daemon.warm_up"):
+            evolver.ensure_dirs()
+            skills.registry.refresh()
+            # with the catalog, next-level lookups never reload memory
+            self.state = evolver.open_run_state(self.run_args, catalog=True)
+            if self.run_args.runner == "worker":
+                evolver.get_worker().start()
+
+    def start_thread(self):
+        self._thread = threading.Thread(target=self._loop, name="evolver-scheduler", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()  # lets a running generation finish
+        if self.state is not None:
+            evolver.close_run_state(self.state)
+            self.state = None
+        evolver.get_worker().close()
+        tracing.flush()
+
+    # -----------------------------------------------------
+    # CONTROL
+    # -----------------------------------------------------
+
+    def start(self):
+        with self._cond:
+            if self.interval <= 0:
+                return False
+            if not self.scheduled:
+                self.scheduled = True
+                self.next_run = time.time() + self.interval
+                self._cond.notify_all()
+            return True
+
+    def stop(self):
+        with self._cond:
+            self.scheduled = False
+            self.next_run = None
+            self._cond.notify_all()
+
+    def trigger(self):
+        with self._cond:
+            self.pending += 1
+            self._cond.notify_all()
+            return self.pending
+
+    def status(self):
+        with self._cond:
+            return {
+                "pid": os.getpid(),
+                "uptime": round(time.time() - self.booted, 3),
+                "scheduled": self.scheduled,
+                "interval": self.interval,
+                "next_run": self.next_run,
+                "busy": self.busy,
+                "pending": self.pending,
+                "generations": self.generations,
+                "failures": self.failures,
+                "last": self.last,
+                "evolver_args": self.run_args.argv,
+            }
+
+    def prometheus(self):
+        with self._cond:
+            last_seconds = self.last["duration"] if self.last else 0.0
+            gauges = [
+                ("evolver_daemon_generations_total", "counter", "Generations run since start.", self.generations),
+                ("evolver_daemon_failures_total", "counter", "Generations that raised.", self.failures),
+                ("evolver_daemon_busy", "gauge", "1 while a generation is running.", int(self.busy)),
+                ("evolver_daemon_pending", "gauge", "Triggered generations not yet started.", self.pending),
+                ("evolver_daemon_last_generation_seconds", "gauge", "Duration of the last generation.",
+                 last_seconds),
+            ]
+        lines = []
+        for name, kind, help_text, value in gauges:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"]
+        return "\n".join(lines) + "\n" + tracing.prometheus()
+
+    # -----------------------------------------------------
+    # SCHEDULER
+    # -----------------------------------------------------
+
+    def _due(self):
+        return self.pending or (self.scheduled and time.time() >= self.next_run)
+
+    def _timeout(self):
+        if not self.scheduled:
+            return None
+        return max(0.0, self.next_run - time.time())
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._stopping and not self._due():
+                    self._cond.wait(self._timeout())
+                if self._stopping:
+                    return
+                if self.pending:
+                    self.pending -= 1
+                else:
+                    self.next_run = time.time() + self.interval
+                self.busy = True
+            try:
+                self.run_generation()
+            finally:
+                with self._cond:
+                    self.busy = False
+
+    def run_generation(self):
+        started = time.time()
+        outcome = {"started": started}
+        try:
+            with tracing.span("daemon.generation"):
+                catalog = self.state["catalog"]
+                catalog.sync_journal()  # memory written by another process since the last generation
+                evolver.refresh_run_state(self.state)
+                best = evolver.run_generation(self.run_args, **self.state)
+                catalog.mark_synced()  # not after a failure: the next generation resyncs
+            if best:
+                outcome.update(promoted=best["name"], score=best["score"])
+        except Exception as e:
+            outcome["error"] = f"{type(e).__name__}: {e}"
+            print("[daemon] generation failed:", outcome["error"])
+        finally:
+            tracing.flush()
+        outcome["duration"] = round(time.time() - started, 6)
+        with self._cond:
+            self.generations += 1
+            self.failures += "error" in outcome
+            self.last = outcome
+        return outcome
+
+
+# ---------------------------------------------------------
+# HTTP CONTROL API
+# ---------------------------------------------------------
+
+class ControlHandler(BaseHTTPRequestHandler):
+    daemon = None  # set on the subclass created by serve()
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send(self, code, body, ctype="application/json"):
+        if not isinstance(body, str):
+            body = json.dumps(body, indent=2) + "\n"
+        data = body.encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/status":
+            self._send(200, self.daemon.status())
+        elif path == "/metrics":
+            self._send(200, self.daemon.prometheus(), "text/plain; version=0.0.4")
+        elif path == "/stats":
+            self._send(200, MetricsStore(evolver.METRICS_DIR).summary())
+        else:
+            self._send(404, {"error": f"unknown endpoint {path}"})
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        if path == "/start":
+            if not self.daemon.start():
+                self._send(409, {"error": "no schedule: daemon started with --interval 0"})
+                return
+            self._send(200, self.daemon.status())
+        elif path == "/stop":
+            self.daemon.stop()
+            self._send(200, self.daemon.status())
+        elif path == "/trigger":
+            self._send(202, {"queued": self.daemon.trigger()})
+        elif path == "/shutdown":
+            self._send(202, {"shutting_down": True})
+            threading.Thread(target=self.server.shutdown).start()
+        else:
+            self._send(404, {"error": f"unknown endpoint {path}"})
+
+
+def serve(daemon, host="127.0.0.1", port=8765):
+    handler = type("Handler", (ControlHandler,), {"daemon": daemon})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+# ---------------------------------------------------------
+# MAIN
+# ---------------------------------------------------------
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Long-running evolver with a localhost control API")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="address to bind the control API to (keep it local)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--interval", type=float, default=3600.0,
+                        help="seconds between scheduled generations (0: only on /trigger)")
+    parser.add_argument("--paused", action="store_true",
+                        help="start with the schedule stopped (POST /start to begin)")
+    parser.add_argument("--evolver-args", default=DEFAULT_EVOLVER_ARGS,
+                        help="self_evolver_v2.py options used for every generation")
+    parser.add_argument("--trace", metavar="FILE",
+                        help=f"append per-phase timing spans to this JSONL file (or set ${tracing.TRACE_ENV})")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="also write per-phase totals in Prometheus text format to this file or "
+                             f"directory (or set ${tracing.METRICS_ENV})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # spans are always recorded here: /metrics serves their totals
+    if tracing.configure_from_env("evolver_daemon", args.trace, args.metrics) is None:
+        tracing.enable("evolver_daemon")
+
+    run_argv = shlex.split(args.evolver_args)
+    run_args = evolver.parse_args(run_argv)
+    if run_args.command != "run":
+        raise SystemExit("--evolver-args must describe a run (no pack/gc/stats command)")
+    run_args.argv = run_argv
+
+    daemon = EvolverDaemon(run_args, args.interval, started=not args.paused)
+    daemon.warm_up()
+    server = serve(daemon, args.host, args.port)
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+
+    daemon.start_thread()
+    print(f"[daemon] listening on http://{args.host}:{server.server_address[1]} "
+          f"(interval={args.interval}s, scheduled={daemon.scheduled})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        daemon.close()
+        print("[daemon] stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,17 +11,27 @@ Safe "advanced mode" evolver:
 
 import os
 import json
+import argparse
 import re
 from datetime import datetime
 import random
 import uuid
 
+from ai_core import mutation, skills, tracing
+from ai_core.catalog import SkillCatalog
+from ai_core.journal import MemoryJournal
+from ai_core.retention import Retention
+
 # --- CONFIG ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 AI_DIR = os.path.join(BASE_DIR, "ai_core")
 SKILLS_DIR = os.path.join(AI_DIR, "skills")
 TESTS_DIR = os.path.join(AI_DIR, "tests")
 MEMORY_FILE = os.path.join(AI_DIR, "ai_memory.json")
+ARCHIVE_DIR = os.path.join(AI_DIR, "archive")
+# old "runs" events are rolled up and archived whenever the journal is compacted
+JOURNAL = MemoryJournal(MEMORY_FILE, retention={"runs": Retention("runs", ARCHIVE_DIR)})
+CATALOG_FILE = os.path.join(AI_DIR, "skills.db")
 
 ALLOWED_DIR_PREFIX = os.path.normpath(AI_DIR)  # safety: only allow writes inside this dir
 
@@ -45,13 +55,22 @@ def write_file_safe(path, content):
         f.write(content)
 
 # --- MEMORY ---
+# snapshot + append-only journal; see ai_core/journal.py
 def load_memory():
-    with open(MEMORY_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return JOURNAL.load()
 
 def save_memory(m):
-    with open(MEMORY_FILE, "w", encoding="utf-8") as f:
-        json.dump(m, f, indent=2)
+    JOURNAL.save(m)
+
+def open_catalog(build=False):
+    """
+    SQLite skill index (ai_core/catalog.py). Once ai_core/skills.db exists it
+    is always used and kept in sync; build=True creates it from memory first.
+    Opening resyncs it if memory was written since it was last closed.
+    """
+    if not os.path.exists(CATALOG_FILE) and not build:
+        return None
+    return SkillCatalog(CATALOG_FILE, journal=JOURNAL)
 
 # --- SKILL GENERATOR ---
 def generate_skill_code(name, level):
@@ -94,75 +113,147 @@ def test_{name}_basic():
     return test
 
 # --- MAIN EVOLUTION STEP ---
-def propose_new_skill():
+def propose_new_skill(catalog=None):
     # Simple heuristic: create a new skill occasionally with incremental level
-    memory = load_memory()
-    next_level = 1 + len(memory.get("skills", []))
-    skill_name = f"skill_{next_level}"
+    if catalog is not None:
+        next_level = catalog.next_level()
+        skill_name = f"skill_{next_level}"
+        taken = catalog.exists(skill_name)
+    else:
+        memory = load_memory()
+        next_level = 1 + len(memory.get("skills", []))
+        skill_name = f"skill_{next_level}"
+        taken = any(s["name"] == skill_name for s in memory.get("skills", []))
     # ensure unique
-    if any(s["name"] == skill_name for s in memory.get("skills", [])):
+    if taken:
         # fallback to uuid name
         skill_name = f"skill_{next_level}_{uuid.uuid4().hex[:6]}"
 
-    code = generate_skill_code(skill_name, next_level)
-    test = generate_test_code(skill_name, next_level)
+    with tracing.span("skill.template", skill=skill_name):
+        code = generate_skill_code(skill_name, next_level)
+        test = generate_test_code(skill_name, next_level)
 
     # safety filenames
     skill_path = os.path.join(SKILLS_DIR, f"{skill_name}.py")
     test_path = os.path.join(TESTS_DIR, f"test_{skill_name}.py")
 
-    write_file_safe(skill_path, code)
-    write_file_safe(test_path, test)
+    with tracing.span("skill.write", skill=skill_name):
+        write_file_safe(skill_path, code)
+        write_file_safe(test_path, test)
 
     # update memory
-    memory["skills"].append({
-        "name": skill_name,
-        "level": next_level,
-        "created": datetime.utcnow().isoformat() + "Z"
-    })
-    memory["runs"].append({
-        "time": datetime.utcnow().isoformat() + "Z",
-        "action": "propose_new_skill",
-        "skill": skill_name
-    })
-    save_memory(memory)
+    with tracing.span("skill.memory", skill=skill_name):
+        record = {
+            "name": skill_name,
+            "level": next_level,
+            "created": datetime.utcnow().isoformat() + "Z"
+        }
+        JOURNAL.append("skills", record)
+        if catalog is not None:
+            catalog.add(record)
+        JOURNAL.append("runs", {
+            "time": datetime.utcnow().isoformat() + "Z",
+            "action": "propose_new_skill",
+            "skill": skill_name
+        })
 
     print(f"[Evolver] Proposed skill {skill_name} (level {next_level})")
     return skill_name, skill_path, test_path
 
-def main():
+def mutate_skill_code(name, level, new_level):
+    """
+    Existing skill source moved to new_level via AST edits (comments and
+    layout kept); a fresh template if the module is missing or unparsable.
+    """
+    skill_path = os.path.join(SKILLS_DIR, f"{name}.py")
+    try:
+        with open(skill_path, "r", encoding="utf-8") as f:
+            source = f.read()
+        info = skills.registry.info(name) or {}
+        return mutation.relabel(source, info.get("level") or level, new_level)
+    except (OSError, SyntaxError):
+        return generate_skill_code(name, new_level)
+
+def relabel_table_skill(name, new_level):
+    """Move a skill packed into the skill table to new_level by rewriting its row."""
+    table = skills.registry.table
+    if not is_safe_path(table.path):
+        raise RuntimeError(f"Unsafe write attempted: {table.path}")
+    table.relabel(name, new_level)
+    table.save()
+
+def pick_skill(catalog=None):
+    """Random existing skill record, or None when there are none."""
+    if catalog is not None:
+        return catalog.sample()
+    records = load_memory().get("skills")
+    return random.choice(records) if records else None
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Safe single-step skill evolver")
+    parser.add_argument("--catalog", action="store_true",
+                        help="build/use the indexed SQLite skill catalog (ai_core/skills.db)")
+    parser.add_argument("--trace", metavar="FILE",
+                        help=f"append per-phase timing spans to this JSONL file (or set ${tracing.TRACE_ENV})")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="write per-phase totals in Prometheus text format to this file or "
+                             f"directory (or set ${tracing.METRICS_ENV})")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    tracing.configure_from_env("self_evolver", args.trace, args.metrics)
+    try:
+        with tracing.span("run"):
+            evolve_step(args)
+    finally:
+        tracing.flush()
+
+def evolve_step(args):
     ensure_dirs()
     print("AI Evolver starting...")
+    catalog = open_catalog(build=args.catalog)
+    try:
+        take_step(catalog)
+    finally:
+        if catalog is not None:
+            catalog.close()
 
+def take_step(catalog=None):
     # maybe mutate an existing skill instead of creating new one
-    memory = load_memory()
     action = random.choice(["new_skill", "mutate_skill", "noop"])
     # bias towards new_skill
     if random.random() < 0.6:
         action = "new_skill"
+    s = pick_skill(catalog) if action == "mutate_skill" else None
 
     if action == "new_skill":
-        skill_name, skill_path, test_path = propose_new_skill()
+        skill_name, skill_path, test_path = propose_new_skill(catalog)
         print("Wrote:", skill_path, test_path)
         # output metadata for workflow
         meta = {"skill": skill_name}
         print(json.dumps(meta))
-    elif action == "mutate_skill" and memory.get("skills"):
+    elif s is not None:
         # Simple mutation: bump level and rewrite file
-        s = random.choice(memory["skills"])
         new_level = s["level"] + 1
-        code = generate_skill_code(s["name"], new_level)
-        skill_path = os.path.join(SKILLS_DIR, f"{s['name']}.py")
-        write_file_safe(skill_path, code)
-        s["level"] = new_level
-        s["mutated_at"] = datetime.utcnow().isoformat() + "Z"
-        memory["runs"].append({"time": datetime.utcnow().isoformat() + "Z", "action": "mutate_skill", "skill": s["name"], "new_level": new_level})
-        save_memory(memory)
+        info = skills.registry.info(s["name"]) or {}
+        with tracing.span("skill.write", skill=s["name"], table=bool(info.get("table"))):
+            if info.get("table"):
+                relabel_table_skill(s["name"], new_level)
+            else:
+                code = mutate_skill_code(s["name"], s["level"], new_level)
+                write_file_safe(os.path.join(SKILLS_DIR, f"{s['name']}.py"), code)
+            skills.registry.update(s["name"])  # in-place rewrite: directory mtime is unchanged
+        with tracing.span("skill.memory", skill=s["name"]):
+            changes = {"level": new_level, "mutated_at": datetime.utcnow().isoformat() + "Z"}
+            JOURNAL.update("skills", {"name": s["name"]}, changes)
+            if catalog is not None:
+                catalog.update(s["name"], changes)
+            JOURNAL.append("runs", {"time": datetime.utcnow().isoformat() + "Z", "action": "mutate_skill", "skill": s["name"], "new_level": new_level})
         print(f"[Evolver] Mutated {s['name']} -> level {new_level}")
     else:
         print("[Evolver] No action this run.")
-        memory["runs"].append({"time": datetime.utcnow().isoformat() + "Z", "action": "noop"})
-        save_memory(memory)
+        JOURNAL.append("runs", {"time": datetime.utcnow().isoformat() + "Z", "action": "noop"})
 
 if __name__ == "__main__":
     main()
@@ -10,21 +10,57 @@ Advanced safe evolver:
 """
 
 import os
+import re
 import json
 import random
 import uuid
 import shutil
+import hashlib
+import argparse
+import tempfile
 import subprocess
+from xml.etree import ElementTree
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import partial
+
+from ai_core import mutation, skills, tracing
+from ai_core.candidate_store import CandidateStore
+from ai_core.catalog import SkillCatalog
+from ai_core.fitness_cache import FitnessCache, candidate_key, normalize_source
+from ai_core.journal import MemoryJournal
+from ai_core.metrics_store import MetricsStore
+from ai_core.retention import Retention
+from ai_core.runner import EvalWorker, run_tests, summarize
+from ai_core.skill_table import SkillTable, pack_modules
+from ai_core.testcache import ResultCache, combine, file_digest, imported_skills
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 AI_DIR = os.path.join(BASE_DIR, "ai_core")
 SKILLS_DIR = os.path.join(AI_DIR, "skills")
-CANDIDATES_DIR = os.path.join(AI_DIR, "candidates")
+CANDIDATES_DIR = os.path.join(AI_DIR, "candidates")  # per-run staging; archived into OBJECTS_DIR
+OBJECTS_DIR = os.path.join(AI_DIR, "objects")
 TESTS_DIR = os.path.join(AI_DIR, "tests")
 MEMORY_FILE = os.path.join(AI_DIR, "ai_memory.json")
+ARCHIVE_DIR = os.path.join(AI_DIR, "archive")
+# old "runs" events are rolled up and archived whenever the journal is compacted
+JOURNAL = MemoryJournal(MEMORY_FILE, retention={"runs": Retention("runs", ARCHIVE_DIR)})
+CATALOG_FILE = os.path.join(AI_DIR, "skills.db")
 PERSONALITY_FILE = os.path.join(AI_DIR, "personality.json")
 MUTATION_MODULE = os.path.join(AI_DIR, "mutation.py")
+WORKSPACES_DIR = os.path.join(AI_DIR, ".workspaces")
+TEST_CACHE_FILE = os.path.join(AI_DIR, "test_cache.json")
+SKILL_TABLE_FILE = os.path.join(SKILLS_DIR, "table.json")
+FITNESS_CACHE_FILE = os.path.join(AI_DIR, "fitness_cache.json")
+METRICS_DIR = os.path.join(AI_DIR, "metrics")  # columnar log of every candidate evaluation
+
+# files every test implicitly depends on; a change invalidates all cached results
+CACHE_SALT_FILES = [
+    MUTATION_MODULE,
+    os.path.join(AI_DIR, "__init__.py"),
+    os.path.join(SKILLS_DIR, "__init__.py"),
+    os.path.join(AI_DIR, "registry.py"),
+]
 
 # Safety prefix for allowed writes
 ALLOWED_PREFIX = os.path.normpath(AI_DIR)
@@ -55,8 +91,11 @@ def ensure_dirs():
     if not os.path.exists(MUTATION_MODULE):
         with open(MUTATION_MODULE, "w") as f:
             f.write(
+                "import random\n\n\n"
                 "def minor_mutation(code, level):\n"
-                "    return code.replace(f'Level: {level}', f'Level: {max(1, level+1)}')\n"
+                "    return code.replace(f'Level: {level}', f'Level: {max(1, level+1)}')\n\n\n"
+                "def mutate_level(level, rng=random):\n"
+                "    return max(1, level + rng.choice((-1, 1, 1, 2)))\n"
             )
 
 
@@ -72,13 +111,23 @@ def write_safe(path, content):
 
 
 def load_memory():
-    with open(MEMORY_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+    # snapshot + append-only journal; see ai_core/journal.py
+    return JOURNAL.load()
 
 
 def save_memory(m):
-    with open(MEMORY_FILE, "w", encoding="utf-8") as f:
-        json.dump(m, f, indent=2)
+    JOURNAL.save(m)
+
+
+def open_catalog(build=False):
+    """
+    SQLite skill index (ai_core/catalog.py). Once ai_core/skills.db exists it
+    is always used and kept in sync; build=True creates it from memory first.
+    Opening resyncs it if memory was written since it was last closed.
+    """
+    if not os.path.exists(CATALOG_FILE) and not build:
+        return None
+    return SkillCatalog(CATALOG_FILE, journal=JOURNAL)
 
 
 def load_personality():
@@ -134,39 +183,110 @@ def test_{name}_basic():
 # TEST EXECUTION
 # ---------------------------------------------------------
 
-def run_pytest_on_tests(test_dir):
+def run_pytest_on_tests(test_dir, cwd=None):
+    """
+    Run pytest on test_dir; returns (passed, total, rc, output). Test items
+    are counted from a junit report, like run_pytest_per_file and the worker.
+    """
+    per_file, rc, out = _run_pytest(test_dir, cwd)
+    if per_file is None:
+        return 0, 0, 1, out
+    if rc == 2:
+        return 0, 0, 2, out  # interrupted by a collection error: nothing ran
+    if rc == 5:
+        rc = 0  # no tests collected: the worker reports an empty run as (0, 0, 0)
+    passed = sum(v[0] for v in per_file.values())
+    total = sum(v[1] for v in per_file.values())
+    return passed, total, rc, out
+
+
+def run_pytest_per_file(test_dir, cwd=None):
+    """
+    Run pytest once and split the outcome per test file via a junit report.
+    Returns ({test file name: (passed, total, rc)}, output).
+    """
+    per_file, _, out = _run_pytest(test_dir, cwd, "--continue-on-collection-errors")
+    if per_file is None:
+        names = [fn for fn in os.listdir(test_dir) if fn.startswith("test_") and fn.endswith(".py")]
+        return {fn: (0, 0, 1) for fn in names}, out
+    return per_file, out
+
+
+def _run_pytest(test_dir, cwd=None, *options):
+    """pytest with a junit report: ({test file name: (passed, total, rc)} or None, returncode, output)."""
+    names = [fn for fn in os.listdir(test_dir) if fn.startswith("test_") and fn.endswith(".py")]
+    report = os.path.join(cwd or test_dir, "report.xml")
+    counts = {fn: [0, 0, 0] for fn in names}
+
     try:
         res = subprocess.run(
-            ["pytest", "-q", test_dir],
+            ["pytest", "-q", *options, f"--junitxml={report}", test_dir],
             capture_output=True,
             text=True,
-            check=False
+            check=False,
+            cwd=cwd
         )
         out = res.stdout + "\n" + res.stderr
-
-        passed = 0
-        total = 0
-
-        for line in out.splitlines():
-            if "collected" in line:
-                try:
-                    total = int(line.split()[1])
-                except:
-                    pass
-
-            if "passed" in line and "failed" not in line:
-                try:
-                    passed = int(line.split()[0])
-                except:
-                    pass
-
-        if res.returncode == 0 and total == 0:
-            passed, total = 1, 1
-
-        return passed, total, res.returncode, out
-
+        tree = ElementTree.parse(report)
     except Exception as e:
-        return 0, 0, 1, str(e)
+        return None, 1, str(e)
+
+    for case in tree.iter("testcase"):
+        module = case.get("classname") or case.get("name", "")
+        fn = next((p + ".py" for p in reversed(module.split(".")) if p + ".py" in counts), None)
+        if fn is None:
+            continue
+        entry = counts[fn]
+        entry[1] += 1
+        if not case.get("classname"):
+            entry[2] = 2  # collection error
+        elif case.find("failure") is not None or case.find("error") is not None:
+            entry[2] = max(entry[2], 1)
+        elif case.find("skipped") is None:
+            entry[0] += 1
+
+    return {fn: tuple(v) for fn, v in counts.items()}, res.returncode, out
+
+
+_worker = None
+
+
+def get_worker():
+    """Process-local warm EvalWorker, started on first use."""
+    global _worker
+    if _worker is None:
+        _worker = EvalWorker()
+    return _worker
+
+
+def read_source(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def run_worker_on_sources(skill_paths, test_paths, per_file=False):
+    """
+    Run tests through the warm in-process worker instead of a pytest subprocess.
+    Same return shapes as run_pytest_on_tests / run_pytest_per_file.
+    """
+    # table-backed skills are not modules; the worker resolves them via ai_core.skills
+    skills = {os.path.basename(p)[:-3]: read_source(p) for p in skill_paths if p.endswith(".py")}
+    tests = {os.path.basename(p)[:-3]: read_source(p) for p in test_paths}
+    results = get_worker().run(skills, tests)
+    if not per_file:
+        return summarize(results)
+
+    counts = {f"{name}.py": [0, 0, 0] for name in tests}
+    for r in results:
+        entry = counts.get(r["test"].split("::")[0] + ".py")
+        if entry is None:
+            continue
+        entry[1] += 1
+        if r["outcome"] == "passed":
+            entry[0] += 1
+        else:
+            entry[2] = max(entry[2], 1 if "::" in r["test"] else 2)
+    return {fn: tuple(v) for fn, v in counts.items()}, summarize(results)[3]
 
 
 def score_candidate(passed, total, level, personality):
@@ -185,61 +305,311 @@ def score_candidate(passed, total, level, personality):
     return base + bias
 
 
+# ---------------------------------------------------------
+# ISOLATED CANDIDATE WORKSPACES
+# ---------------------------------------------------------
+
+def build_workspace(root, skill_paths, test_paths):
+    """
+    Lay out a private ai_core/ package under root holding the package
+    modules plus exactly the given skills and tests. Returns the workspace
+    tests dir.
+    """
+    pkg_dir = os.path.join(root, "ai_core")
+    skills_dir = os.path.join(pkg_dir, "skills")
+    tests_dir = os.path.join(pkg_dir, "tests")
+    os.makedirs(skills_dir)
+    os.makedirs(tests_dir)
+
+    for fn in os.listdir(AI_DIR):
+        if fn.endswith(".py"):
+            shutil.copyfile(os.path.join(AI_DIR, fn), os.path.join(pkg_dir, fn))
+
+    for src_dir, dst_dir in ((SKILLS_DIR, skills_dir), (TESTS_DIR, tests_dir)):
+        init_py = os.path.join(src_dir, "__init__.py")
+        if os.path.exists(init_py):
+            shutil.copyfile(init_py, os.path.join(dst_dir, "__init__.py"))
+
+    if os.path.exists(SKILL_TABLE_FILE):
+        shutil.copyfile(SKILL_TABLE_FILE, os.path.join(skills_dir, os.path.basename(SKILL_TABLE_FILE)))
+
+    for paths, dst_dir in ((skill_paths, skills_dir), (test_paths, tests_dir)):
+        for path in paths:
+            shutil.copyfile(path, os.path.join(dst_dir, os.path.basename(path)))
+
+    return tests_dir
+
+
+def list_promoted_skills():
+    return sorted(
+        os.path.join(SKILLS_DIR, fn)
+        for fn in os.listdir(SKILLS_DIR)
+        if fn.endswith(".py") and fn != "__init__.py"
+    )
+
+
+def promoted_skill_path(name):
+    """File a promoted skill lives in: its module, or the skill table for packed rows."""
+    path = os.path.join(SKILLS_DIR, f"{name}.py")
+    if not os.path.exists(path) and os.path.exists(SKILL_TABLE_FILE):
+        info = skills.registry.info(name)
+        if info and info.get("table"):
+            return SKILL_TABLE_FILE
+    return path
+
+
+def candidate_resolver(candidate):
+    """skill name -> file, with the candidate's own name pointing at its candidate copy."""
+    def resolve(name):
+        if name == candidate["name"]:
+            return candidate["skill_path"]
+        return promoted_skill_path(name)
+    return resolve
+
+
+def evaluate_candidate(job):
+    """
+    Run tests for one candidate inside its own scratch workspace (or in the
+    warm test worker when job["runner"] == "worker").
+
+    The workspace holds job["skill_paths"] (default: every promoted skill)
+    plus the candidate skill, and job["baseline_tests"] plus the candidate
+    test. Returns (passed, total, rc, output), or ({file: (passed, total, rc)},
+    output) when job["per_file"] is set.
+    Safe to call from a worker process: nothing outside the workspace is touched.
+    """
+    skill_paths = job.get("skill_paths")
+    skill_paths = list(list_promoted_skills() if skill_paths is None else skill_paths)
+    test_paths = list(job["baseline_tests"])
+    if job.get("skill_path"):
+        skill_paths.append(job["skill_path"])
+    if job.get("test_path"):
+        test_paths.append(job["test_path"])
+    per_file = job.get("per_file", False)
+
+    if job.get("runner") == "worker":
+        with tracing.span("candidate.worker", candidate=job["name"], tests=len(test_paths)):
+            return run_worker_on_sources(skill_paths, test_paths, per_file)
+
+    os.makedirs(WORKSPACES_DIR, exist_ok=True)
+    root = tempfile.mkdtemp(prefix=f"{job['name']}_", dir=WORKSPACES_DIR)
+    try:
+        with tracing.span("candidate.copy", candidate=job["name"], files=len(skill_paths) + len(test_paths)):
+            tests_dir = build_workspace(root, skill_paths, test_paths)
+        with tracing.span("candidate.pytest", candidate=job["name"], tests=len(test_paths)):
+            if per_file:
+                return run_pytest_per_file(tests_dir, cwd=root)
+            return run_pytest_on_tests(tests_dir, cwd=root)
+    finally:
+        with tracing.span("candidate.cleanup", candidate=job["name"]):
+            shutil.rmtree(root, ignore_errors=True)
+
+
+def evaluate_candidates(eval_jobs, jobs=1):
+    """evaluate_candidate over eval_jobs, in a process pool when jobs > 1 (spans are merged back)."""
+    if jobs > 1 and len(eval_jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(eval_jobs))) as pool:
+            if not tracing.enabled():
+                return list(pool.map(evaluate_candidate, eval_jobs))
+            captured = list(pool.map(partial(tracing.run_captured, evaluate_candidate), eval_jobs))
+        for _, records in captured:
+            tracing.merge(records)
+        return [result for result, _ in captured]
+    return [evaluate_candidate(j) for j in eval_jobs]
+
+
+def list_baseline_tests():
+    return sorted(
+        os.path.join(TESTS_DIR, fn)
+        for fn in os.listdir(TESTS_DIR)
+        if fn.startswith("test_") and fn.endswith(".py")
+    )
+
+
+def refresh_test_cache(cache, test_paths, runner="pytest"):
+    """
+    Re-run only the baseline tests whose content-hash key changed, in one
+    batch, and return the (passed, total, rc) result of every baseline test.
+    """
+    keys = {p: cache.key_for(p, promoted_skill_path) for p in test_paths}
+    stale = [p for p in test_paths if cache.lookup(os.path.basename(p), keys[p]) is None]
+
+    if stale:
+        deps = sorted({
+            promoted_skill_path(name)
+            for p in stale
+            for name in imported_skills(read_source(p))
+            if os.path.exists(promoted_skill_path(name))
+        })
+        per_file, _ = evaluate_candidate({
+            "name": "baseline",
+            "skill_paths": deps,
+            "baseline_tests": stale,
+            "runner": runner,
+            "per_file": True,
+        })
+        for p in stale:
+            fn = os.path.basename(p)
+            cache.store(fn, keys[p], per_file.get(fn, (0, 0, 2)))
+
+    return [cache.lookup(os.path.basename(p), keys[p]) for p in test_paths]
+
+
 # ---------------------------------------------------------
 # CANDIDATE PROPOSE / TEST / SELECT
 # ---------------------------------------------------------
 
-def propose_and_test_candidates(num_candidates=3):
-    memory = load_memory()
+def compute_next_level(catalog=None):
+    if catalog is not None:
+        return catalog.next_level()
+    return 1 + len(load_memory().get("skills", []))
+
+
+def suite_fingerprint(baseline_tests, runner):
+    """Hash of everything besides the candidate that a full-suite result depends on."""
+    h = hashlib.sha256(runner.encode())
+    for path in CACHE_SALT_FILES + list_promoted_skills() + baseline_tests + [SKILL_TABLE_FILE]:
+        h.update(f"{os.path.basename(path)}:{file_digest(path)}\n".encode())
+    return h.hexdigest()
+
+
+def fitness_key(candidate, context):
+    # proposed candidates are unmodified templates: same outcome at every level
+    return candidate_key(
+        candidate["name"],
+        read_source(candidate["skill_path"]),
+        read_source(candidate["test_path"]),
+        context,
+        level=candidate["level"]
+    )
+
+
+def propose_and_test_candidates(num_candidates=3, jobs=1, runner="pytest", incremental=False,
+                                catalog=None, fitness=None, metrics=None, test_cache=None):
     personality = load_personality()
 
-    next_level = 1 + len(memory.get("skills", []))
+    next_level = compute_next_level(catalog)
+    baseline_tests = list_baseline_tests()
     candidates = []
 
     for i in range(num_candidates):
         name = f"skill_{next_level}_{i}_{uuid.uuid4().hex[:6]}"
         level = next_level + i
 
-        code = generate_skill_template(name, level, personality)
-        test = generate_test(name, level)
-
-        cand_dir = os.path.join(CANDIDATES_DIR, name)
-        os.makedirs(cand_dir, exist_ok=True)
-
-        skill_path = os.path.join(cand_dir, f"{name}.py")
-        test_path = os.path.join(TESTS_DIR, f"test_{name}.py")
-
-        write_safe(skill_path, code)
-        write_safe(test_path, test)
-
-        # load candidate temporarily into skills folder
-        temp_skill_dest = os.path.join(SKILLS_DIR, f"{name}.py")
-        shutil.copyfile(skill_path, temp_skill_dest)
+        with tracing.span("candidate.template", candidate=name):
+            code = generate_skill_template(name, level, personality)
+            test = generate_test(name, level)
 
-        passed, total, rc, out = run_pytest_on_tests(TESTS_DIR)
+        with tracing.span("candidate.write", candidate=name):
+            cand_dir = os.path.join(CANDIDATES_DIR, name)
+            os.makedirs(cand_dir, exist_ok=True)
 
-        # cleanup
-        if os.path.exists(temp_skill_dest):
-            os.remove(temp_skill_dest)
+            skill_path = os.path.join(cand_dir, f"{name}.py")
+            test_path = os.path.join(cand_dir, f"test_{name}.py")
 
-        score = score_candidate(passed, total or 1, level, personality)
+            write_safe(skill_path, code)
+            write_safe(test_path, test)
 
         candidates.append({
             "name": name,
             "level": level,
             "skill_path": skill_path,
             "test_path": test_path,
-            "passed": passed,
-            "total": total,
-            "rc": rc,
-            "score": score,
-            "output": out
         })
 
+    try:
+        return score_candidates(candidates, personality, baseline_tests, jobs, runner,
+                                incremental, fitness, metrics, test_cache)
+    except BaseException:
+        # nothing will archive these: do not leave staging dirs behind
+        for c in candidates:
+            remove_staging_dir(c["name"])
+        raise
+
+
+def score_candidates(candidates, personality, baseline_tests, jobs=1, runner="pytest",
+                     incremental=False, fitness=None, metrics=None, test_cache=None):
+    """Evaluate staged candidates (see propose_and_test_candidates) and fill in their scores."""
+    # each candidate sees the baseline suite plus only its own files,
+    # so serial and parallel runs produce identical results
+    if incremental:
+        # baseline results come from the hash-keyed cache (re-running only
+        # what changed); candidates then run nothing but their own test
+        with tracing.span("baseline.refresh", tests=len(baseline_tests)):
+            cache = test_cache if test_cache is not None else ResultCache(TEST_CACHE_FILE, CACHE_SALT_FILES)
+            baseline_results = refresh_test_cache(cache, baseline_tests, runner)
+        eval_jobs = [
+            dict(c, baseline_tests=[], skill_paths=[], per_file=True, runner=runner)
+            for c in candidates
+        ]
+    else:
+        eval_jobs = [dict(c, baseline_tests=baseline_tests, runner=runner) for c in candidates]
+
+    # fitness memoization: what gets cached is the evaluated unit's
+    # (passed, total, rc) -- the candidate's own test in incremental mode,
+    # the whole suite (fingerprinted) otherwise
+    keys = [None] * len(candidates)
+    hits = [None] * len(candidates)
+    repeats = [False] * len(candidates)
+    if fitness is not None:
+        context = f"{runner}:own" if incremental else suite_fingerprint(baseline_tests, runner)
+        keys = [fitness_key(c, context) for c in candidates]
+        seen = set()
+        for i, key in enumerate(keys):
+            if key in seen:
+                repeats[i] = True  # looked up once its first occurrence has been evaluated
+            else:
+                seen.add(key)
+                hits[i] = fitness.get(key)
+    pending = [j for j, hit, repeat in zip(eval_jobs, hits, repeats) if hit is None and not repeat]
+
+    with tracing.span("candidate.evaluate", candidates=len(pending), jobs=jobs, runner=runner):
+        fresh = iter(evaluate_candidates(pending, jobs))
+
+    results = []
+    for i, (c, key) in enumerate(zip(candidates, keys)):
+        if repeats[i]:
+            hits[i] = fitness.get(key)
+        hit = hits[i]
+        if hit is not None:
+            triple = (hit["passed"], hit["total"], hit["rc"])
+            out = "[fitness-cache] hit"
+        elif incremental:
+            per_file, out = next(fresh)
+            triple = per_file.get(os.path.basename(c["test_path"]), (0, 0, 2))
+        else:
+            *triple, out = next(fresh)
+            triple = tuple(triple)
+
+        if hit is None and key is not None:
+            fitness.put(key, dict(zip(("passed", "total", "rc"), triple)))
+
+        if incremental:
+            test_name = os.path.basename(c["test_path"])
+            cache.store(test_name, cache.key_for(c["test_path"], candidate_resolver(c)), triple)
+            out += f"\n[incremental] reused {len(baseline_results)} cached baseline results"
+            triple = combine(baseline_results + [triple])
+        results.append(tuple(triple) + (out,))
+
+    if incremental:
+        cache.save()
+
+    with tracing.span("candidate.score", candidates=len(candidates)):
+        for c, hit, (passed, total, rc, out) in zip(candidates, hits, results):
+            c.update({
+                "passed": passed,
+                "total": total,
+                "rc": rc,
+                "score": score_candidate(passed, total or 1, c["level"], personality),
+                "output": out
+            })
+            if metrics is not None:
+                metrics.record(c, personality, cached=hit is not None)
+
     return candidates
 
 
-def promote_best_candidate(candidates):
+def promote_best_candidate(candidates, catalog=None, store="module"):
     if not candidates:
         return None
 
@@ -249,47 +619,427 @@ def promote_best_candidate(candidates):
     dst_skill = os.path.join(SKILLS_DIR, f"{best['name']}.py")
     dst_test = os.path.join(TESTS_DIR, f"test_{best['name']}.py")
 
-    # avoid SameFileError
-    if os.path.abspath(best["skill_path"]) != os.path.abspath(dst_skill):
-        shutil.copyfile(best["skill_path"], dst_skill)
+    with tracing.span("promote.copy_skill", candidate=best["name"], store=store):
+        # template skills can be stored as a skill table row instead of a module
+        table = SkillTable(SKILL_TABLE_FILE) if store == "table" else None
+        if table is not None and table.add_source(best["name"], read_source(best["skill_path"])):
+            table.save()
+        # avoid SameFileError
+        elif os.path.abspath(best["skill_path"]) != os.path.abspath(dst_skill):
+            shutil.copyfile(best["skill_path"], dst_skill)
+
+    with tracing.span("promote.copy_test", candidate=best["name"]):
+        if os.path.abspath(best["test_path"]) != os.path.abspath(dst_test):
+            shutil.copyfile(best["test_path"], dst_test)
+
+    # record memory (journal appends, no full rewrite)
+    with tracing.span("promote.memory", candidate=best["name"]):
+        record = {
+            "name": best["name"],
+            "level": best["level"],
+            "promoted_at": datetime.utcnow().isoformat() + "Z"
+        }
+        JOURNAL.append("skills", record)
+        if catalog is not None:
+            catalog.add(record)
+        JOURNAL.append("runs", {
+            "time": datetime.utcnow().isoformat() + "Z",
+            "action": "promote_best",
+            "candidate": best["name"],
+            "score": best["score"]
+        })
+
+    return best
 
-    if os.path.abspath(best["test_path"]) != os.path.abspath(dst_test):
-        shutil.copyfile(best["test_path"], dst_test)
 
-    # record memory
+# ---------------------------------------------------------
+# CANDIDATE STORE / GC
+# ---------------------------------------------------------
+
+def remove_staging_dir(name):
+    cand_dir = os.path.join(CANDIDATES_DIR, name)
+    if os.path.dirname(os.path.normpath(cand_dir)) != os.path.normpath(CANDIDATES_DIR):
+        raise RuntimeError(f"Unsafe delete: {cand_dir}")
+    shutil.rmtree(cand_dir, ignore_errors=True)
+
+
+def archive_candidates(candidates, promoted=None):
+    """
+    Move this run's candidates from their staging dirs into the
+    content-addressed store (identical bodies are stored once).
+    """
+    store = CandidateStore(OBJECTS_DIR)
+    with tracing.span("candidate.archive", candidates=len(candidates)):
+        for c in candidates:
+            store.add(
+                c["name"],
+                read_source(c["skill_path"]),
+                read_source(c["test_path"]),
+                level=c["level"],
+                score=c.get("score"),
+                promoted=promoted is not None and c["name"] == promoted["name"]
+            )
+            remove_staging_dir(c["name"])
+        store.save()
+    return store
+
+
+def skill_exists(name):
+    return os.path.exists(promoted_skill_path(name))
+
+
+def import_legacy_candidates(store, dry_run=False):
+    """
+    Fold candidates/<name>/ dirs left by older runs into the store; their
+    tests may still sit in the tests dir (gc removes those as orphans).
+    """
+    imported = []
+    for name in sorted(os.listdir(CANDIDATES_DIR)):
+        cand_dir = os.path.join(CANDIDATES_DIR, name)
+        skill_path = os.path.join(cand_dir, f"{name}.py")
+        if not os.path.isfile(skill_path):
+            continue
+        imported.append(name)
+        if dry_run:
+            continue
+        if name not in store.candidates:
+            test_path = next(
+                (p for p in (os.path.join(cand_dir, f"test_{name}.py"), os.path.join(TESTS_DIR, f"test_{name}.py"))
+                 if os.path.exists(p)),
+                None
+            )
+            level = re.search(r"^Level:\s*(\d+)", read_source(skill_path), re.MULTILINE)
+            store.add(
+                name,
+                read_source(skill_path),
+                read_source(test_path) if test_path else "",
+                level=int(level.group(1)) if level else None,
+                promoted=skill_exists(name),
+                created=datetime.utcfromtimestamp(os.stat(skill_path).st_mtime).isoformat() + "Z"
+            )
+        remove_staging_dir(name)
+    return imported
+
+
+def orphan_tests():
+    """Tests importing a skill that is neither a module nor a skill table row."""
+    return [
+        path for path in list_baseline_tests()
+        if any(not skill_exists(name) for name in imported_skills(read_source(path)))
+    ]
+
+
+def collect_garbage(keep_last=50, max_age_days=None, dry_run=False):
+    store = CandidateStore(OBJECTS_DIR)
+    legacy = import_legacy_candidates(store, dry_run)
+    stats = store.gc(keep_last, max_age_days, dry_run=dry_run)
+    orphans = orphan_tests()
     memory = load_memory()
-    memory.setdefault("skills", []).append({
-        "name": best["name"],
-        "level": best["level"],
-        "promoted_at": datetime.utcnow().isoformat() + "Z"
-    })
-    memory.setdefault("runs", []).append({
-        "time": datetime.utcnow().isoformat() + "Z",
-        "action": "promote_best",
-        "candidate": best["name"],
-        "score": best["score"]
-    })
-    save_memory(memory)
+    if dry_run:
+        stats["would_remove"]["orphan_tests"] = len(orphans)
+        stats.update(
+            legacy_would_import=len(legacy),
+            runs_would_archive=JOURNAL.retention["runs"].expired(memory.get("runs", []))
+        )
+    else:
+        for path in orphans:
+            os.remove(path)
+        # compaction applies the "runs" retention policy
+        runs_archived = len(memory.get("runs", []))
+        JOURNAL.compact(memory)
+        runs_archived -= len(memory.get("runs", []))
+        stats.update(legacy_imported=len(legacy), orphan_tests_removed=len(orphans), runs_archived=runs_archived)
+    for path in orphans:
+        print("[gc] orphan test:", os.path.relpath(path, BASE_DIR))
+    return stats
 
-    return best
+
+# ---------------------------------------------------------
+# POPULATION EVOLUTION
+# ---------------------------------------------------------
+
+def new_individual(name, level, personality):
+    return {
+        "name": name,
+        "level": level,
+        "code": generate_skill_template(name, level, personality),
+        "test": generate_test(name, level),
+    }
+
+
+def individual_engine(ind, mutators=(), rng=random):
+    """Mutation engine over an individual's own source (parsed once, then shared by its descendants)."""
+    if "engine" not in ind:
+        ind["engine"] = mutation.MutationEngine(
+            ind["code"], operators=mutators, rng=rng,
+            identity=normalize_source(ind["code"], ind["name"])
+        )
+        ind["root"] = (ind["level"], ind["name"])
+        ind["lineage"] = []
+    return ind["engine"]
+
+
+def mutate_individual(parent, name, personality, mutators=(), edits=1, rng=random):
+    """
+    Child of parent at a mutated level: a compiled mutant of the parent's
+    lineage (level retarget plus `edits` random operator edits when
+    mutators are enabled); no template text is generated or parsed.
+    """
+    engine = individual_engine(parent, mutators, rng)
+    level = mutation.mutate_level(parent["level"], rng)
+    root_level, _ = parent["root"]
+    mutant = engine.derive(parent["lineage"], root_level, level, edits if mutators else 0)
+    return {
+        "name": name,
+        "level": level,
+        "engine": engine,
+        "root": parent["root"],
+        "lineage": mutant.lineage,
+        "mutant": mutant,
+        "test": generate_test(name, level),
+    }
+
+
+def individual_source(ind):
+    """Source text of an individual (spliced from its mutant's edits when it has one)."""
+    if "mutant" not in ind:
+        return ind["code"]
+    root_level, root_name = ind["root"]
+    engine = ind["engine"]
+    edits = engine.lineage_edits(ind["lineage"], root_level, ind["level"], root_name, ind["name"])
+    return mutation.splice(engine.source, edits)
+
+
+def evaluate_individual(ind, personality, fitness=None, metrics=None, generation=0):
+    """Score an in-memory individual with the in-process runner (no files, no subprocess)."""
+    key = hit = None
+    if fitness is not None:
+        # a mutant's identity covers its level: its edits may make the outcome level-dependent
+        identity = ind["mutant"].key if "mutant" in ind else ind["code"]
+        key = candidate_key(ind["name"], identity, ind["test"], "inprocess")
+        hit = fitness.get(key)
+
+    if hit is not None:
+        result, out = hit, "[fitness-cache] hit"
+    else:
+        skill = ind["mutant"].code if "mutant" in ind else ind["code"]
+        results = run_tests({ind["name"]: skill}, {f"test_{ind['name']}": ind["test"]})
+        passed, total, rc, out = summarize(results)
+        result = {"passed": passed, "total": total, "rc": rc}
+        if key is not None:
+            fitness.put(key, result)
+    ind.update(result, output=out)
+    ind["score"] = score_candidate(ind["passed"], ind["total"] or 1, ind["level"], personality)
+    if metrics is not None:
+        metrics.record(ind, personality, generation, cached=hit is not None)
+    return ind
+
+
+def tournament_select(population, size, rng=random):
+    return max(rng.sample(population, min(size, len(population))), key=lambda c: c["score"])
+
+
+def materialize_individual(ind):
+    """Write an individual's skill + test like a regular candidate so it can be promoted."""
+    cand_dir = os.path.join(CANDIDATES_DIR, ind["name"])
+    os.makedirs(cand_dir, exist_ok=True)
+    skill_path = os.path.join(cand_dir, f"{ind['name']}.py")
+    test_path = os.path.join(cand_dir, f"test_{ind['name']}.py")
+    write_safe(skill_path, individual_source(ind))
+    write_safe(test_path, ind["test"])
+    return dict(ind, skill_path=skill_path, test_path=test_path)
+
+
+def evolve_population(generations, population_size, catalog=None, elite=1,
+                      tournament_size=3, rng=random, fitness=None, mutators=(), edits=1,
+                      metrics=None):
+    """
+    Keep a population in memory for `generations` rounds: elitist carry-over
+    plus tournament selection and AST mutation (ai_core/mutation.py): level
+    retargeting always, operator edits for the enabled `mutators`.
+    Memory is only touched at generation boundaries. Returns the best
+    individual of the final population (not yet written to disk).
+    """
+    personality = load_personality()
+    base_level = compute_next_level(catalog)
+
+    with tracing.span("population.init", population=population_size):
+        population = [
+            evaluate_individual(
+                new_individual(f"skill_{base_level}_p{i}_{uuid.uuid4().hex[:6]}", base_level + i, personality),
+                personality,
+                fitness,
+                metrics
+            )
+            for i in range(population_size)
+        ]
+
+    for gen in range(1, generations + 1):
+        with tracing.span("population.generation", generation=gen):
+            population.sort(key=lambda c: c["score"], reverse=True)
+            offspring = population[:elite]
+            while len(offspring) < population_size:
+                parent = tournament_select(population, tournament_size, rng)
+                name = f"skill_{base_level}_g{gen}_{len(offspring)}_{uuid.uuid4().hex[:6]}"
+                child = mutate_individual(parent, name, personality, mutators, edits, rng)
+                offspring.append(evaluate_individual(child, personality, fitness, metrics, gen))
+            population = offspring
+
+        best = max(population, key=lambda c: c["score"])
+        mean = sum(c["score"] for c in population) / len(population)
+        JOURNAL.append("runs", {
+            "time": datetime.utcnow().isoformat() + "Z",
+            "action": "generation",
+            "generation": gen,
+            "population": len(population),
+            "best": best["name"],
+            "best_score": best["score"],
+            "mean_score": mean
+        })
+        print(f"[generation] {gen} best={best['name']} score={best['score']:.3f} mean={mean:.3f}")
+
+    return max(population, key=lambda c: c["score"])
 
 
 # ---------------------------------------------------------
 # MAIN
 # ---------------------------------------------------------
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Safe multi-candidate skill evolver")
+    parser.add_argument("command", nargs="?", default="run", choices=["run", "pack", "gc", "stats"],
+                        help="run: one generation (default); pack: move template skill "
+                             "modules into the skill table; gc: expire stored candidates, "
+                             "delete orphaned tests and archive old run events; stats: "
+                             "aggregate the recorded candidate evaluations")
+    parser.add_argument("--candidates", type=int, default=3,
+                        help="number of candidates proposed per generation")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="evaluate candidates in parallel with this many worker processes")
+    parser.add_argument("--runner", choices=["pytest", "worker"], default="pytest",
+                        help="pytest subprocess per candidate, or a warm in-process test worker")
+    parser.add_argument("--incremental", action="store_true",
+                        help="reuse cached results for baseline tests whose inputs are unchanged")
+    parser.add_argument("--catalog", action="store_true",
+                        help="build/use the indexed SQLite skill catalog (ai_core/skills.db)")
+    parser.add_argument("--store", choices=["module", "table"], default="module",
+                        help="promote template skills as .py modules or as skill table rows")
+    parser.add_argument("--fitness-cache", action="store_true",
+                        help="memoize candidate fitness by normalized source hash (ai_core/fitness_cache.json)")
+    parser.add_argument("--generations", type=int, default=0,
+                        help="evolve an in-memory population for this many generations")
+    parser.add_argument("--population", type=int, default=20,
+                        help="population size for --generations")
+    parser.add_argument("--mutators", nargs="*", default=[], choices=sorted(mutation.OPERATORS),
+                        help="--generations: AST operators applied to children besides the level change")
+    parser.add_argument("--mutation-edits", type=int, default=1,
+                        help="random operator edits per child")
+    parser.add_argument("--remove", action="store_true",
+                        help="pack: delete the packed .py modules")
+    parser.add_argument("--keep-candidates", type=int, default=50,
+                        help="gc: keep this many of the newest non-promoted candidates")
+    parser.add_argument("--max-age-days", type=float, default=None,
+                        help="gc: also expire non-promoted candidates older than this")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="gc: report what would be removed without deleting")
+    parser.add_argument("--trace", metavar="FILE",
+                        help=f"append per-phase timing spans to this JSONL file (or set ${tracing.TRACE_ENV})")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="write per-phase totals in Prometheus text format to this file or "
+                             f"directory (or set ${tracing.METRICS_ENV})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    tracing.configure_from_env("self_evolver_v2", args.trace, args.metrics)
+    try:
+        with tracing.span("run", command=args.command):
+            run_command(args)
+    finally:
+        tracing.flush()
+
+
+def run_command(args):
     ensure_dirs()
 
+    if args.command == "pack":
+        packed = pack_modules(SkillTable(SKILL_TABLE_FILE), SKILLS_DIR, remove=args.remove)
+        print(f"[evolver] packed {len(packed)} template skills into {SKILL_TABLE_FILE}")
+        return
+
+    if args.command == "stats":
+        print(json.dumps(MetricsStore(METRICS_DIR).summary(), indent=2))
+        return
+
+    if args.command == "gc":
+        stats = collect_garbage(args.keep_candidates, args.max_age_days, args.dry_run)
+        print("[gc]", "(dry run)" if args.dry_run else "", json.dumps(stats))
+        return
+
     print("[evolver] start run:", datetime.utcnow().isoformat() + "Z")
+    state = open_run_state(args)
+    try:
+        return run_generation(args, **state)
+    finally:
+        close_run_state(state)
+
+
+def open_run_state(args, catalog=None):
+    """
+    Catalog, caches and metrics store a run works against. The daemon opens
+    them once and reuses them across generations; catalog=True forces the
+    catalog open (built from memory if needed).
+    """
+    return {
+        "catalog": open_catalog(build=args.catalog if catalog is None else catalog),
+        "fitness": FitnessCache(FITNESS_CACHE_FILE) if args.fitness_cache else None,
+        "test_cache": ResultCache(TEST_CACHE_FILE, CACHE_SALT_FILES) if args.incremental else None,
+        "evaluations": MetricsStore(METRICS_DIR),
+    }
+
+
+def refresh_run_state(state):
+    """
+    Ready long-lived run state for its next generation: a new metrics run
+    id, and a test-cache salt re-hashed from the current salt files.
+    """
+    if state["test_cache"] is not None:
+        state["test_cache"].refresh_salt()
+    if state["evaluations"] is not None:
+        state["evaluations"].new_run()
+
+
+def close_run_state(state):
+    if state["catalog"] is not None:
+        state["catalog"].close()
+
+
+def run_generation(args, catalog=None, fitness=None, test_cache=None, evaluations=None):
+    """One propose / evaluate / promote / archive round; returns the promoted candidate."""
+    if args.generations > 0:
+        best = evolve_population(args.generations, args.population, catalog, fitness=fitness,
+                                 mutators=args.mutators, edits=args.mutation_edits, metrics=evaluations)
+        candidates = [materialize_individual(best)]
+    else:
+        candidates = propose_and_test_candidates(
+            num_candidates=args.candidates, jobs=args.jobs, runner=args.runner,
+            incremental=args.incremental, catalog=catalog, fitness=fitness, metrics=evaluations,
+            test_cache=test_cache
+        )
+    if evaluations is not None:
+        evaluations.flush()
 
-    candidates = propose_and_test_candidates(num_candidates=3)
+    if fitness is not None:
+        fitness.save()
+        print("[fitness-cache]", json.dumps(fitness.stats()))
 
     for c in candidates:
         print(f"[candidate] {c['name']} pass={c['passed']}/{c['total']} "
               f"score={c['score']:.3f} rc={c['rc']}")
 
-    best = promote_best_candidate(candidates)
+    best = promote_best_candidate(candidates, catalog, store=args.store)
+    archive_candidates(candidates, best)
 
     if best:
         print("[evolver] promoted:", best["name"], "score:", best["score"])
@@ -298,6 +1048,7 @@ def main():
         print("[evolver] no candidate promoted")
 
     print("[evolver] end run")
+    return best
 
 
 if __name__ == "__main__":
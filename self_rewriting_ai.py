@@ -5,12 +5,17 @@ Advanced safe self-rewriting AI (final version).
 
 import json
 import os
-import re
 from datetime import datetime
 
+from ai_core import rewrite, tracing
+from ai_core.retention import Retention
+
 AI_FILE = os.path.abspath(__file__)
 MEMORY_FILE = "ai_memory.json"
 
+# history older than 30 days is rolled up per day and archived to ai_core/archive
+HISTORY_RETENTION = Retention("history")
+
 # -------------------------------------------------------------------
 # MEMORY SYSTEM
 # -------------------------------------------------------------------
@@ -21,9 +26,67 @@ def load_memory():
         return json.load(f)
 
 
+def _write_memory_text(text):
+    # temp file + os.replace: readers never see a half-written file
+    tmp = MEMORY_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, MEMORY_FILE)
+
+
 def save_memory(memory):
-    with open(MEMORY_FILE, "w", encoding="utf-8") as f:
-        json.dump(memory, f, indent=4)
+    _write_memory_text(json.dumps(memory, indent=4))
+
+
+_session = None
+
+
+class MemorySession:
+    """
+    Unit of work for one run: every mutation made inside the `with` block
+    is flushed once on exit (atomically), and only if one was committed
+    (commit_memory / record_event mark the session changed). Nothing is
+    written when the block raises. Sessions nest: the enclosing session is
+    current again once an inner one exits.
+    """
+
+    def __init__(self, memory_obj):
+        self.memory = memory_obj
+        self.changed = False
+        self._outer = None
+
+    def __enter__(self):
+        global _session
+        self.changed = False
+        self._outer = _session
+        _session = self
+        return self.memory
+
+    def __exit__(self, exc_type, exc, tb):
+        global _session
+        _session, self._outer = self._outer, None
+        if exc_type is None:
+            with tracing.span("memory.flush") as span:
+                span.set(written=self.changed)
+                if self.changed:
+                    save_memory(self.memory)
+        return False
+
+
+def commit_memory(memory_obj):
+    """Persist now, unless a MemorySession is open (it flushes once on exit)."""
+    if _session is None:
+        save_memory(memory_obj)
+    else:
+        _session.changed = True
+
+
+def record_event(memory_obj, **event):
+    """Append a timestamped event to memory["history"] and commit it."""
+    memory_obj.setdefault("history", []).append(
+        dict(time=datetime.utcnow().isoformat() + "Z", **event)
+    )
+    commit_memory(memory_obj)
 
 
 memory = load_memory()
@@ -34,13 +97,7 @@ memory = load_memory()
 def reward_ai(amount=1):
     memory["reward"] = memory.get("reward", 0) + amount
     memory["knowledge"] = memory.get("knowledge", 0) + amount
-    memory.setdefault("history", []).append(
-        {
-            "time": datetime.utcnow().isoformat() + "Z",
-            "event": f"AI improved knowledge by {amount}",
-        }
-    )
-    save_memory(memory)
+    record_event(memory, event=f"AI improved knowledge by {amount}")
 
 
 # -------------------------------------------------------------------
@@ -58,10 +115,7 @@ def reflect(memory_obj):
         "I will focus on improving internal functions inside allowed blocks.\n"
     )
 
-    memory_obj.setdefault("history", []).append(
-        {"time": datetime.utcnow().isoformat() + "Z", "reflection": reflection}
-    )
-    save_memory(memory_obj)
+    record_event(memory_obj, reflection=reflection)
     return reflection
 
 
@@ -69,8 +123,11 @@ def reflect(memory_obj):
 # SAFE SELF-REWRITING ENGINE
 # -------------------------------------------------------------------
 
-START_TAG = "# === AI_REWRITE_START ==="
-END_TAG = "# === AI_REWRITE_END ==="
+START_TAG = rewrite.START_TAG
+END_TAG = rewrite.END_TAG
+
+# files whose tagged blocks are regenerated on each run
+REWRITE_TARGETS = [AI_FILE]
 
 def generate_improved_code(old_code_block, memory_obj):
     lvl = int(memory_obj.get("knowledge", 1))
@@ -96,34 +153,29 @@ def ai_decision_engine():
     return new_code
 
 
-def rewrite_self():
-    with open(AI_FILE, "r", encoding="utf-8") as f:
-        content = f.read()
-
-    pattern = re.compile(
-        re.escape(START_TAG) + r"(.*?)" + re.escape(END_TAG),
-        re.DOTALL
-    )
-    m = pattern.search(content)
-    if not m:
-        print("❌ Rewrite markers not found. No changes made.")
+def rewrite_self(targets=None):
+    """
+    Regenerate every tagged block in targets (default REWRITE_TARGETS).
+    Returns True if files were rewritten, None if everything was already
+    up to date (nothing is written), False if the rewrite was rejected.
+    """
+    try:
+        written = rewrite.rewrite(
+            targets or REWRITE_TARGETS,
+            lambda block: generate_improved_code(block.text, memory)
+        )
+    except rewrite.RewriteError as e:
+        print(f"❌ Rewrite rejected, no changes made: {e}")
         return False
-
-    old_block = m.group(1)
-    new_block = "\n" + generate_improved_code(old_block, memory) + "\n"
-
-    updated = content[:m.start(1)] + new_block + content[m.end(1):]
-
-    if START_TAG not in updated or END_TAG not in updated:
-        print("❌ Safety check failed: tags missing after update.")
+    except OSError as e:
+        print(f"❌ Rewrite failed, no changes made: {e}")
         return False
 
-    tmp = AI_FILE + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        f.write(updated)
-    os.replace(tmp, AI_FILE)
+    if not written:
+        print("ℹ️ Rewrite blocks already up to date. No changes made.")
+        return None
 
-    print("✅ AI successfully rewrote its own code.")
+    print(f"✅ AI successfully rewrote its own code ({len(written)} file(s)).")
     return True
 
 
@@ -131,19 +183,37 @@ def rewrite_self():
 # MAIN EXECUTION
 # -------------------------------------------------------------------
 def main():
+    # per-phase timing when EVOLVER_TRACE / EVOLVER_METRICS is set
+    tracing.configure_from_env("self_rewriting_ai")
+    try:
+        with tracing.span("run"):
+            evolve()
+    finally:
+        tracing.flush()
+
+
+def evolve():
     print("=== AI SELF EVOLUTION START ===")
     print(f"Current knowledge: {memory.get('knowledge')} | reward: {memory.get('reward')}")
 
-    reflect(memory)
-    reward_ai(1)
-
-    ok = rewrite_self()
-    if ok:
-        memory.setdefault("history", []).append({
-            "time": datetime.utcnow().isoformat() + "Z",
-            "event": "rewrite_success"
-        })
-        save_memory(memory)
+    # one atomic memory write for the whole run
+    with MemorySession(memory):
+        with tracing.span("reflect"):
+            reflect(memory)
+        with tracing.span("reward"):
+            reward_ai(1)
+
+        with tracing.span("rewrite_self") as span:
+            ok = rewrite_self()
+            span.set(ok=ok)
+        if ok:
+            record_event(memory, event="rewrite_success")
+
+        with tracing.span("retention") as span:
+            archived = HISTORY_RETENTION.apply(memory, "history")
+            span.set(archived=archived)
+            if archived:
+                commit_memory(memory)
 
     print("AI knowledge increased to:", memory.get("knowledge"))
     print("=== AI SELF EVOLUTION END ===")
@@ -0,0 +1,67 @@
+import os
+import sys
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import pytest
+
+# the repo root holds the evolver scripts and the ai_core package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """
+    DuckDuckGo / Wikipedia summary stand-in. Wikipedia answers carry ETag =
+    current version and get a 304 on a matching If-None-Match; queries
+    starting with "slow" take 0.3s longer, and Wikipedia lookups of queries
+    starting with "hang" take 2s longer.
+    """
+
+    protocol_version = "HTTP/1.1"
+    version = 1
+    delay = 0.0
+    requests = []
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = unquote(url.path)
+        if path == "/ddg":
+            path += "/" + parse_qs(url.query)["q"][0]
+        self.requests.append((path, self.headers.get("If-None-Match")))
+        extra = 0.3 if "/slow" in path else 2.0 if path.startswith("/wiki/hang") else 0.0
+        time.sleep(self.delay + extra)
+        etag = f'"v{self.version}"'
+        if path.startswith("/ddg/"):
+            q = path[len("/ddg/"):]
+            body = json.dumps({"Heading": q, "Abstract": f"about {q}", "Answer": ""}).encode()
+            code = 200
+        elif not path.startswith("/wiki/"):
+            body, code = b"{}", 404
+        elif self.headers.get("If-None-Match") == etag:
+            body, code = b"", 304
+        else:
+            q = path[len("/wiki/"):]
+            body = json.dumps({"title": q, "description": "d", "extract": f"{q} v{self.version}"}).encode()
+            code = 200
+        self.send_response(code)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    handler = type("Handler", (StandIn,), {"requests": []})
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield handler, f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
@@ -0,0 +1,69 @@
+import pytest
+
+from ai_core import batch, skills
+from ai_core.registry import SkillRegistry
+from ai_core.skill_table import SkillTable
+import self_evolver_v2 as evolver
+
+MODULES = {
+    "skill_t3": evolver.generate_skill_template("skill_t3", 3, {}),
+    "skill_t5": evolver.generate_skill_template("skill_t5", 5, {}),
+    "skill_square": "def run(x):\n    return x * x - 5\n",
+    # looks like the template, but max is rebound: must not be vectorized
+    "skill_rebound": "def max(a, b):\n    return a - b\n\ndef run(x):\n    return max(0, (x + 1) * 2)\n",
+}
+
+INPUTS = [
+    list(range(-10, 10)),
+    [2 ** 62, -2 ** 62, 7],  # would overflow int64: per-call fallback
+    [0.5, -3.0, 2],
+    [],
+]
+
+
+@pytest.fixture(params=["numpy", "pure"])
+def backend(request, monkeypatch):
+    if request.param == "pure":
+        monkeypatch.setattr(batch, "np", None)
+    elif batch.np is None:
+        pytest.skip("numpy not installed")
+    return request.param
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    package = tmp_path / "batch_skills"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    for name, source in MODULES.items():
+        (package / f"{name}.py").write_text(source)
+    table = SkillTable(str(tmp_path / "table.json"))
+    table.add("skill_row", 4, desc="packed")
+    table.save()
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    reg = SkillRegistry("batch_skills", str(package), table_path=table.path)
+    monkeypatch.setattr(skills, "registry", reg)
+    return reg
+
+
+def _rows(matrix):
+    return [list(row) for row in (matrix.tolist() if hasattr(matrix, "tolist") else matrix)]
+
+
+@pytest.mark.parametrize("inputs", INPUTS)
+def test_batch_matches_run_loop(registry, backend, inputs):
+    names, matrix = batch.run_batch_all(inputs)
+    assert names == sorted(list(MODULES) + ["skill_row"])
+    expected = [[registry.get(name).run(x) for x in inputs] for name in names]
+    assert _rows(matrix) == expected
+
+    for name, row in zip(names, expected):
+        result = batch.run_batch(name, inputs)
+        assert list(result.tolist() if hasattr(result, "tolist") else result) == row
+
+
+def test_template_detection():
+    assert batch.template_params(MODULES["skill_t3"]) == (3, 3)
+    assert batch.template_params(MODULES["skill_square"]) is None
+    assert batch.template_params(MODULES["skill_rebound"]) is None
@@ -0,0 +1,59 @@
+import time
+
+import self_evolver_v2 as evolver
+from ai_core.candidate_store import CandidateStore
+
+PERSONALITY = {"type": "helper"}
+
+
+def _sources(name, level=2):
+    return evolver.generate_skill_template(name, level, PERSONALITY), evolver.generate_test(name, level)
+
+
+def test_identical_candidates_share_blobs(tmp_path):
+    store = CandidateStore(str(tmp_path))
+    a = _sources("skill_2_1_aaaaaa")
+    time.sleep(0.001)  # a different Generated: stamp
+    b = _sources("skill_2_1_bbbbbb")
+    assert a[0] != b[0]
+
+    ea = store.add("skill_2_1_aaaaaa", *a, level=2)
+    eb = store.add("skill_2_1_bbbbbb", *b, level=2)
+    assert (ea["skill"], ea["test"]) == (eb["skill"], eb["test"])
+    assert len(list(store.iter_objects())) == 2
+    assert "skill_2_1_aaaaaa" not in store.get(ea["skill"])
+
+    store.save()
+    reopened = CandidateStore(str(tmp_path))
+    assert reopened.sources("skill_2_1_aaaaaa") == a
+    assert reopened.sources("skill_2_1_bbbbbb") == b
+
+
+def test_placeholder_text_is_stored_verbatim(tmp_path):
+    store = CandidateStore(str(tmp_path))
+    skill = 'NAME = "<name>"\nREAL = "odd"\n'
+    entry = store.add("odd", skill, "")
+    assert not entry["normalized"]
+    assert store.sources("odd") == (skill, "")
+
+
+def test_gc_sweeps_unreferenced_blobs(tmp_path):
+    store = CandidateStore(str(tmp_path))
+    kept = _sources("kept", 1)
+    store.add("kept", *kept, promoted=True, created="2020-01-01T00:00:00Z")
+    store.add("old", *_sources("old", 3), created="2020-01-01T00:00:00Z")
+    stats = store.gc(keep_last=0)
+    assert stats["candidates_removed"] == 1
+    assert stats["objects_removed"] == 2
+    assert sorted(store.candidates) == ["kept"]
+    assert store.sources("kept") == kept
+
+
+def test_gc_dry_run_removes_nothing(tmp_path):
+    store = CandidateStore(str(tmp_path))
+    store.add("old", *_sources("old", 3), created="2020-01-01T00:00:00Z")
+    stats = store.gc(keep_last=0, dry_run=True)
+    assert stats["would_remove"] == {"candidates": 1, "objects": 2}
+    assert "candidates_removed" not in stats
+    assert sorted(store.candidates) == ["old"]
+    assert len(list(store.iter_objects())) == 2
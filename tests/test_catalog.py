@@ -0,0 +1,69 @@
+import random
+
+from ai_core.catalog import SkillCatalog
+from ai_core.journal import MemoryJournal
+
+
+def _journal(tmp_path):
+    return MemoryJournal(str(tmp_path / "ai_memory.json"), compact_every=0)
+
+
+def _open(tmp_path, journal):
+    return SkillCatalog(str(tmp_path / "skills.db"), journal=journal)
+
+
+def test_next_level_counts_skills(tmp_path):
+    journal = _journal(tmp_path)
+    journal.append("skills", {"name": "skill_1", "level": 1})
+    journal.append("skills", {"name": "skill_2", "level": 2})
+    journal.update("skills", {"name": "skill_2"}, {"level": 5})
+    with _open(tmp_path, journal) as catalog:
+        assert catalog.count() == 2
+        assert catalog.next_level() == 1 + len(journal.load()["skills"]) == 3
+
+
+def test_resyncs_after_outside_writes(tmp_path):
+    journal = _journal(tmp_path)
+    journal.append("skills", {"name": "skill_1", "level": 1})
+    journal.append("skills", {"name": "skill_2", "level": 2})
+    _open(tmp_path, journal).close()
+
+    # written by a process that did not have the catalog open
+    journal.append("skills", {"name": "skill_3", "level": 3})
+    journal.update("skills", {"name": "skill_1"}, {"level": 4})
+    memory = journal.load()
+    memory["skills"] = [s for s in memory["skills"] if s["name"] != "skill_2"]
+    journal.compact(memory)
+
+    with _open(tmp_path, journal) as catalog:
+        assert catalog.count() == 2
+        assert not catalog.exists("skill_2")
+        assert catalog.get("skill_1")["level"] == 4
+        assert catalog.next_level() == 3
+
+
+def test_unchanged_memory_is_not_reloaded(tmp_path):
+    journal = _journal(tmp_path)
+    journal.append("skills", {"name": "skill_1", "level": 1})
+    with _open(tmp_path, journal) as catalog:
+        record = {"name": "skill_2", "level": 2}
+        journal.append("skills", record)
+        catalog.add(record)
+
+    def load():
+        raise AssertionError("memory reloaded")
+    journal.load = load
+    with _open(tmp_path, journal) as catalog:
+        assert catalog.count() == 2
+
+
+def test_sample_is_uniform_after_deletes(tmp_path):
+    journal = _journal(tmp_path)
+    with _open(tmp_path, journal) as catalog:
+        catalog.add_many({"name": f"skill_{i}", "level": i} for i in range(1, 21))
+        # leave a wide id gap in front of skill_20
+        catalog.sync([{"name": "skill_1", "level": 1}, {"name": "skill_20", "level": 20}])
+        rng = random.Random(0)
+        picks = [catalog.sample(rng)["name"] for _ in range(2000)]
+    assert set(picks) == {"skill_1", "skill_20"}
+    assert 900 < picks.count("skill_20") < 1100
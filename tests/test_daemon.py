@@ -0,0 +1,98 @@
+import json
+import threading
+import urllib.request
+
+import pytest
+
+import evolver_daemon
+import self_evolver_v2 as evolver
+from ai_core.catalog import SkillCatalog
+from ai_core.journal import MemoryJournal
+from ai_core.metrics_store import MetricsStore
+from ai_core.testcache import ResultCache
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    journal = MemoryJournal(str(tmp_path / "ai_memory.json"), compact_every=0)
+    salt_file = tmp_path / "mutation.py"
+    salt_file.write_text("# v1\n")
+    opened = []
+    generations = []
+
+    def open_run_state(args, catalog=None):
+        state = {"catalog": SkillCatalog(str(tmp_path / "skills.db"), journal=journal),
+                 "fitness": object(),
+                 "test_cache": ResultCache(str(tmp_path / "test_cache.json"), [str(salt_file)]),
+                 "evaluations": MetricsStore(str(tmp_path / "metrics"))}
+        opened.append(state)
+        return state
+
+    def run_generation(args, **state):
+        generations.append(dict(state, salt=state["test_cache"].salt))
+        state["evaluations"].append(score=float(len(generations)))
+        state["evaluations"].flush()
+        return {"name": f"skill_{len(generations)}", "score": 1.0}
+
+    monkeypatch.setattr(evolver, "ensure_dirs", lambda: None)
+    monkeypatch.setattr(evolver, "open_run_state", open_run_state)
+    monkeypatch.setattr(evolver, "run_generation", run_generation)
+    monkeypatch.setattr(evolver_daemon.skills.registry, "refresh", lambda: None)
+
+    args = evolver.parse_args(["--runner", "pytest"])
+    args.argv = ["--runner", "pytest"]
+    d = evolver_daemon.EvolverDaemon(args, interval=0, started=False)
+    d.warm_up()
+    d.opened, d.runs, d.salt_file = opened, generations, salt_file
+    yield d
+    d.close()
+
+
+def test_generations_share_one_run_state(daemon):
+    catalog = daemon.state["catalog"]
+    assert daemon.run_generation()["promoted"] == "skill_1"
+    assert daemon.run_generation()["promoted"] == "skill_2"
+    assert len(daemon.opened) == 1
+    assert all(g["catalog"] is catalog for g in daemon.runs)
+
+    daemon.close()
+    assert daemon.state is None
+    assert catalog.conn is None
+
+
+def test_each_generation_is_its_own_metrics_run(daemon):
+    daemon.run_generation()
+    daemon.run_generation()
+    evaluations = daemon.state["evaluations"]
+    assert list(evaluations.column("run")) == [0, 1]
+    assert evaluations.mean_score_by_generation(run=1) == {0: 2.0}
+
+
+def test_salt_files_are_rehashed_per_generation(daemon):
+    daemon.run_generation()
+    daemon.salt_file.write_text("# v2\n")
+    daemon.run_generation()
+    first, second = (g["salt"] for g in daemon.runs)
+    assert first != second
+
+
+def test_control_api(daemon):
+    server = evolver_daemon.serve(daemon, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    daemon.start_thread()
+    try:
+        with urllib.request.urlopen(urllib.request.Request(base + "/trigger", method="POST")) as r:
+            assert r.status == 202
+        with daemon._cond:
+            while daemon.generations < 1:
+                daemon._cond.wait(0.05)
+        with urllib.request.urlopen(base + "/status") as r:
+            status = json.load(r)
+        assert status["last"]["promoted"] == "skill_1"
+        assert status["scheduled"] is False
+        with urllib.request.urlopen(base + "/metrics") as r:
+            assert b"evolver_daemon_generations_total 1" in r.read()
+    finally:
+        server.shutdown()
+        server.server_close()
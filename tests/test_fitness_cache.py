@@ -0,0 +1,46 @@
+import self_evolver_v2 as evolver
+from ai_core.fitness_cache import FitnessCache, candidate_key
+
+PERSONALITY = {"type": "helper"}
+
+
+def _candidates(tmp_path, levels):
+    out = []
+    for level in levels:
+        name = f"skill_{level}_0_abcdef"
+        skill_path = tmp_path / f"{name}.py"
+        test_path = tmp_path / f"test_{name}.py"
+        skill_path.write_text(evolver.generate_skill_template(name, level, PERSONALITY))
+        test_path.write_text(evolver.generate_test(name, level))
+        out.append({"name": name, "level": level, "skill_path": str(skill_path), "test_path": str(test_path)})
+    return out
+
+
+def test_key_ignores_name_timestamp_and_level():
+    def key(name, level, context="suite"):
+        return candidate_key(name, evolver.generate_skill_template(name, level, PERSONALITY),
+                             evolver.generate_test(name, level), context, level=level)
+
+    assert key("skill_7_0_aaaaaa", 7) == key("skill_9_2_bbbbbb", 9)
+    assert key("skill_7_0_aaaaaa", 7) != key("skill_7_0_aaaaaa", 7, context="other suite")
+
+
+def test_repeated_candidates_hit_the_cache(tmp_path):
+    fitness = FitnessCache(str(tmp_path / "fitness_cache.json"))
+    try:
+        first = evolver.score_candidates(_candidates(tmp_path, (5, 6, 7)), PERSONALITY, [],
+                                         runner="worker", fitness=fitness)
+        assert (fitness.hits, fitness.misses) == (2, 1)
+        fitness.save()
+
+        fitness = FitnessCache(fitness.path)
+        again = evolver.score_candidates(_candidates(tmp_path, (8, 9)), PERSONALITY, [],
+                                         runner="worker", fitness=fitness)
+        assert (fitness.hits, fitness.misses) == (2, 0)
+    finally:
+        evolver.get_worker().close()
+
+    for c in first + again:
+        assert (c["passed"], c["total"], c["rc"]) == (1, 1, 0)
+        assert c["score"] == evolver.score_candidate(1, 1, c["level"], PERSONALITY)
+    assert [c["output"] == "[fitness-cache] hit" for c in first] == [False, True, True]
@@ -0,0 +1,65 @@
+import json
+import os
+import subprocess
+import sys
+
+from ai_core.index import HEADER, InvertedIndex
+
+DOCS = {
+    "wiki:python": "Python is a programming language with dynamic typing",
+    "wiki:cobra": "The cobra is a venomous snake",
+    "ddg:pythons": "Pythons are large snakes that constrict their prey",
+}
+
+
+def _fill(index):
+    for doc_id, text in DOCS.items():
+        index.add(doc_id, text, source=doc_id.split(":")[0])
+
+
+def test_search_ranks_and_survives_reopen(tmp_path):
+    with InvertedIndex(str(tmp_path), flush_docs=2) as index:
+        _fill(index)
+        hits = index.search("snake snakes language", k=3)
+        assert {h["id"] for h in hits} == set(DOCS)
+        top = index.search("programming language")[0]
+        assert (top["id"], top["source"], top["text"]) == ("wiki:python", "wiki", DOCS["wiki:python"])
+
+    with InvertedIndex(str(tmp_path)) as index:
+        assert index.stats()["documents"] == 3
+        assert index.search("venomous")[0]["text"] == DOCS["wiki:cobra"]
+
+
+def test_readding_supersedes_and_same_text_is_skipped(tmp_path):
+    with InvertedIndex(str(tmp_path), flush_docs=1, merge_factor=2) as index:
+        _fill(index)
+        assert not index.add("wiki:cobra", DOCS["wiki:cobra"])
+        assert index.add("wiki:cobra", "The king cobra eats other snakes")
+        assert index.search("venomous") == []
+        assert index.search("king")[0]["id"] == "wiki:cobra"
+        assert index.stats()["documents"] == 3
+
+
+def test_texts_are_stored_outside_the_segment_header(tmp_path):
+    with InvertedIndex(str(tmp_path)) as index:
+        _fill(index)
+    (segment,) = [n for n in os.listdir(tmp_path) if n.endswith(".idx")]
+    with open(tmp_path / segment, "rb") as f:
+        data = f.read()
+    _, size = HEADER.unpack_from(data, 0)
+    header = data[HEADER.size:HEADER.size + size].decode("utf-8")
+    assert DOCS["wiki:cobra"] not in header
+    assert len(json.loads(header)["docs"]) == 3
+    assert DOCS["wiki:cobra"].encode() in data[HEADER.size + size:]
+
+
+def test_buffered_documents_are_flushed_at_exit(tmp_path):
+    script = (
+        "import sys; from ai_core.index import InvertedIndex\n"
+        "index = InvertedIndex(sys.argv[1])\n"
+        "index.add('wiki:cobra', 'The cobra is a venomous snake')\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, "-c", script, str(tmp_path)], cwd=root, check=True)
+    with InvertedIndex(str(tmp_path)) as index:
+        assert index.search("venomous")[0]["id"] == "wiki:cobra"
@@ -0,0 +1,46 @@
+import json
+import os
+
+from ai_core.journal import MemoryJournal
+
+
+def test_load_replays_journal_over_snapshot(tmp_path):
+    journal = MemoryJournal(str(tmp_path / "ai_memory.json"), compact_every=0)
+    journal.append("skills", {"name": "skill_1", "level": 1})
+    journal.append("runs", {"action": "noop"})
+    journal.update("skills", {"name": "skill_1"}, {"level": 3})
+    with open(journal.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"op": "append", "key": "ru')  # torn by a crash mid-append
+
+    memory = journal.load()
+    assert memory["skills"] == [{"name": "skill_1", "level": 3}]
+    assert memory["runs"] == [{"action": "noop"}]
+    assert journal.pending() == 3
+
+
+def test_append_after_a_torn_line(tmp_path):
+    journal = MemoryJournal(str(tmp_path / "ai_memory.json"), compact_every=0)
+    journal.append("runs", {"i": 0})
+    with open(journal.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"op": "append", "key": "ru')
+
+    journal = MemoryJournal(journal.snapshot_path, compact_every=0)
+    journal.append("runs", {"i": 1})
+    journal.append("runs", {"i": 2})
+    assert [r["i"] for r in journal.load()["runs"]] == [0, 1, 2]
+    assert journal.pending() == 3
+
+
+def test_compacts_into_the_snapshot(tmp_path):
+    journal = MemoryJournal(str(tmp_path / "ai_memory.json"), compact_every=3)
+    for i in range(4):
+        journal.append("runs", {"i": i})
+
+    with open(journal.snapshot_path, encoding="utf-8") as f:
+        assert json.load(f)["runs"] == [{"i": 0}, {"i": 1}, {"i": 2}]
+    assert journal.pending() == 1
+    assert [r["i"] for r in journal.load()["runs"]] == [0, 1, 2, 3]
+
+    journal.compact()
+    assert not os.path.exists(journal.journal_path)
+    assert [r["i"] for r in MemoryJournal(journal.snapshot_path).load()["runs"]] == [0, 1, 2, 3]
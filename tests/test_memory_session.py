@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+import self_rewriting_ai as ai
+
+
+@pytest.fixture
+def memory_file(tmp_path, monkeypatch):
+    path = tmp_path / "ai_memory.json"
+    monkeypatch.setattr(ai, "MEMORY_FILE", str(path))
+    return path
+
+
+def test_session_writes_once_and_only_after_a_commit(memory_file, monkeypatch):
+    writes = []
+    save = ai.save_memory
+    monkeypatch.setattr(ai, "save_memory", lambda m: (writes.append(1), save(m)))
+
+    memory = {"knowledge": 1, "reward": 0, "history": []}
+    with ai.MemorySession(memory):
+        memory["scratch"] = True  # not committed: not a reason to write
+    assert not memory_file.exists()
+
+    with ai.MemorySession(memory):
+        ai.reflect(memory)
+        ai.record_event(memory, event="rewrite_success")
+    assert writes == [1]
+    saved = json.loads(memory_file.read_text())
+    assert [list(e) for e in saved["history"]] == [["time", "reflection"], ["time", "event"]]
+
+
+def test_nothing_is_written_when_the_block_raises(memory_file):
+    memory = {"knowledge": 1, "history": []}
+    with pytest.raises(RuntimeError):
+        with ai.MemorySession(memory):
+            ai.record_event(memory, event="x")
+            raise RuntimeError
+    assert not memory_file.exists()
+    ai.record_event(memory, event="y")  # no session: written at once
+    assert len(json.loads(memory_file.read_text())["history"]) == 2
+
+
+def test_nested_session_restores_the_outer_one(memory_file):
+    outer_memory = {"knowledge": 1, "history": []}
+    inner_memory = {"knowledge": 2, "history": []}
+    with ai.MemorySession(outer_memory):
+        with ai.MemorySession(inner_memory):
+            ai.record_event(inner_memory, event="inner")
+        assert json.loads(memory_file.read_text())["knowledge"] == 2
+        # back in the outer session: deferred, not written at once
+        ai.record_event(outer_memory, event="outer")
+        assert json.loads(memory_file.read_text())["knowledge"] == 2
+    saved = json.loads(memory_file.read_text())
+    assert saved["knowledge"] == 1 and len(saved["history"]) == 1
+    assert ai._session is None
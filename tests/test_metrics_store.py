@@ -0,0 +1,69 @@
+import pytest
+
+from ai_core import metrics_store
+from ai_core.metrics_store import MetricsStore
+
+
+@pytest.fixture(params=["numpy", "pure"])
+def backend(request, monkeypatch):
+    if request.param == "pure":
+        monkeypatch.setattr(metrics_store, "np", None)
+    elif metrics_store.np is None:
+        pytest.skip("numpy not installed")
+    return request.param
+
+
+def _fill(store):
+    for gen, score, personality, passed in ((0, 1.0, "helper", 2), (0, 3.0, "storyteller", 1),
+                                            (1, 2.0, "helper", 4), (1, 4.0, "helper", 0)):
+        store.append(generation=gen, score=score, personality=personality, passed=passed, total=4)
+
+
+def test_aggregations(tmp_path, backend):
+    store = MetricsStore(str(tmp_path))
+    _fill(store)
+    assert store.flush() == 4
+    assert store.mean_score_by_generation() == {0: 2.0, 1: 3.0}
+    assert store.pass_rate_by_personality() == {"helper": 0.5, "storyteller": 0.25}
+    assert store.percentiles("score", qs=(0, 50, 100)) == {0: 1.0, 50: 2.5, 100: 4.0}
+
+
+def test_runs_and_reopen(tmp_path, backend):
+    first = MetricsStore(str(tmp_path))
+    _fill(first)
+    first.flush()
+
+    second = MetricsStore(str(tmp_path))
+    assert second.run == first.run + 1 and len(second) == 4
+    second.append(generation=5, score=10.0, personality="optimizer")
+    second.flush()
+
+    reopened = MetricsStore(str(tmp_path))
+    assert len(reopened) == 5
+    assert reopened.mean_score_by_generation(run=second.run) == {5: 10.0}
+    assert reopened.dictionaries["personality"] == ["helper", "storyteller", "optimizer"]
+
+
+def test_torn_append_is_ignored(tmp_path, backend):
+    store = MetricsStore(str(tmp_path))
+    _fill(store)
+    store.flush()
+    with open(store._col_path("score"), "ab") as f:
+        f.write(b"\x00" * 5)  # a crash after writing columns, before the schema
+
+    reopened = MetricsStore(str(tmp_path))
+    assert len(reopened) == 4
+    reopened.append(score=7.0)
+    reopened.flush()
+    assert list(MetricsStore(str(tmp_path)).column("score")) == [1.0, 3.0, 2.0, 4.0, 7.0]
+
+
+def test_new_run_skips_unused_ids(tmp_path):
+    store = MetricsStore(str(tmp_path))
+    assert store.new_run() == 0
+    store.append(score=1.0)
+    assert store.new_run() == 1
+    store.append(score=2.0)
+    store.flush()
+    assert list(store.column("run")) == [0, 1]
+    assert MetricsStore(str(tmp_path)).run == 2
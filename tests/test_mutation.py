@@ -0,0 +1,49 @@
+import random
+
+import self_evolver_v2 as evolver
+from ai_core import mutation
+
+SOURCE = evolver.generate_skill_template("skill_3_0_abc123", 3, {"type": "helper"})
+
+
+def _run(code, x):
+    namespace = {}
+    exec(code, namespace)
+    return namespace["run"](x)
+
+
+def test_relabel_keeps_layout_and_moves_level():
+    out = mutation.relabel(SOURCE, 3, 5, "skill_3_0_abc123", "skill_5_0_def456")
+    assert "Level: 5" in out and "Level: 3" not in out
+    assert "skill_5_0_def456" in out and "skill_3_0_abc123" not in out
+    assert "# deterministic scoring function" in out  # comments survive
+    assert _run(out, 1) == max(0, (1 + 5) * 5)
+
+
+def test_variants_share_one_parse_and_compile_independently():
+    engine = mutation.MutationEngine(SOURCE, rng=random.Random(7))
+    variants = engine.variants(5, edits_per_variant=2)
+    assert len(variants) == 5
+    assert all(v.labels for v in variants)
+    for v in variants:
+        # the compiled code and the spliced source are the same program
+        assert _run(v.code, 4) == _run(v.source(), 4)
+    # the shared tree is restored after every compile
+    assert _run(engine.compile(), 4) == _run(SOURCE, 4)
+    assert mutation.parse(SOURCE) is engine.tree
+
+
+def test_derive_accumulates_lineage_edits():
+    engine = mutation.MutationEngine(SOURCE, rng=random.Random(1))
+    child = engine.derive([], 3, 4, count=1)
+    grandchild = engine.derive(child.lineage, 3, 6, count=1)
+    assert child.level == 4 and grandchild.level == 6
+    assert grandchild.lineage[:len(child.lineage)] == child.lineage
+    assert child.key != grandchild.key
+    assert engine.derive(child.lineage, 3, 4).key == child.key
+
+
+def test_parse_cache_is_bounded():
+    for i in range(mutation.TREE_CACHE_SIZE + 10):
+        mutation.parse(f"x = {i}\n")
+    assert mutation.parse.cache_info().currsize == mutation.TREE_CACHE_SIZE
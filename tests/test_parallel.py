@@ -0,0 +1,49 @@
+import os
+
+import self_evolver_v2 as evolver
+
+# each test records which workspace its ai_core package was imported from,
+# and fails if another candidate's skill is visible there
+TEST = '''import os
+import ai_core
+from ai_core.skills import {name}
+
+def test_isolated():
+    skills_dir = os.path.join(os.path.dirname(ai_core.__file__), "skills")
+    assert not [fn for fn in os.listdir(skills_dir) if fn.startswith("cand_") and fn != "{name}.py"]
+    with open({marker!r}, "a") as f:
+        f.write(os.path.dirname(os.path.dirname(ai_core.__file__)) + "\\n")
+
+def test_run():
+    assert {name}.run(1) == {expected}
+'''
+
+
+def _jobs(tmp_path):
+    jobs = []
+    for i, expected in enumerate((2, 3, 2)):  # cand_1 fails test_run
+        name = f"cand_{i}"
+        skill = tmp_path / f"{name}.py"
+        test = tmp_path / f"test_{name}.py"
+        skill.write_text("def run(x):\n    return x + 1\n")
+        test.write_text(TEST.format(name=name, expected=expected, marker=str(tmp_path / f"{name}.ws")))
+        jobs.append({"name": name, "skill_path": str(skill), "test_path": str(test),
+                     "skill_paths": [], "baseline_tests": [], "runner": "pytest"})
+    return jobs
+
+
+def test_parallel_matches_serial(tmp_path):
+    jobs = _jobs(tmp_path)
+    serial = [r[:3] for r in evolver.evaluate_candidates(jobs, jobs=1)]
+    parallel = [r[:3] for r in evolver.evaluate_candidates(jobs, jobs=3)]
+
+    assert parallel == serial
+    assert [rc for _, _, rc in serial] == [0, 1, 0]
+
+    roots = []
+    for job in jobs:
+        with open(tmp_path / f"{job['name']}.ws") as f:
+            roots += f.read().split()
+    assert len(roots) == 6 and len(set(roots)) == 6  # one private workspace per evaluation
+    assert all(os.path.dirname(root) == evolver.WORKSPACES_DIR for root in roots)
+    assert not any(os.path.exists(root) for root in roots)  # cleaned up afterwards
@@ -0,0 +1,49 @@
+import json
+import os
+
+import pytest
+
+from ai_core import policy
+from ai_core.policy import DENY, DomainPolicy, load_domains
+
+
+def test_most_specific_rule_wins():
+    p = DomainPolicy(deny=["example.com", "*.ads.net"], allow=["docs.example.com"])
+    assert p.allowed("https://example.com/x") is DENY
+    assert p.allowed("http://a.b.example.com:8080/?q=docs.example.com") is DENY
+    assert p.allowed("https://docs.example.com/page")
+    assert p.allowed("https://api.docs.example.com")
+    assert p.allowed("https://track.ads.net") is DENY
+    assert p.allowed("https://notexample.com")
+    assert DomainPolicy(deny=["x.org"], allow=["x.org"]).allowed("x.org")  # allow beats deny
+
+
+@pytest.fixture
+def deny_list(tmp_path):
+    path = tmp_path / "deny.txt"
+    path.write_text("# blocked\n0.0.0.0 Tracker.EXAMPLE.  # hosts-file line\nbad.org\n\n")
+    return str(path)
+
+
+def test_list_is_cached_as_json(deny_list, monkeypatch):
+    assert load_domains(deny_list) == {"tracker.example", "bad.org"}
+    with open(deny_list + policy.CACHE_SUFFIX, encoding="utf-8") as f:
+        assert sorted(json.load(f)["domains"]) == ["bad.org", "tracker.example"]
+
+    def read_domains(path):
+        raise AssertionError("list re-parsed")
+    monkeypatch.setattr(policy, "read_domains", read_domains)
+    p = DomainPolicy.from_files(deny_path=deny_list)
+    assert p.allowed("https://cdn.tracker.example") is DENY
+
+
+def test_changed_or_corrupt_cache_is_rebuilt(deny_list):
+    load_domains(deny_list)
+    with open(deny_list, "a") as f:
+        f.write("new.net\n")
+    assert "new.net" in load_domains(deny_list)
+
+    with open(deny_list + policy.CACHE_SUFFIX, "w") as f:
+        f.write("{not json")
+    assert "new.net" in load_domains(deny_list)
+    assert os.path.exists(deny_list + policy.CACHE_SUFFIX)
@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+import self_evolver_v2 as evolver
+from ai_core.journal import MemoryJournal
+from ai_core.metrics_store import MetricsStore
+
+PERSONALITY = {"type": "optimizer"}
+
+
+@pytest.fixture
+def journal(tmp_path, monkeypatch):
+    journal = MemoryJournal(str(tmp_path / "ai_memory.json"), compact_every=0)
+    monkeypatch.setattr(evolver, "JOURNAL", journal)
+    monkeypatch.setattr(evolver, "load_personality", lambda: dict(PERSONALITY))
+    return journal
+
+
+def _evolve(tmp_path, seed):
+    metrics = MetricsStore(str(tmp_path / f"metrics_{seed}"))
+    best = evolver.evolve_population(3, 4, rng=random.Random(seed),
+                                     mutators=evolver.mutation.DEFAULT_OPERATORS, metrics=metrics)
+    metrics.flush()
+    return best, metrics
+
+
+def _summary(ind):
+    return ind["level"], ind["score"], [e.label for e in ind["lineage"]]
+
+
+def test_population_generation_is_reproducible(tmp_path, journal):
+    best, metrics = _evolve(tmp_path, 0)
+    again, _ = _evolve(tmp_path, 0)
+
+    assert _summary(best) == _summary(again)
+    # 4 initial individuals, then 3 generations of 3 children (one elite carried over)
+    assert len(metrics) == 4 + 3 * 3
+    assert list(metrics.column("generation")) == [0] * 4 + [1] * 3 + [2] * 3 + [3] * 3
+
+    runs = [r for r in journal.load()["runs"] if r["action"] == "generation"]
+    assert [r["generation"] for r in runs] == [1, 2, 3] * 2
+    scores = [r["best_score"] for r in runs[:3]]
+    assert scores == sorted(scores)  # elitism: the best never gets worse
+    assert best["score"] == scores[-1]
+
+
+def test_best_individual_materializes_as_a_candidate(tmp_path, journal, monkeypatch):
+    monkeypatch.setattr(evolver, "CANDIDATES_DIR", str(tmp_path / "candidates"))
+    monkeypatch.setattr(evolver, "ALLOWED_PREFIX", str(tmp_path))
+    best, _ = _evolve(tmp_path, 1)
+    candidate = evolver.materialize_individual(best)
+    module_source = open(candidate["skill_path"], encoding="utf-8").read()
+    assert best["name"] in module_source
+    assert compile(module_source, candidate["skill_path"], "exec")
@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+from ai_core import registry as registry_module
+from ai_core.registry import SkillRegistry
+
+SKILL = '"""\nSkill: {name}\nLevel: {level}\n"""\n\ndef run():\n    return {level}\n'
+
+
+@pytest.fixture
+def skill_dir(tmp_path):
+    directory = tmp_path / "skills"
+    directory.mkdir()
+    for name, level in (("skill_a", 1), ("skill_b", 2)):
+        (directory / f"{name}.py").write_text(SKILL.format(name=name, level=level))
+    return directory
+
+
+def _no_scandir(monkeypatch):
+    def scandir(path):
+        raise AssertionError(f"unexpected scandir of {path}")
+    monkeypatch.setattr(registry_module.os, "scandir", scandir)
+
+
+def test_second_refresh_does_not_scan(skill_dir, monkeypatch):
+    reg = SkillRegistry("skills", str(skill_dir))
+    reg.refresh()
+    assert reg.names() == ["skill_a", "skill_b"]
+    assert not os.path.exists(os.path.join(skill_dir, ".manifest.json"))
+
+    _no_scandir(monkeypatch)
+    reg.refresh()
+    # a new process starts from the manifest on disk
+    fresh = SkillRegistry("skills", str(skill_dir))
+    fresh.refresh()
+    assert [i["level"] for i in fresh.iter_infos()] == [1, 2]
+
+
+def test_new_skill_triggers_rescan(skill_dir):
+    reg = SkillRegistry("skills", str(skill_dir))
+    reg.refresh()
+    (skill_dir / "skill_c.py").write_text(SKILL.format(name="skill_c", level=3))
+    reg.refresh()
+    assert "skill_c" in reg
+    assert [i["name"] for i in reg.by_level(3)] == ["skill_c"]
@@ -0,0 +1,42 @@
+import time
+
+from ai_core.response_cache import ResponseCache
+from ai_core.search import SearchClient
+
+
+def _client(base, **kwargs):
+    # ttl 0: every cached entry is stale on the next lookup
+    cache = ResponseCache(ttls={"wiki": 0})
+    return SearchClient(ddg_url=base + "/ddg", wiki_url=base + "/wiki/", cache=cache, **kwargs)
+
+
+def test_stale_entry_is_revalidated_with_304(server):
+    handler, base = server
+    with _client(base) as client:
+        first = client.wiki_search("python")
+        assert first["extract"] == "python v1"
+        assert client.wiki_search("python") == first
+        assert handler.requests == [("/wiki/python", None), ("/wiki/python", '"v1"')]
+        assert client.cache.counters["revalidated"] == 1
+
+        handler.version = 2  # changed upstream: the conditional GET gets a full 200
+        assert client.wiki_search("python")["extract"] == "python v2"
+        assert client.cache.counters["revalidated"] == 1
+
+
+def test_stale_while_revalidate_serves_stale_then_refreshes(server):
+    handler, base = server
+    with _client(base, stale_while_revalidate=True) as client:
+        assert client.wiki_search("python")["extract"] == "python v1"
+
+        handler.version, handler.delay = 2, 0.5
+        started = time.perf_counter()
+        assert client.wiki_search("python")["extract"] == "python v1"  # stale, not waiting
+        assert time.perf_counter() - started < handler.delay
+
+        deadline = time.time() + 5
+        while client.cache.counters["stores"] < 2:  # the background refresh stored v2
+            assert time.time() < deadline
+            time.sleep(0.02)
+        handler.delay = 0
+        assert client.wiki_search("python")["extract"] == "python v2"
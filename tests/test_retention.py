@@ -0,0 +1,47 @@
+from datetime import datetime
+
+from ai_core import retention
+from ai_core.retention import Retention
+
+NOW = datetime(2026, 3, 31)
+
+
+def _runs():
+    runs = [{"time": f"2026-01-{d:02d}T10:00:00Z", "action": "noop"} for d in (1, 1, 2)]
+    runs.append({"time": "2026-01-02T11:00:00Z", "reflection": "Knowledge Level: 4\nReward Score: 0.5"})
+    runs += [{"time": f"2026-03-{d:02d}T10:00:00Z", "action": "propose", "score": d} for d in (20, 30)]
+    return runs
+
+
+def test_apply_archives_and_rolls_up_expired_events(tmp_path):
+    policy = Retention("runs", str(tmp_path), keep_days=30, keep_last=1)
+    memory = {"runs": _runs()}
+    before = retention.action_counts(memory, "runs")
+
+    assert policy.apply(memory, "runs", now=NOW) == 4
+    assert [r["time"][:10] for r in memory["runs"]] == ["2026-03-20", "2026-03-30"]
+    assert [b["day"] for b in memory["rollups"]["runs"]] == ["2026-01-01", "2026-01-02"]
+
+    # queries answer from rollups + raw events exactly as before
+    assert retention.action_counts(memory, "runs") == before
+    assert retention.trend(memory, "runs", "knowledge") == [
+        {"day": "2026-01-02", "min": 4, "max": 4, "mean": 4.0}]
+    assert list(policy.iter_archive()) == _runs()[:4]
+    assert list(policy.iter_archive(start="2026-01-02")) == _runs()[2:4]
+
+
+def test_keep_last_wins_over_age(tmp_path):
+    policy = Retention("runs", str(tmp_path), keep_days=1, keep_last=10)
+    memory = {"runs": _runs()}
+    assert policy.apply(memory, "runs", now=NOW) == 0
+    assert policy.segments() == []
+
+
+def test_repeated_compactions_merge_day_buckets(tmp_path):
+    policy = Retention("runs", str(tmp_path), keep_days=30, keep_last=0)
+    memory = {"runs": _runs()[:2]}
+    policy.apply(memory, "runs", now=NOW)
+    memory["runs"] = [{"time": "2026-01-01T12:00:00Z", "action": "noop"}]  # a day already rolled up
+    policy.apply(memory, "runs", now=NOW)
+    assert [(b["day"], b["count"]) for b in memory["rollups"]["runs"]] == [("2026-01-01", 3)]
+    assert len(policy.segments()) == 2
@@ -0,0 +1,57 @@
+import pytest
+
+from ai_core.rewrite import END_TAG, START_TAG, RewriteError, find_blocks, rewrite
+
+MODULE = f'''MARKER = "{START_TAG}"
+
+{START_TAG}
+VALUE = 1
+{END_TAG}
+
+def f():
+    {START_TAG}
+    return VALUE
+    {END_TAG}
+'''
+
+
+def _write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_finds_tagged_blocks_but_not_string_constants(tmp_path):
+    blocks = find_blocks("m.py", MODULE.splitlines(keepends=True))
+    assert [(b.indent, b.text) for b in blocks] == [("", "VALUE = 1\n"), ("    ", "return VALUE\n")]
+
+
+def test_rewrites_every_block_of_every_file(tmp_path):
+    a = _write(tmp_path, "a.py", MODULE)
+    b = _write(tmp_path, "b.py", MODULE)
+    bodies = {0: "VALUE = 2\n", 1: "return VALUE * 10\n"}
+    assert rewrite([a, b], lambda block: bodies[block.index]) == [a, b]
+
+    namespace = {}
+    exec(open(a).read(), namespace)
+    assert namespace["f"]() == 20
+    assert open(b).read() == open(a).read()
+    assert rewrite([a, b], lambda block: bodies[block.index]) == []  # unchanged: nothing written
+
+
+def test_invalid_code_leaves_every_file_untouched(tmp_path):
+    a = _write(tmp_path, "a.py", MODULE)
+    b = _write(tmp_path, "b.py", MODULE)
+
+    def generate(block):
+        return "VALUE = 2\n" if block.path == a else "return (\n"
+
+    with pytest.raises(RewriteError):
+        rewrite([a, b], generate)
+    assert open(a).read() == MODULE and open(b).read() == MODULE
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.py", "b.py"]
+
+
+def test_unbalanced_tags_are_rejected():
+    with pytest.raises(RewriteError):
+        find_blocks("m.py", [START_TAG + "\n", "x = 1\n"])
@@ -0,0 +1,78 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import self_evolver_v2 as evolver
+from ai_core.runner import EvalWorker, summarize
+from ai_core.testcache import combine
+
+SKILL = "def run(x):\n    return x + 1\n"
+TEST = "from ai_core.skills import probe_skill\n\ndef test_run():\n    assert probe_skill.run(1) == 2\n"
+
+_inherited = EvalWorker()
+
+
+def _run_in_child():
+    return summarize(_inherited.run({"probe_skill": SKILL}, {"test_probe_skill": TEST}))[:3]
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_forked_copy_spawns_its_own_worker():
+    _inherited.start()
+    try:
+        ctx = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            assert pool.submit(_run_in_child).result() == (1, 1, 0)
+        # the parent's worker is untouched by the child
+        assert _run_in_child() == (1, 1, 0)
+    finally:
+        _inherited.close()
+
+
+BROKEN_TEST = "from ai_core.skills import no_such_skill\n\ndef test_never_runs():\n    assert no_such_skill\n"
+MIXED_TEST = (
+    "from ai_core.skills import probe_skill\n\n"
+    "def test_zero():\n    assert probe_skill.run(0) == 1\n\n"
+    "def test_wrong():\n    assert probe_skill.run(0) == 0\n\n"
+    "def test_negative():\n    assert probe_skill.run(-1) == 0\n"
+)
+EXTRA_TESTS = {
+    "passing": [],
+    "mixed": [("test_mixed.py", MIXED_TEST)],
+    "broken": [("test_mixed.py", MIXED_TEST), ("test_broken.py", BROKEN_TEST)],
+}
+
+
+def _write(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def _evaluate(tmp_path, suite, runner, per_file=False):
+    tests = [_write(tmp_path / "test_probe_skill.py", TEST)]
+    tests += [_write(tmp_path / fn, text) for fn, text in EXTRA_TESTS[suite]]
+    result = evolver.evaluate_candidate({
+        "name": "parity",
+        "skill_paths": [_write(tmp_path / "probe_skill.py", SKILL)],
+        "baseline_tests": tests,
+        "runner": runner,
+        "per_file": per_file,
+    })
+    if per_file:
+        return combine(result[0].values())
+    return result[:3]
+
+
+@pytest.mark.parametrize("suite, expected", [
+    ("passing", (1, 1, 0)),
+    ("mixed", (3, 4, 1)),  # every runner counts test items, not files or runs
+    ("broken", (0, 0, 2)),
+])
+def test_same_result_under_both_runners(tmp_path, suite, expected):
+    try:
+        for per_file in (False, True):  # full run, and the incremental (per-file, cached) path
+            assert _evaluate(tmp_path, suite, "pytest", per_file) == expected
+            assert _evaluate(tmp_path, suite, "worker", per_file) == expected
+    finally:
+        evolver.get_worker().close()
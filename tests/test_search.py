@@ -0,0 +1,57 @@
+import time
+
+from ai_core.search import SearchClient, extract_text
+
+
+def test_search_all_fans_out_concurrently(server):
+    handler, base = server
+    handler.delay = 0.3
+    with SearchClient(ddg_url=base + "/ddg", wiki_url=base + "/wiki/") as client:
+        started = time.perf_counter()
+        result = client.search_all("python")
+        elapsed = time.perf_counter() - started
+
+    assert elapsed < 2 * handler.delay
+    assert sorted(result["results"]) == ["ddg", "wiki"]
+    assert result["answer"] and not result["errors"] and not result["partial"]
+
+
+def test_search_all_returns_partial_results_on_timeout(server):
+    handler, base = server
+    with SearchClient(ddg_url=base + "/ddg", wiki_url=base + "/wiki/") as client:
+        started = time.perf_counter()
+        result = client.search_all("hang on", timeout=0.5)
+        assert time.perf_counter() - started < 1.5
+
+    assert result["partial"]
+    assert result["results"]["ddg"]["abstract"] == "about hang on"
+    assert "wiki" not in result["results"]
+    assert result["errors"] == {"wiki": "timed out"}
+
+
+def test_search_many_answers_every_query_once(server):
+    handler, base = server
+    queries = ["slow one", "fast", "slow one", "fast"]
+    with SearchClient(ddg_url=base + "/ddg", wiki_url=base + "/wiki/") as client:
+        results = dict(client.search_many(queries))
+
+    assert [results[i]["query"] for i in range(len(queries))] == queries
+    assert results[0]["results"]["wiki"]["extract"] == "slow one v1"
+    assert results[0] == results[2] and results[0] is not results[2]
+    # one upstream call per distinct query and provider
+    assert sorted(path for path, _ in handler.requests) == [
+        "/ddg/fast", "/ddg/slow one", "/wiki/fast", "/wiki/slow one"]
+
+
+def test_search_many_streams_in_completion_order(server):
+    handler, base = server
+    with SearchClient(ddg_url=base + "/ddg", wiki_url=base + "/wiki/") as client:
+        order = [i for i, _ in client.search_many(["slow one", "a", "b"])]
+    assert order[-1] == 0
+    assert sorted(order[:2]) == [1, 2]
+
+
+def test_extract_text_falls_back_to_utf8_on_unknown_charset():
+    chunks = ["<html><body><p>café </p><script>x()</script><p>ok</p></body></html>".encode()]
+    assert extract_text(chunks, "no-such-charset") == "café ok"
+    assert extract_text([b"<p>\xff bad byte</p>"], "x-bogus") == "� bad byte"
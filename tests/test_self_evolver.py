@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+import self_evolver
+from ai_core.journal import MemoryJournal
+from ai_core.registry import SkillRegistry
+from ai_core.skill_table import SkillTable
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    skills_dir = tmp_path / "skills"
+    tests_dir = tmp_path / "tests"
+    skills_dir.mkdir()
+    tests_dir.mkdir()
+    (skills_dir / "skill_mod.py").write_text(self_evolver.generate_skill_code("skill_mod", 2))
+    table = SkillTable(str(skills_dir / "table.json"))
+    table.add("skill_row", 3, desc="Auto-generated skill skill_row (Level: 3)")
+    table.save()
+    for name, level in (("skill_mod", 2), ("skill_row", 3)):
+        (tests_dir / f"test_{name}.py").write_text(self_evolver.generate_test_code(name, level))
+
+    journal = MemoryJournal(str(tmp_path / "ai_memory.json"), compact_every=0)
+    registry = SkillRegistry("skills", str(skills_dir), table_path=table.path)
+    monkeypatch.setattr(self_evolver, "JOURNAL", journal)
+    monkeypatch.setattr(self_evolver, "SKILLS_DIR", str(skills_dir))
+    monkeypatch.setattr(self_evolver, "TESTS_DIR", str(tests_dir))
+    monkeypatch.setattr(self_evolver, "ALLOWED_DIR_PREFIX", str(tmp_path))
+    monkeypatch.setattr(self_evolver.skills, "registry", registry)
+    # always take the mutate branch
+    monkeypatch.setattr(self_evolver.random, "random", lambda: 1.0)
+    monkeypatch.setattr(self_evolver.random, "choice",
+                        lambda seq: "mutate_skill" if "mutate_skill" in seq else seq[0])
+    return tmp_path, journal, registry
+
+
+def _mutate(journal, name, level):
+    journal.compact({"runs": [], "skills": [{"name": name, "level": level}]})
+    self_evolver.take_step()
+    return journal.load()["skills"][0]["level"]
+
+
+def test_mutating_a_table_skill_updates_its_row(tree):
+    tmp_path, journal, registry = tree
+    tests_before = {p.name: p.read_text() for p in (tmp_path / "tests").iterdir()}
+
+    assert _mutate(journal, "skill_row", 3) == 4
+    assert not (tmp_path / "skills" / "skill_row.py").exists()
+    row = SkillTable(str(tmp_path / "skills" / "table.json"))
+    assert row.params("skill_row") == (4, 4)
+    assert row.skill("skill_row").info()["desc"] == "Auto-generated skill skill_row (Level: 4)"
+    assert registry.info("skill_row")["level"] == 4
+    assert registry.get("skill_row").run(0) == 16
+
+    assert _mutate(journal, "skill_mod", 2) == 3
+    assert registry.info("skill_mod")["level"] == 3
+    # test files are left alone
+    assert {p.name: p.read_text() for p in (tmp_path / "tests").iterdir()} == tests_before
+
+
+def test_pick_skill_from_memory(tree):
+    _, journal, _ = tree
+    journal.compact({"runs": [], "skills": [{"name": "skill_mod", "level": 2}]})
+    assert self_evolver.pick_skill() == {"name": "skill_mod", "level": 2}
+    journal.compact({"runs": [], "skills": []})
+    assert self_evolver.pick_skill() is None
@@ -0,0 +1,48 @@
+import importlib.util
+
+import self_evolver_v2 as evolver
+from ai_core.skill_table import SkillTable, pack_modules
+
+PERSONALITY = {"type": "helper"}
+
+
+def _load(path):
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_pack_round_trip(tmp_path):
+    skills_dir = tmp_path / "skills"
+    skills_dir.mkdir()
+    originals = {}
+    for name, level in (("skill_2", 2), ("skill_9_1_abcdef", 9)):
+        path = skills_dir / f"{name}.py"
+        path.write_text(evolver.generate_skill_template(name, level, PERSONALITY))
+        originals[name] = _load(path)
+    (skills_dir / "skill_custom.py").write_text("def run(x):\n    return -x\n")
+
+    table = SkillTable(str(tmp_path / "table.json"))
+    assert pack_modules(table, str(skills_dir), remove=True) == sorted(originals)
+    assert sorted(p.name for p in skills_dir.iterdir()) == ["skill_custom.py"]
+
+    loaded = SkillTable(table.path)
+    assert loaded.names == sorted(originals)
+    for name, module in originals.items():
+        skill = loaded.skill(name)
+        assert skill.info() == module.info()
+        assert loaded.params(name) == (module.info()["level"],) * 2
+        assert [skill.run(x) for x in range(-12, 12)] == [module.run(x) for x in range(-12, 12)]
+    assert loaded.run_all(3) == [originals[n].run(3) for n in loaded.names]
+
+
+def test_add_replaces_a_row(tmp_path):
+    table = SkillTable(str(tmp_path / "table.json"))
+    table.add("skill_1", 1)
+    table.add("skill_1", 4, desc="bumped")
+    table.save()
+    loaded = SkillTable(table.path)
+    assert len(loaded) == 1
+    assert loaded.skill("skill_1").info() == {"name": "skill_1", "level": 4, "desc": "bumped"}
+    assert loaded.run("skill_1", 1) == 20
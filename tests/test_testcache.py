@@ -0,0 +1,62 @@
+import json
+import shutil
+
+from ai_core.testcache import ResultCache, combine
+
+TEST = "from ai_core.skills import skill_a\n\ndef test_a():\n    assert skill_a.run(1)\n"
+
+
+def _tree(root):
+    (root / "skills").mkdir(parents=True)
+    (root / "tests").mkdir()
+    (root / "skills" / "skill_a.py").write_text("def run(x):\n    return x\n")
+    (root / "salt.py").write_text("SALT = 1\n")
+    return root
+
+
+def _cache(root):
+    return ResultCache(str(root / "test_cache.json"), [str(root / "salt.py")])
+
+
+def _resolver(root):
+    return lambda name: str(root / "skills" / f"{name}.py")
+
+
+def test_salt_does_not_depend_on_checkout_location(tmp_path):
+    a = _tree(tmp_path / "a")
+    shutil.copytree(a, tmp_path / "b")
+    assert _cache(a).salt == _cache(tmp_path / "b").salt
+
+
+def test_save_prunes_staging_records(tmp_path):
+    root = _tree(tmp_path)
+    staging = root / "candidates" / "cand"
+    staging.mkdir(parents=True)
+    kept, dropped = staging / "test_kept.py", staging / "test_dropped.py"
+    for path in (kept, dropped):
+        path.write_text(TEST)
+
+    cache = _cache(root)
+    for path in (kept, dropped):
+        cache.store(path.name, cache.key_for(str(path), _resolver(root)), (1, 1, 0))
+    cache.save()
+    assert sorted(cache.entries) == ["test_dropped.py", "test_kept.py"]
+
+    # test_kept.py is promoted, then the staging dir is removed
+    promoted = root / "tests" / "test_kept.py"
+    shutil.move(str(kept), promoted)
+    shutil.rmtree(root / "candidates")
+    cache = _cache(root)
+    key = cache.key_for(str(promoted), _resolver(root))
+    assert cache.lookup("test_kept.py", key) == (1, 1, 0)
+    cache.save()
+
+    with open(root / "test_cache.json") as f:
+        data = json.load(f)
+    assert sorted(data["entries"]) == ["test_kept.py"]
+    assert not any(rel.startswith("candidates") for rel in data["files"])
+
+
+def test_collection_error_fails_the_suite():
+    assert combine([(3, 3, 0), (1, 2, 1)]) == (4, 5, 1)
+    assert combine([(3, 3, 0), (0, 0, 2)]) == (0, 0, 2)
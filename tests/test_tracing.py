@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from ai_core import tracing
+
+
+@pytest.fixture
+def tracer(tmp_path):
+    t = tracing.enable("test", str(tmp_path / "trace.jsonl"), str(tmp_path))
+    yield t
+    tracing.disable()
+
+
+def test_spans_nest_and_count_errors(tracer, tmp_path):
+    with tracing.span("run"):
+        with tracing.span("evaluate", candidates=2) as s:
+            s.set(passed=1)
+        with pytest.raises(ValueError):
+            with tracing.span("evaluate"):
+                raise ValueError("boom")
+    tracing.flush()
+
+    with open(tmp_path / "trace.jsonl", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert [(r["name"], r["parent"]) for r in records] == [
+        ("evaluate", "run"), ("evaluate", "run"), ("run", None)]
+    assert records[0]["attrs"] == {"candidates": 2, "passed": 1}
+    assert records[1]["error"] == "ValueError"
+    assert "error" not in records[2]
+    assert tracer.totals["evaluate"][0] == 2 and tracer.totals["evaluate"][2] == 1
+
+
+def test_prometheus_counters(tracer, tmp_path):
+    for _ in range(2):
+        with tracing.span("run"):
+            pass
+        tracing.flush()
+
+    with open(tmp_path / "test.prom", encoding="utf-8") as f:
+        text = f.read()
+    assert text == tracing.prometheus()
+    assert "# TYPE evolver_phase_seconds_total counter" in text
+    assert "# TYPE evolver_phase_errors_total counter" in text
+    assert 'evolver_phase_calls_total{service="test",phase="run"} 2\n' in text
+    assert 'evolver_phase_errors_total{service="test",phase="run"} 0\n' in text
+    assert " gauge\nevolver_phase" not in text
+
+
+def test_disabled_spans_are_free():
+    tracing.disable()
+    assert tracing.span("run") is tracing.span("other")
+    assert tracing.prometheus() == ""